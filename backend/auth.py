@@ -1,13 +1,27 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from pymongo.errors import PyMongoError
 from fastapi import HTTPException, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from background_tasks import BackgroundTask
+from bounded_executor import BoundedExecutor, ExecutorBusy
+import hashlib
+import logging
 import os
+import time
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Password hashing; hashes with a different cost are upgraded on the next login
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 # JWT settings
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
@@ -17,16 +31,56 @@ if not JWT_SECRET_KEY:
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
 
+# Verified tokens kept in memory, and how often revocations from other workers are loaded.
+# The poll interval is how long other workers keep accepting a token after a logout or
+# password change (see TokenRevocationSync).
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+TOKEN_REVOCATION_POLL_SECONDS = float(os.environ.get('TOKEN_REVOCATION_POLL_SECONDS', 2))
+
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+    """Verify a password against its hash (blocking; request handlers use password_hasher)"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
+    """Hash a password (blocking; request handlers use password_hasher)"""
     return pwd_context.hash(password)
 
+
+class PasswordHasherBusy(ExecutorBusy):
+    """Every hashing thread is busy and the wait queue is full"""
+
+
+def new_hash_executor(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+
+class PasswordHasher(BoundedExecutor):
+    """Bounded thread pool for bcrypt
+
+    Each bcrypt call takes a few hundred milliseconds of CPU; run inline it
+    stalls every request on the worker. bcrypt releases the GIL, so at most
+    `workers` hashes run at once in threads while the event loop keeps
+    serving, and `max_pending` more may wait. Beyond that `run` raises
+    PasswordHasherBusy, so a burst of logins can't queue without limit.
+    """
+
+    def __init__(self, context: CryptContext = pwd_context, workers: int = PASSWORD_HASH_WORKERS,
+                 max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        super().__init__(new_hash_executor, workers, max_pending, PasswordHasherBusy, "password hashes")
+        self.context = context
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; returns (valid, new_hash), new_hash set when the stored hash needs upgrading"""
+        return await self.run(self.context.verify_and_update, password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(self.context.hash, password)
+
+
+password_hasher = PasswordHasher()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -34,7 +88,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
-    to_encode.update({"exp": expire})
+    # Sub-second issue time, so a password change only revokes tokens issued before it
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
@@ -50,10 +105,170 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+def token_digest(token: str) -> str:
+    """Cache and revocation key; the token itself is never stored"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """LRU cache of verified JWT claims by token digest, with revocations
+
+    The dashboard sends bursts of requests with the same token; a hit skips
+    the signature check and claim parsing. Entries are dropped when the
+    token expires. Revoked tokens (logout) and tokens issued before a user's
+    password change are rejected whether cached or not, as soon as this
+    worker knows about the revocation.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_SIZE):
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        # digest -> exp of revoked tokens; username -> time before which tokens are invalid
+        self._revoked: Dict[str, float] = {}
+        self._valid_after: Dict[str, float] = {}
+
+    def get(self, digest: str) -> Optional[dict]:
+        claims = self._entries.get(digest)
+        if claims is not None and claims["exp"] <= time.time():
+            del self._entries[digest]
+            claims = None
+        if claims is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return claims
+
+    def put(self, digest: str, claims: dict):
+        self._entries[digest] = claims
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def is_revoked(self, digest: str, claims: dict) -> bool:
+        if digest in self._revoked:
+            return True
+        valid_after = self._valid_after.get(claims.get("sub"))
+        return valid_after is not None and claims.get("iat", 0) < valid_after
+
+    def revoke(self, revoked: Dict[str, float] = None, valid_after: Dict[str, float] = None):
+        """Add revocations and evict the entries they cover; revocations are never undone"""
+        now = time.time()
+        self._revoked.update(revoked or {})
+        for username, after in (valid_after or {}).items():
+            self._valid_after[username] = max(after, self._valid_after.get(username, 0))
+        self._revoked = {digest: exp for digest, exp in self._revoked.items() if exp > now}
+        for digest in [digest for digest, claims in self._entries.items() if self.is_revoked(digest, claims)]:
+            del self._entries[digest]
+
+    def stats(self) -> dict:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "revoked_tokens": len(self._revoked),
+            "revoked_users": len(self._valid_after)
+        }
+
+
+token_cache = TokenCache()
+
+
+def verify_token(token: str, cache: TokenCache = token_cache) -> dict:
+    """Verified claims of a token, from the cache when possible"""
+    digest = token_digest(token)
+    payload = cache.get(digest)
+    if payload is None:
+        payload = decode_token(token)
+        if "exp" not in payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        cache.put(digest, payload)
+    if cache.is_revoked(digest, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
+
+
+async def revoke_token(db, token: str, cache: TokenCache = token_cache):
+    """Revoke one token (logout) in this worker now and in the others on their next poll"""
+    claims = verify_token(token, cache)
+    digest = token_digest(token)
+    cache.revoke(revoked={digest: claims["exp"]})
+    try:
+        await db.revoked_tokens.update_one(
+            {"_id": digest},
+            {"$set": {"username": claims.get("sub"), "expires_at": datetime.utcfromtimestamp(claims["exp"])}},
+            upsert=True
+        )
+    except PyMongoError as e:
+        logger.warning(f"⚠️ Failed to store token revocation: {str(e)}")
+
+
+async def revoke_user_tokens(db, username: str, cache: TokenCache = token_cache):
+    """Revoke every token issued to a user until now (password change)"""
+    now = time.time()
+    cache.revoke(valid_after={username: now})
+    try:
+        await db.admins.update_one({"username": username}, {"$max": {"tokens_valid_after": now}})
+    except PyMongoError as e:
+        logger.warning(f"⚠️ Failed to store token revocation for {username}: {str(e)}")
+
+
+class TokenRevocationSync(BackgroundTask):
+    """Load revocations made by other workers into the local token cache
+
+    A revocation takes effect at once in the worker that made it, and in the
+    others on their next pass, so they accept a revoked token for up to
+    `poll_interval` seconds (TOKEN_REVOCATION_POLL_SECONDS, 2 by default).
+    That delay is accepted: checking the database on every request would
+    cost the round trip the token cache exists to avoid. While MongoDB is
+    unreachable, the delay lasts until the next pass that succeeds.
+    """
+
+    error_label = "Token revocation sync"
+
+    def __init__(self, db, cache: TokenCache = token_cache, poll_interval: float = TOKEN_REVOCATION_POLL_SECONDS):
+        super().__init__(poll_interval)
+        self.db = db
+        self.cache = cache
+
+    async def run_once(self):
+        await self.load()
+
+    async def load(self):
+        """Apply every stored revocation that is still in force"""
+        revoked = await self.db.revoked_tokens.find(
+            {"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1, "expires_at": 1}
+        ).to_list(None)
+        users = await self.db.admins.find(
+            {"tokens_valid_after": {"$exists": True}}, {"_id": 0, "username": 1, "tokens_valid_after": 1}
+        ).to_list(None)
+        self.cache.revoke(
+            revoked={
+                doc["_id"]: (doc["expires_at"] - datetime(1970, 1, 1)).total_seconds() for doc in revoked
+            },
+            valid_after={doc["username"]: doc["tokens_valid_after"] for doc in users}
+        )
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)) -> dict:
     """Get current authenticated user from token"""
-    token = credentials.credentials
-    payload = decode_token(token)
+    payload = verify_token(credentials.credentials)
     username: str = payload.get("sub")
     if username is None:
         raise HTTPException(
@@ -72,7 +287,7 @@ async def init_admin_user(db, username: str = "vladanmitic@gmail.com", password:
             "id": str(datetime.utcnow().timestamp()),
             "username": username,
             "email": email,
-            "password_hash": get_password_hash(password),
+            "password_hash": await password_hasher.hash(password),
             "created_at": datetime.utcnow()
         }
         await db.admins.insert_one(admin_data)
@@ -0,0 +1,73 @@
+"""
+Background loops that run inside the API process.
+
+Cache invalidation, revocation sync, the email outbox, stats reconciliation
+and export jobs all follow the same shape: start one or more asyncio tasks
+at startup, do a pass of work every interval (or sooner when woken), log
+errors and keep going, and cancel cleanly at shutdown.
+``BackgroundTask`` holds that lifecycle; subclasses implement ``run_once``.
+"""
+
+import asyncio
+import logging
+from typing import List
+
+from pymongo.errors import PyMongoError
+
+
+class BackgroundTask:
+    """Run `run_once` in `concurrency` background tasks every `poll_interval` seconds
+
+    `wake` starts the next pass right away instead of at the end of the
+    interval. A failed pass is logged to the subclass module's logger (a
+    PyMongoError as a warning, anything else with its traceback) and the
+    loop carries on, so one bad document can't stop the task for good.
+    """
+
+    error_label = "Background task"
+
+    def __init__(self, poll_interval: float, concurrency: int = 1):
+        self.poll_interval = poll_interval
+        self.concurrency = max(1, concurrency)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> List[asyncio.Task]:
+        """Start the background tasks"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        return self._tasks
+
+    async def stop(self):
+        """Cancel the background tasks and wait for them to finish"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def wake(self):
+        """Start the next pass now instead of waiting for the interval"""
+        self._wakeup.set()
+
+    async def run_once(self):
+        raise NotImplementedError
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logging.getLogger(type(self).__module__).warning(f"⚠️ {self.error_label} error: {str(e)}")
+            except Exception:
+                logging.getLogger(type(self).__module__).exception(f"❌ {self.error_label} failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
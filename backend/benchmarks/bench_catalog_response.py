@@ -0,0 +1,105 @@
+"""
+Microbenchmark: /api/services before and after pre-serialized snapshots
+
+"before" replays the original handler: validate every document into a
+Service model, then let FastAPI re-validate against response_model and
+JSON-encode the result on every request.
+"after" mounts the real public router with the catalog cache primed, so
+each request returns the snapshot's pre-encoded bytes.
+
+No MongoDB is needed; both variants are served in-process over ASGI.
+
+Usage (from backend/):
+    python benchmarks/bench_catalog_response.py --services 20 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret')
+
+import httpx
+from fastapi import FastAPI
+
+from models import Service
+from catalog_cache import catalog_cache, CatalogSnapshot
+from routes.public import router as public_router
+
+
+def make_documents(count: int) -> List[dict]:
+    """Build service documents shaped like the seeded ones"""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"service-{i}",
+            "title": f"Service {i}",
+            "description": "Comprehensive IT and telecom consulting services including infrastructure, network optimization, and advanced solutions.",
+            "icon": "network",
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+
+def build_before_app(documents: List[dict]) -> FastAPI:
+    """App that serves services the way the original handler did"""
+    app = FastAPI()
+
+    @app.get("/api/services", response_model=List[Service])
+    async def get_services():
+        return [Service(**service) for service in documents]
+
+    return app
+
+
+async def build_after_app(documents: List[dict]) -> FastAPI:
+    """App that serves services through the real router and a primed cache"""
+    async def loader():
+        return CatalogSnapshot([Service(**service) for service in documents])
+
+    await catalog_cache.get_or_load("services", loader)
+    app = FastAPI()
+    app.include_router(public_router)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Return requests per second for sequential GET /api/services"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/api/services")
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/api/services")
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--services", type=int, default=20, help="number of service documents")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per variant")
+    args = parser.parse_args()
+
+    documents = make_documents(args.services)
+    before = await measure(build_before_app(documents), args.requests)
+    after = await measure(await build_after_app(documents), args.requests)
+
+    print(f"services={args.services} requests={args.requests}")
+    print(f"before (validate + encode per request): {before:10.0f} req/s")
+    print(f"after  (pre-encoded snapshot bytes):    {after:10.0f} req/s")
+    print(f"speedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
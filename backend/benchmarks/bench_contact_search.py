@@ -0,0 +1,153 @@
+"""
+Benchmark: unanchored $regex vs text index / normalized-field contact search
+
+Seeds a throwaway database with synthetic contacts (search fields included),
+creates the same indexes as server.create_indexes, then times each kind of
+admin search both ways: the old four-clause case-insensitive $regex, and
+the query built by contact_search.build_contact_search. Prints p50 and p95
+latency per search kind (email prefix, phone, $text) and how many documents
+each plan examined. Needs a real MongoDB server: a mock database supports
+neither $text nor explain.
+
+Usage (from backend/, MongoDB running):
+    python benchmarks/bench_contact_search.py --contacts 1000000
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from contact_search import build_contact_search, contact_search_fields, SEARCH_FIELD_INDEXES
+
+PROJECTION = {"_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1, "service": 1, "comment": 1, "created_at": 1}
+SORT = [("created_at", -1), ("id", -1)]
+SERVICES = ["saas", "it-consulting", "telco-consulting", "leadership", "pnl-optimization", "company-registration", "others"]
+FIRST_NAMES = ["Anna", "Erik", "Maria", "Lars", "Karin", "Johan", "Sara", "Nils", "Eva", "Oskar", "Vladan", "Ingrid"]
+LAST_NAMES = ["Andersson", "Johansson", "Karlsson", "Nilsson", "Eriksson", "Larsson", "Olsson", "Persson", "Mitic", "Berg"]
+DOMAINS = ["example.com", "example.se", "telia.se", "gmail.com", "mitaict.com", "company.io"]
+
+
+async def seed(db, count: int, batch: int = 10000):
+    """Insert synthetic contacts and create the search indexes"""
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=3650)
+    for offset in range(0, count, batch):
+        docs = []
+        for i in range(offset, min(offset + batch, count)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            email = f"{first}.{last}{i}@{rng.choice(DOMAINS)}"
+            phone = f"+46 70 {i:07d}"
+            docs.append({
+                "id": str(uuid.uuid4()),
+                "name": f"{first} {last}",
+                "email": email,
+                "phone": phone,
+                "service": SERVICES[i % len(SERVICES)],
+                "comment": "Benchmark contact",
+                "created_at": start + timedelta(seconds=i * 30),
+                **contact_search_fields(email, phone)
+            })
+        await db.contacts.insert_many(docs, ordered=False)
+
+    await db.contacts.create_index([("created_at", -1), ("id", -1)])
+    await db.contacts.create_index([("name", "text"), ("email", "text"), ("service", "text")])
+    for field in SEARCH_FIELD_INDEXES:
+        await db.contacts.create_index([(field, 1)])
+
+
+def legacy_query(search: str) -> dict:
+    """The previous search: four unanchored case-insensitive regexes (escaped here)"""
+    pattern = re.escape(search)
+    return {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in ("name", "email", "phone", "service")]}
+
+
+def indexed_find(search: str, limit: int):
+    contact_search = build_contact_search(search)
+    projection, sort = dict(PROJECTION), SORT
+    if contact_search["mode"] == "text":
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"})] + SORT
+    return contact_search["query"], projection, sort
+
+
+def percentile(timings: list, pct: float) -> float:
+    """Nearest-rank percentile of the timings, in milliseconds"""
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)] * 1000
+
+
+async def time_query(db, query: dict, projection: dict, sort, limit: int, repeat: int) -> tuple:
+    """(p50 ms, p95 ms, documents examined) over `repeat` runs of the query"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await db.contacts.find(query, projection).sort(sort).limit(limit).to_list(limit)
+        timings.append(time.perf_counter() - start)
+    explain = await db.command({
+        "explain": {"find": "contacts", "filter": query, "projection": projection, "sort": dict(sort), "limit": limit},
+        "verbosity": "executionStats"
+    })
+    examined = explain["executionStats"]["totalDocsExamined"]
+    return percentile(timings, 50), percentile(timings, 95), examined
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Contact search benchmark")
+    parser.add_argument("--mongo-url", default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    parser.add_argument("--contacts", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    args = parser.parse_args()
+
+    searches = [
+        ("$text name", "Karlsson"),
+        ("$text service", "telco"),
+        ("email prefix", f"erik.nilsson{args.contacts // 2}"),
+        ("email domain", "@mitaict"),
+        ("phone prefix", "+46 70 012"),
+        ("phone suffix", f"{args.contacts // 3:07d}"),
+    ]
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[f"bench_search_{uuid.uuid4().hex[:8]}"]
+    try:
+        print(f"Seeding {args.contacts} contacts...")
+        await seed(db, args.contacts)
+        server = await client.server_info()
+        print(f"MongoDB {server['version']}, {args.contacts} contacts, limit {args.limit}, {args.repeat} runs each")
+
+        print(f"{'kind':>14} {'search':>24} | {'regex p50':>10} {'p95':>8} {'examined':>9} | {'indexed p50':>11} {'p95':>8} {'examined':>9}")
+        for kind, search in searches:
+            regex_p50, regex_p95, regex_examined = await time_query(
+                db, legacy_query(search), PROJECTION, SORT, args.limit, args.repeat
+            )
+            query, projection, sort = indexed_find(search, args.limit)
+            indexed_p50, indexed_p95, indexed_examined = await time_query(
+                db, query, projection, sort, args.limit, args.repeat
+            )
+            print(
+                f"{kind:>14} {search:>24} | {regex_p50:>10.2f} {regex_p95:>8.2f} {regex_examined:>9} | "
+                f"{indexed_p50:>11.2f} {indexed_p95:>8.2f} {indexed_examined:>9}"
+            )
+        print("times in ms")
+    finally:
+        if not args.keep:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
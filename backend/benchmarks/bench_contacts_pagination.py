@@ -0,0 +1,117 @@
+"""
+Benchmark: skip/limit vs keyset (cursor) pagination of admin contacts
+
+Seeds a throwaway database with synthetic contacts, then times fetching a
+page at shallow and deep pages with both strategies, using the same query
+shapes and the (created_at, id) index as routes/admin.py, and prints p50
+and p95 per-page latency. Needs a real MongoDB server: an in-memory mock
+scans every document whatever the query.
+
+Usage (from backend/, MongoDB running):
+    python benchmarks/bench_contacts_pagination.py --contacts 1000000
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-only-secret')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from routes.admin import encode_contacts_cursor, decode_contacts_cursor
+
+PROJECTION = {"_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1, "service": 1, "comment": 1, "created_at": 1}
+SORT = [("created_at", -1), ("id", -1)]
+SERVICES = ["saas", "it-consulting", "telco-consulting", "leadership", "pnl-optimization", "company-registration", "others"]
+
+
+async def seed(db, count: int, batch: int = 10000):
+    """Insert synthetic contacts and create the pagination index"""
+    start = datetime.utcnow() - timedelta(days=3650)
+    for offset in range(0, count, batch):
+        docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": f"Contact {i}",
+                "email": f"contact{i}@example.com",
+                "phone": f"+4670{i:07d}",
+                "service": SERVICES[i % len(SERVICES)],
+                "comment": "Benchmark contact",
+                "created_at": start + timedelta(seconds=i * 30)
+            }
+            for i in range(offset, min(offset + batch, count))
+        ]
+        await db.contacts.insert_many(docs, ordered=False)
+    await db.contacts.create_index([("created_at", -1), ("id", -1)])
+
+
+def percentile(timings: list, pct: float) -> float:
+    """Nearest-rank percentile of the timings, in milliseconds"""
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)] * 1000
+
+
+async def time_skip_page(db, page: int, limit: int) -> float:
+    start = time.perf_counter()
+    await db.contacts.find({}, PROJECTION).sort(SORT).skip((page - 1) * limit).limit(limit).to_list(limit)
+    await db.contacts.count_documents({})
+    return time.perf_counter() - start
+
+
+async def cursor_at(db, page: int, limit: int) -> str:
+    """Cursor positioned just before the given page (computed outside the timing)"""
+    docs = await db.contacts.find({}, PROJECTION).sort(SORT).skip((page - 1) * limit - 1).limit(1).to_list(1)
+    return encode_contacts_cursor(docs[0])
+
+
+async def time_keyset_page(db, cursor: str, limit: int) -> float:
+    start = time.perf_counter()
+    await db.contacts.find(decode_contacts_cursor(cursor), PROJECTION).sort(SORT).limit(limit + 1).to_list(limit + 1)
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Contacts pagination benchmark")
+    parser.add_argument("--mongo-url", default=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    parser.add_argument("--contacts", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[f"bench_pagination_{uuid.uuid4().hex[:8]}"]
+    try:
+        print(f"Seeding {args.contacts} contacts...")
+        await seed(db, args.contacts)
+        server = await client.server_info()
+        print(f"MongoDB {server['version']}, {args.contacts} contacts, limit {args.limit}, {args.repeat} runs each")
+
+        max_page = args.contacts // args.limit
+        depths = sorted({2, 10, 100, 1000, max_page // 10, max_page // 2, max_page} & set(range(2, max_page + 1)))
+        print(f"{'page':>10} | {'skip+count p50':>14} {'p95':>8} | {'keyset p50':>10} {'p95':>8}")
+        for page in depths:
+            cursor = await cursor_at(db, page, args.limit)
+            skip = [await time_skip_page(db, page, args.limit) for _ in range(args.repeat)]
+            keyset = [await time_keyset_page(db, cursor, args.limit) for _ in range(args.repeat)]
+            print(
+                f"{page:>10} | {percentile(skip, 50):>14.2f} {percentile(skip, 95):>8.2f} | "
+                f"{percentile(keyset, 50):>10.2f} {percentile(keyset, 95):>8.2f}"
+            )
+        print("times in ms")
+    finally:
+        if not args.keep:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""
+Benchmark: email render time per message
+
+Times, per email kind, rendering with templates read and compiled on every
+message (what a naive loader would do), rendering with the cached compiled
+templates, and building the full MIME message (render + MIME tree).
+
+Usage (from backend/):
+    python benchmarks/bench_email_render.py --messages 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from email_templates import CompiledTemplate, TEMPLATE_DIR, EMAIL_SUBJECTS, render_email, escape_html, escape_header
+from email_service import build_message
+
+CONTEXTS = {
+    "contact_notification": {
+        "name": "Nordic Telecom AB", "email": "anna.karlsson@example.se", "phone": "+46 70 123 45 67",
+        "service": "telco-consulting", "comment": "We would like to discuss <network> upgrades & routing.\n" * 5
+    },
+    "contact_auto_response": {
+        "name": "Nordic Telecom AB", "email": "anna.karlsson@example.se", "phone": "+46 70 123 45 67",
+        "service": "Telco consulting"
+    },
+    "meeting_request": {
+        "name": "Anna Karlsson", "email": "anna.karlsson@example.se", "phone": "+46 70 123 45 67",
+        "preferred_datetime": "Tuesday 14:00 CET", "topic": "CRM rollout"
+    },
+}
+
+
+def render_uncached(kind: str, context: dict):
+    subject = CompiledTemplate(EMAIL_SUBJECTS[kind], escape_header).render(context)
+    text = CompiledTemplate((TEMPLATE_DIR / f"{kind}.txt").read_text(encoding="utf-8")).render(context)
+    html = CompiledTemplate((TEMPLATE_DIR / f"{kind}.html").read_text(encoding="utf-8"), escape_html).render(context)
+    return subject, text, html
+
+
+def per_message_us(fn, messages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(messages):
+        fn()
+    return (time.perf_counter() - start) / messages * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Email render benchmark")
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'kind':>24} {'uncached us':>12} {'compiled us':>12} {'+MIME us':>10}")
+    for kind, context in CONTEXTS.items():
+        uncached = per_message_us(lambda: render_uncached(kind, context), args.messages)
+        compiled = per_message_us(lambda: render_email(kind, context), args.messages)
+        full = per_message_us(lambda: build_message(kind, "info@example.com", context), args.messages)
+        print(f"{kind:>24} {uncached:>12.1f} {compiled:>12.1f} {full:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: in-memory vs write-only streaming Excel export of contacts
+
+Generates synthetic contacts in batches (no database needed) and writes
+them with the previous approach (full in-memory Workbook, cell by cell)
+and with exports.write_xlsx (batches spooled to disk, then a write-only
+worksheet filled in a render worker process).
+Each run happens in a fresh subprocess so peak RSS is measured per run.
+
+Usage (from backend/):
+    python benchmarks/bench_excel_export.py --rows 100000 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SERVICES = ["saas", "it-consulting", "telco-consulting", "leadership", "pnl-optimization", "company-registration", "others"]
+
+
+def synthetic_contacts(start: int, count: int) -> list:
+    base = datetime(2020, 1, 1)
+    return [
+        {
+            "name": f"Contact {i}",
+            "email": f"contact{i}@example.com",
+            "phone": f"+4670{i:07d}",
+            "service": SERVICES[i % len(SERVICES)],
+            "comment": "Interested in a follow-up call about network infrastructure.",
+            "created_at": base + timedelta(seconds=i * 30)
+        }
+        for i in range(start, start + count)
+    ]
+
+
+async def synthetic_batches(rows: int, batch_size: int = 1000):
+    for offset in range(0, rows, batch_size):
+        yield synthetic_contacts(offset, min(batch_size, rows - offset))
+
+
+def run_in_memory(rows: int, path: str):
+    """The previous export: full Workbook, every cell kept in memory until save"""
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Contacts"
+    for col, header in enumerate(['Name', 'Email', 'Phone', 'Service', 'Comment', 'Date'], 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.fill = PatternFill(start_color='00FFD1', end_color='00FFD1', fill_type='solid')
+        cell.font = Font(bold=True, color='000000')
+        cell.alignment = Alignment(horizontal='center')
+    row = 2
+    for offset in range(0, rows, 1000):
+        for contact in synthetic_contacts(offset, min(1000, rows - offset)):
+            ws.cell(row=row, column=1, value=contact['name'])
+            ws.cell(row=row, column=2, value=contact['email'])
+            ws.cell(row=row, column=3, value=contact['phone'])
+            ws.cell(row=row, column=4, value=contact['service'])
+            ws.cell(row=row, column=5, value=contact['comment'])
+            ws.cell(row=row, column=6, value=contact['created_at'].strftime('%Y-%m-%d %H:%M'))
+            row += 1
+    wb.save(path)
+
+
+def run_streaming(rows: int, path: str):
+    from exports import write_xlsx, CONTACT_COLUMNS
+    asyncio.run(write_xlsx(path, synthetic_batches(rows), CONTACT_COLUMNS, "Contacts"))
+
+
+def run_one(mode: str, rows: int):
+    """Child process: run one export and print seconds, peak RSS and file size"""
+    path = f"/tmp/bench_export_{os.getpid()}.xlsx"
+    start = time.perf_counter()
+    (run_in_memory if mode == "in-memory" else run_streaming)(rows, path)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.2f} {peak_mib:.1f} {size / 1024 / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel export benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--in-memory-max", type=int, default=100000,
+                        help="skip the in-memory export above this many rows (it needs several GB at 1M)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'rows':>9} {'mode':>10} {'seconds':>8} {'peak RSS MiB':>13} {'file MiB':>9}")
+    for rows in args.rows:
+        for mode in ("in-memory", "streaming"):
+            if mode == "in-memory" and rows > args.in_memory_max:
+                print(f"{rows:>9} {mode:>10} {'skipped':>8}")
+                continue
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(rows)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            seconds, peak, size = output[-3:]
+            print(f"{rows:>9} {mode:>10} {seconds:>8} {peak:>13} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
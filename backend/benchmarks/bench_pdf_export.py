@@ -0,0 +1,105 @@
+"""
+Benchmark: one big reportlab Table vs the paged PDF export
+
+Generates synthetic contacts (no database needed) and renders them with
+the previous approach (every row in a single Table with a full
+TableStyle, laid out and split by reportlab) and with exports.render_pdf
+(fixed-size row tables under a header drawn on each page). Each run
+happens in a fresh subprocess so peak RSS is measured per run; the
+microseconds per row column shows whether the cost grows linearly.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf_export.py --rows 1000 5000 10000 20000 50000
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_excel_export import synthetic_batches, synthetic_contacts
+
+
+def run_single_table(rows: int, path: str):
+    """The previous export: one Table holding every row"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+    doc = SimpleDocTemplate(path, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    table_data = [['Name', 'Email', 'Phone', 'Service', 'Date']]
+    for offset in range(0, rows, 1000):
+        for contact in synthetic_contacts(offset, min(1000, rows - offset)):
+            table_data.append([
+                contact['name'], contact['email'], contact['phone'], contact['service'],
+                contact['created_at'].strftime('%Y-%m-%d')
+            ])
+    table = Table(table_data, colWidths=[1.3*inch, 1.8*inch, 1*inch, 1.5*inch, 0.9*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#00FFD1')),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#333333')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#1a1a1a'), colors.HexColor('#222222')]),
+    ]))
+    doc.build([table])
+
+
+def run_paged(rows: int, path: str):
+    from exports import render_pdf, spool_documents, column_fields, remove_file, PDF_CONTACT_COLUMNS
+
+    spool_path, _ = asyncio.run(spool_documents(synthetic_batches(rows), column_fields(PDF_CONTACT_COLUMNS)))
+    try:
+        render_pdf(spool_path, path, PDF_CONTACT_COLUMNS, "Contacts")
+    finally:
+        remove_file(spool_path)
+
+
+def run_one(mode: str, rows: int):
+    """Child process: render one PDF and print seconds, peak RSS and file size"""
+    path = f"/tmp/bench_pdf_{os.getpid()}.pdf"
+    start = time.perf_counter()
+    (run_single_table if mode == "single" else run_paged)(rows, path)
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(path)
+    os.remove(path)
+    peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{elapsed:.2f} {peak_mib:.1f} {size / 1024 / 1024:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF export benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 10000, 20000, 50000])
+    parser.add_argument("--single-max", type=int, default=20000,
+                        help="skip the single-table render above this many rows")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'rows':>9} {'mode':>7} {'seconds':>8} {'us/row':>7} {'peak RSS MiB':>13} {'file MiB':>9}")
+    for rows in args.rows:
+        for mode in ("single", "paged"):
+            if mode == "single" and rows > args.single_max:
+                print(f"{rows:>9} {mode:>7} {'skipped':>8}")
+                continue
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(rows)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            seconds, peak, size = output[-3:]
+            per_row = float(seconds) / rows * 1e6
+            print(f"{rows:>9} {mode:>7} {seconds:>8} {per_row:>7.0f} {peak:>13} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: SMTP throughput with and without connection pooling
+
+Starts a local aiosmtpd server as a stand-in for the real SMTP host and
+sends the same messages two ways:
+  - unpooled: aiosmtplib.send() per message (a new connection each time,
+    as email_service did before pooling)
+  - pooled: email_service.SMTPConnectionPool shared by all senders
+--handshake-ms adds a delay to every EHLO to mimic the network round trips
+and TLS/AUTH work a remote provider costs per connection.
+
+Requires aiosmtpd (benchmark only):  pip install aiosmtpd
+Usage (from backend/):
+    python benchmarks/bench_smtp_pool.py --messages 500 --concurrency 4 --handshake-ms 50
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aiosmtplib
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    sys.exit("aiosmtpd is required for this benchmark: pip install aiosmtpd")
+
+from email_service import SMTPConnectionPool
+
+
+class SinkHandler:
+    """Accept every message, delaying EHLO to simulate connection setup cost"""
+
+    def __init__(self, handshake_delay: float):
+        self.handshake_delay = handshake_delay
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def make_message(i: int) -> MIMEText:
+    message = MIMEText(f"<p>Benchmark message {i}</p>", "html")
+    message["From"] = "noreply@example.com"
+    message["To"] = "info@example.com"
+    message["Subject"] = f"Benchmark {i}"
+    return message
+
+
+async def run_senders(send, messages: int, concurrency: int) -> float:
+    """Send messages with a number of concurrent senders; return messages/s"""
+    queue = asyncio.Queue()
+    for i in range(messages):
+        queue.put_nowait(i)
+
+    async def worker():
+        while not queue.empty():
+            await send(make_message(queue.get_nowait()))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return messages / (time.perf_counter() - start)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="SMTP pooling benchmark")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        async def send_unpooled(message):
+            await aiosmtplib.send(message, hostname="127.0.0.1", port=args.port, use_tls=False, start_tls=False)
+
+        pool = SMTPConnectionPool(
+            hostname="127.0.0.1", port=args.port,
+            use_tls=False, start_tls=False, size=args.pool_size
+        )
+
+        unpooled = await run_senders(send_unpooled, args.messages, args.concurrency)
+        pooled = await run_senders(pool.send_message, args.messages, args.concurrency)
+        await pool.close()
+    finally:
+        controller.stop()
+
+    print(f"messages={args.messages} concurrency={args.concurrency} "
+          f"pool_size={args.pool_size} handshake={args.handshake_ms:.0f}ms")
+    print(f"unpooled (connect per message): {unpooled:8.1f} msg/s")
+    print(f"pooled:                         {pooled:8.1f} msg/s "
+          f"({pool.connections_opened} connections opened)")
+    print(f"speedup: {pooled / unpooled:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Startup benchmark: time-to-first-request and resident memory per worker
+
+Launches `uvicorn server:app` with the requested number of workers, polls
+GET /api/ until it answers, then reads VmRSS for every worker process from
+/proc (Linux only). Repeat runs are averaged. The server needs the same
+environment as production (.env with MONGO_URL, JWT_SECRET_KEY, ...).
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py --workers 2 --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child_pids(pid: int):
+    """Direct children of a process"""
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            children.extend(int(p) for p in f.read().split())
+    return children
+
+
+def run_once(port: int, workers: int, timeout: float):
+    """Start the server once; return (seconds to first response, [worker RSS MiB])"""
+    command = [
+        sys.executable, "-m", "uvicorn", "server:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning"
+    ]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    try:
+        url = f"http://127.0.0.1:{port}/api/"
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"server exited with code {process.returncode}")
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError("server did not answer in time")
+            try:
+                if requests.get(url, timeout=0.5).status_code == 200:
+                    break
+            except requests.RequestException:
+                time.sleep(0.02)
+        elapsed = time.perf_counter() - start
+
+        # Let every worker finish booting before sampling memory
+        time.sleep(1)
+        pids = child_pids(process.pid) if workers > 1 else [process.pid]
+        return elapsed, [rss_mb(pid) for pid in pids]
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend startup benchmark")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    times, rss = [], []
+    for run in range(args.runs):
+        elapsed, worker_rss = run_once(args.port, args.workers, args.timeout)
+        times.append(elapsed)
+        rss.extend(worker_rss)
+        print(f"run {run + 1}: first request after {elapsed * 1000:.0f} ms, "
+              f"worker RSS {', '.join(f'{r:.1f}' for r in worker_rss)} MiB")
+
+    print(f"time-to-first-request: mean {statistics.mean(times) * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms")
+    print(f"RSS per worker: mean {statistics.mean(rss):.1f} MiB, max {max(rss):.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
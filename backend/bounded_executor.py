@@ -0,0 +1,88 @@
+"""
+Bounded executors for blocking work.
+
+CPU-bound calls (document rendering, bcrypt) stall every request on the
+worker if they run on the event loop. ``BoundedExecutor`` runs them in a
+thread or process pool instead, with at most `workers` running and
+`max_pending` more waiting; beyond that it raises its busy error right away
+so a burst can't queue without limit, and the handler can answer 503.
+
+A slot stays taken until the call really finishes, even if the awaiting
+request is cancelled. Callers that do expensive preparation before the
+call can take the slot first with ``reserve``.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Callable, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusy(Exception):
+    """Every worker is busy and the wait queue is full"""
+
+
+class BoundedExecutor:
+    """Run blocking calls in an executor with a bounded wait queue
+
+    `new_executor(workers)` creates the underlying pool; it's created on
+    first use and again if it breaks (e.g. a worker process was killed).
+    """
+
+    def __init__(self, new_executor: Callable[[int], Executor], workers: int, max_pending: int,
+                 busy_error: Type[ExecutorBusy] = ExecutorBusy, task_name: str = "tasks"):
+        self.new_executor = new_executor
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.busy_error = busy_error
+        self.task_name = task_name
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self.new_executor(self.workers)
+        return self._executor
+
+    def has_capacity(self) -> bool:
+        return self.pending < self.workers + self.max_pending
+
+    def reserve(self):
+        """Take a slot up front, before preparing the call; raises the busy error
+
+        Pass reserved=True to the matching `run`, or call `release` if the
+        call never starts.
+        """
+        if not self.has_capacity():
+            raise self.busy_error(f"{self.pending} {self.task_name} in progress")
+        self.pending += 1
+
+    def release(self):
+        self.pending -= 1
+
+    async def run(self, fn: Callable, *args, reserved: bool = False):
+        """Run fn(*args) in the executor"""
+        if not reserved:
+            self.reserve()
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BrokenExecutor:
+                logger.warning(f"⚠️ Executor for {self.task_name} was broken, restarting it")
+                self.shutdown()
+                future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self.release()
+            raise
+        # Count the call until it really finishes, even if the request is cancelled
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.release))
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """Stop the workers; running calls are abandoned"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,129 @@
+"""
+Cross-worker cache invalidation.
+
+Each uvicorn worker keeps its own in-process catalog cache. The watcher
+subscribes to a MongoDB change stream on the cached collections and
+invalidates the local cache whenever any worker (or anything else) writes
+to them. Change streams need a replica set; on a standalone server the
+watcher falls back to polling a shared version document that admin writes
+bump through ``publish_change``.
+
+To exercise the change-stream path locally, start a single-node replica set:
+    docker run -d -p 27017:27017 mongo:6.0 --replSet rs0
+    docker exec <container> mongosh --eval "rs.initiate()"
+and point MONGO_URL at mongodb://localhost:27017/?replicaSet=rs0
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from background_tasks import BackgroundTask
+from catalog_cache import catalog_cache, CatalogCache, CATALOG_COLLECTIONS
+from snapshot_publisher import publish_catalog_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Collections whose writes must invalidate every worker's cache
+WATCHED_COLLECTIONS = ("services", "saas_products", "about_content", "social_integrations")
+
+CACHE_VERSION_DOC_ID = "catalog"
+CACHE_POLL_INTERVAL_SECONDS = float(os.environ.get('CACHE_POLL_INTERVAL_SECONDS', 2))
+
+# Server error codes meaning "change streams are not available here"
+CHANGE_STREAM_UNSUPPORTED_CODES = {
+    40573,  # $changeStream is only supported on replica sets
+    40324,  # Unrecognized pipeline stage name (very old servers)
+    115,    # CommandNotSupported
+}
+
+
+async def publish_change(db, collection: str, cache: CatalogCache = catalog_cache):
+    """Invalidate the local cache and bump the shared version for other workers"""
+    cache.invalidate(collection)
+    try:
+        await db.cache_versions.update_one(
+            {"_id": CACHE_VERSION_DOC_ID},
+            {
+                "$inc": {"version": 1},
+                "$set": {"collection": collection, "updated_at": datetime.utcnow()}
+            },
+            upsert=True
+        )
+    except PyMongoError as e:
+        logger.warning(f"⚠️ Failed to bump cache version for {collection}: {str(e)}")
+
+    if collection in CATALOG_COLLECTIONS:
+        await publish_catalog_snapshots()
+
+
+class CacheInvalidationWatcher(BackgroundTask):
+    """Invalidate a local cache when watched collections change in any worker
+
+    With change streams a pass follows the stream until it fails; when
+    polling, a pass compares the version document once every poll_interval.
+    """
+
+    error_label = "Cache watcher"
+
+    def __init__(
+        self,
+        db,
+        cache: CatalogCache = catalog_cache,
+        collections=WATCHED_COLLECTIONS,
+        poll_interval: float = CACHE_POLL_INTERVAL_SECONDS,
+        use_change_streams: bool = True
+    ):
+        super().__init__(poll_interval)
+        self.db = db
+        self.cache = cache
+        self.collections = list(collections)
+        self.use_change_streams = use_change_streams
+        self.mode = None
+        self._last_version = None
+        self._ready = asyncio.Event()
+
+    async def wait_ready(self, timeout: float = 10):
+        """Wait until the watcher is subscribed (change stream) or polling"""
+        await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def run_once(self):
+        if self.use_change_streams:
+            try:
+                await self._watch_changes()
+            except OperationFailure as e:
+                if e.code not in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    raise
+                logger.info("ℹ️ Change streams unavailable, polling cache version instead")
+                self.use_change_streams = False
+        if not self.use_change_streams:
+            await self._poll_version()
+
+    async def _watch_changes(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": self.collections}}}]
+        async with self.db.watch(pipeline) as stream:
+            self.mode = "change_stream"
+            # Anything written while we were not subscribed is unknown
+            self.cache.invalidate("all")
+            self._ready.set()
+            logger.info("✅ Cache watcher subscribed to change stream")
+            async for change in stream:
+                self.cache.invalidate(change.get("ns", {}).get("coll"))
+
+    async def _poll_version(self):
+        version = await self._read_version()
+        if self.mode != "polling":
+            self.mode = "polling"
+            self.cache.invalidate("all")
+            self._ready.set()
+            logger.info(f"✅ Cache watcher polling version every {self.poll_interval}s")
+        elif version != self._last_version:
+            self.cache.invalidate("all")
+        self._last_version = version
+
+    async def _read_version(self) -> int:
+        doc = await self.db.cache_versions.find_one({"_id": CACHE_VERSION_DOC_ID})
+        return doc.get("version", 0) if doc else 0
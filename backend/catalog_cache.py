@@ -0,0 +1,135 @@
+"""
+In-process cache for public catalog content (services, SaaS products, about).
+
+Entries are tagged with the content version that was current when they were
+loaded. Admin CRUD handlers call ``invalidate`` after a write, which bumps the
+version so every cached entry is reloaded on its next read.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+# Collections whose content is served through the catalog cache
+CATALOG_COLLECTIONS = ("services", "saas_products", "about_content")
+
+_MISSING = object()
+
+
+class CatalogSnapshot:
+    """Validated catalog content, its pre-encoded JSON body and strong ETag"""
+
+    def __init__(self, data: Any, body: Optional[bytes] = None):
+        self.data = data
+        self.body = body if body is not None else encode_json(data)
+        self.etag = make_etag(self.body)
+
+
+def encode_json(data: Any) -> bytes:
+    """Encode content exactly as FastAPI's JSONResponse would"""
+    return json.dumps(
+        jsonable_encoder(data),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """Build a strong ETag from an encoded response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # Weak comparison, as required for If-None-Match (RFC 9110 13.1.2)
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class CatalogCache:
+    """Version-keyed cache with hit/miss counters"""
+
+    def __init__(self):
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[int, float, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """Return the cached value for key, loading it once per content version
+
+        ttl (seconds) additionally expires the entry as a safety net for
+        writes that bypass the admin API.
+        """
+        value = self._lookup(key, ttl)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have loaded it while we were waiting
+            value = self._lookup(key, ttl)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            version = self.version
+            value = await loader()
+            # Tag with the version seen before loading, so a write that lands
+            # mid-load leaves this entry stale instead of hiding the change
+            self._entries[key] = (version, time.monotonic(), value)
+            return value
+
+    def _lookup(self, key: str, ttl: Optional[float]) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self.version:
+            return _MISSING
+        if ttl and time.monotonic() - entry[1] > ttl:
+            return _MISSING
+        return entry[2]
+
+    def invalidate(self, collection: str = None):
+        """Bump the content version so all entries reload on next read"""
+        self.version += 1
+        self._entries.clear()
+        logger.info(f"🔄 Catalog cache invalidated ({collection or 'all'}), version {self.version}")
+
+    def stats(self) -> dict:
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,226 @@
+"""
+Columnar lead exports for analytics.
+
+Contacts, captured chat leads and meeting requests are written into one
+typed table (Parquet or Feather / Arrow IPC) with a ``source`` column. The
+``source``, ``service`` and ``status`` columns are dictionary-encoded, so
+they load as categoricals, and ``created_at`` is a UTC timestamp.
+
+Each collection is read through a cursor in EXPORT_BATCH_SIZE batches and
+converted to Arrow record batches, which are buffered only up to one row
+group (COLUMNAR_ROW_GROUP_SIZE rows) before being written. Category codes
+are kept stable across batches, so the Feather file can append dictionary
+deltas instead of rewriting the dictionary.
+
+pyarrow is heavy and only loaded on the first export.
+"""
+
+import logging
+import os
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from exports import iter_batches, projection_for, new_temp_path, remove_file, EXPORT_SORT
+from lazy_imports import lazy_module
+
+pa = lazy_module("pyarrow")
+pa_ipc = lazy_module("pyarrow.ipc")
+pq = lazy_module("pyarrow.parquet")
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_ROW_GROUP_SIZE = int(os.environ.get('COLUMNAR_ROW_GROUP_SIZE', 50000))
+COLUMNAR_COMPRESSION = 'zstd'
+
+COLUMNAR_FORMATS = {
+    "parquet": {"extension": ".parquet", "media_type": "application/vnd.apache.parquet"},
+    "feather": {"extension": ".feather", "media_type": "application/vnd.apache.arrow.file"},
+}
+
+# (column, type): "category" columns are dictionary-encoded strings
+LEAD_COLUMNS: List[Tuple[str, str]] = [
+    ("source", "category"),
+    ("id", "string"),
+    ("created_at", "timestamp"),
+    ("name", "string"),
+    ("email", "string"),
+    ("phone", "string"),
+    ("service", "category"),
+    ("status", "category"),
+    ("details", "string"),
+    ("preferred_datetime", "string"),
+    ("session_id", "string"),
+]
+
+# Values each category column starts with; others are added as they appear
+LEAD_CATEGORIES = {
+    "source": ["contact", "chat", "meeting"],
+    "service": [
+        "saas", "it-consulting", "telco-consulting", "leadership", "pnl-optimization",
+        "company-registration", "others"
+    ],
+    "status": ["pending", "approved", "rejected"],
+}
+
+# Lead source -> collection, which documents count as leads, and column -> document field
+LEAD_SOURCES = {
+    "contact": {
+        "collection": "contacts",
+        "query": {},
+        "fields": {
+            "id": "id", "created_at": "created_at", "name": "name", "email": "email", "phone": "phone",
+            "service": "service", "details": "comment",
+        },
+    },
+    "chat": {
+        "collection": "chat_sessions",
+        "query": {"lead_captured": True},
+        "fields": {
+            "id": "id", "created_at": "created_at", "name": "lead_name", "email": "lead_email",
+            "phone": "lead_phone", "details": "lead_interest", "session_id": "id",
+        },
+    },
+    "meeting": {
+        "collection": "meeting_requests",
+        "query": {},
+        "fields": {
+            "id": "id", "created_at": "created_at", "name": "name", "email": "email", "phone": "phone",
+            "status": "status", "details": "topic", "preferred_datetime": "preferred_datetime",
+            "session_id": "session_id",
+        },
+    },
+}
+
+
+def arrow_type(kind: str):
+    if kind == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == "timestamp":
+        return pa.timestamp("ms", tz="UTC")
+    return pa.string()
+
+
+def lead_schema():
+    return pa.schema([(name, arrow_type(kind)) for name, kind in LEAD_COLUMNS])
+
+
+class CategoryEncoder:
+    """Dictionary encoding with codes that stay the same from batch to batch
+
+    New values are appended, so each batch's dictionary extends the previous
+    one and an Arrow IPC writer can emit it as a delta. The dictionary starts
+    with the known values: an IPC file can't grow an empty dictionary.
+    """
+
+    def __init__(self, known: List[str]):
+        self.values: List[str] = list(known)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, values: List[Optional[str]]):
+        codes = []
+        for value in values:
+            if value is None:
+                codes.append(None)
+                continue
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            codes.append(code)
+        return pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(self.values, pa.string()))
+
+
+def column_value(value, kind: str):
+    if value is None:
+        return None
+    if kind == "timestamp":
+        return value if isinstance(value, datetime) else None
+    return str(value)
+
+
+class LeadsWriter:
+    """Write lead record batches to a Parquet or Feather file, one row group at a time"""
+
+    def __init__(self, path: str, file_format: str, row_group_size: int = COLUMNAR_ROW_GROUP_SIZE):
+        self.schema = lead_schema()
+        self.row_group_size = row_group_size
+        self.categories = {name: CategoryEncoder(values) for name, values in LEAD_CATEGORIES.items()}
+        self.pending = []
+        self.pending_rows = 0
+        self.rows = 0
+        if file_format == "parquet":
+            self.writer = pq.ParquetWriter(path, self.schema, compression=COLUMNAR_COMPRESSION)
+        elif file_format == "feather":
+            options = pa_ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION, emit_dictionary_deltas=True)
+            self.writer = pa_ipc.new_file(path, self.schema, options=options)
+        else:
+            raise ValueError(f"Unknown columnar format: {file_format}")
+
+    def append_documents(self, source: str, docs: List[dict]):
+        fields = LEAD_SOURCES[source]["fields"]
+        arrays = []
+        for name, kind in LEAD_COLUMNS:
+            if name == "source":
+                values = [source] * len(docs)
+            elif name in fields:
+                values = [column_value(doc.get(fields[name]), kind) for doc in docs]
+            else:
+                values = [None] * len(docs)
+            if kind == "category":
+                arrays.append(self.categories[name].encode(values))
+            else:
+                arrays.append(pa.array(values, arrow_type(kind)))
+        self.pending.append(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.pending_rows += len(docs)
+        self.rows += len(docs)
+        if self.pending_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.writer.write_table(pa.Table.from_batches(self.pending, schema=self.schema))
+            self.pending = []
+            self.pending_rows = 0
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+async def write_leads(path: str, file_format: str, sources: Dict[str, AsyncIterator[List[dict]]]) -> int:
+    """Write batches from each lead source to a columnar file; returns the number of rows"""
+    writer = await run_in_threadpool(LeadsWriter, path, file_format)
+    try:
+        for source, batches in sources.items():
+            async for batch in batches:
+                # Arrow conversion and compression are CPU work; keep them off the event loop
+                await run_in_threadpool(writer.append_documents, source, batch)
+    finally:
+        await run_in_threadpool(writer.close)
+    return writer.rows
+
+
+def lead_batches(db, source: str, query: Optional[dict] = None) -> AsyncIterator[List[dict]]:
+    spec = LEAD_SOURCES[source]
+    cursor = db[spec["collection"]].find(
+        {**spec["query"], **(query or {})},
+        projection_for(set(spec["fields"].values()))
+    ).sort(EXPORT_SORT)
+    return iter_batches(cursor)
+
+
+async def export_leads(db, file_format: str, query: Optional[dict] = None) -> Tuple[str, int]:
+    """Write all leads to a temporary Parquet or Feather file; returns (path, rows)
+
+    query (e.g. a created_at range) applies to every source.
+    """
+    path = new_temp_path(COLUMNAR_FORMATS[file_format]["extension"])
+    try:
+        sources = {source: lead_batches(db, source, query) for source in LEAD_SOURCES}
+        rows = await write_leads(path, file_format, sources)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path, rows
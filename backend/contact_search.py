@@ -0,0 +1,164 @@
+"""
+Admin contact search.
+
+Free-text searches use the contacts text index (name, email, service) and
+are ranked by relevance. Email and phone lookups go through normalized
+fields with anchored, index-backed prefix matches:
+
+- ``email_normalized``: lowercased address, for "john.d" or "john@ex"
+- ``email_domain``: the part after "@", for "@example.com"
+- ``phone_normalized``: digits only, for "+46 70 123" style prefixes
+- ``phone_reversed``: the digits reversed, so the trailing digits of a
+  number (typed without country code, e.g. "070 123 45 67") become an
+  anchored prefix as well
+
+User input is always escaped before it goes into a regex.
+"""
+
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing the search fields, created in server.create_indexes
+SEARCH_FIELD_INDEXES = ("email_normalized", "email_domain", "phone_normalized", "phone_reversed")
+
+# Fewer digits than this is not selective enough for a phone lookup
+MIN_PHONE_DIGITS = 3
+PHONE_SEARCH_PATTERN = re.compile(r"^\+?[\d\s\-().]+$")
+# A single token with a dot between letters, e.g. "john.doe" or "example.se"
+EMAIL_FRAGMENT_PATTERN = re.compile(r"^[\w+\-]+(\.[\w+\-]*)+$")
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+
+def normalize_phone(phone: str) -> str:
+    """Keep only the digits of a phone number"""
+    return re.sub(r"\D", "", phone or "")
+
+
+def contact_search_fields(email: str, phone: str) -> dict:
+    """Derived fields to store alongside a contact's email and phone"""
+    email_normalized = normalize_email(email)
+    phone_normalized = normalize_phone(phone)
+    return {
+        "email_normalized": email_normalized,
+        "email_domain": email_normalized.rpartition("@")[2] if "@" in email_normalized else "",
+        "phone_normalized": phone_normalized,
+        "phone_reversed": phone_normalized[::-1]
+    }
+
+
+def anchored_prefix(value: str) -> dict:
+    """Case-sensitive anchored regex on escaped input, which can use an index"""
+    return {"$regex": "^" + re.escape(value)}
+
+
+def build_contact_search(search: str) -> Optional[dict]:
+    """Turn an admin search string into a contacts query
+
+    Returns None for an empty search. The returned dict has ``query`` and
+    ``mode``: "email", "phone" or "text" (which should be ranked by
+    ``{"$meta": "textScore"}``).
+    """
+    search = (search or "").strip()
+    if not search:
+        return None
+
+    if "@" in search and not any(c.isspace() for c in search):
+        email = normalize_email(search)
+        if email.startswith("@"):
+            return {"mode": "email", "query": {"email_domain": anchored_prefix(email[1:])}}
+        return {"mode": "email", "query": {"email_normalized": anchored_prefix(email)}}
+
+    digits = normalize_phone(search)
+    if PHONE_SEARCH_PATTERN.match(search) and len(digits) >= MIN_PHONE_DIGITS:
+        clauses = [{"phone_normalized": anchored_prefix(digits)}]
+        if not search.startswith("+"):
+            # Without a country code it may be the end of a stored number;
+            # a leading 0 is the trunk prefix that the country code replaces
+            local = digits.lstrip("0") or digits
+            clauses.append({"phone_reversed": anchored_prefix(local[::-1])})
+        return {"mode": "phone", "query": {"$or": clauses}}
+
+    if EMAIL_FRAGMENT_PATTERN.match(search):
+        # "john.doe" or "example.se": start of the address or of the domain
+        email = normalize_email(search)
+        return {
+            "mode": "email",
+            "query": {
+                "$or": [
+                    {"email_normalized": anchored_prefix(email)},
+                    {"email_domain": anchored_prefix(email)}
+                ]
+            }
+        }
+
+    return {"mode": "text", "query": {"$text": {"$search": search}}}
+
+
+def created_at_range(date_from: Optional[date] = None, date_to: Optional[date] = None) -> dict:
+    """created_at query for an inclusive range of UTC days; empty if unbounded"""
+    created_at = {}
+    if date_from:
+        created_at["$gte"] = datetime.combine(date_from, time.min)
+    if date_to:
+        created_at["$lt"] = datetime.combine(date_to + timedelta(days=1), time.min)
+    return {"created_at": created_at} if created_at else {}
+
+
+def build_contacts_filter(
+    search: Optional[str] = None,
+    service: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+) -> Tuple[dict, bool]:
+    """Contacts query for the admin list and exports
+
+    Combines the search with an exact service match and a created_at range
+    (both dates inclusive, UTC days). Returns (query, text_search), where
+    text_search means the query uses the text index.
+    """
+    query = {}
+    text_search = False
+    contact_search = build_contact_search(search)
+    if contact_search:
+        query.update(contact_search["query"])
+        text_search = contact_search["mode"] == "text"
+    if service:
+        query["service"] = service
+    query.update(created_at_range(date_from, date_to))
+    return query, text_search
+
+
+async def backfill_contact_search_fields(db, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Add search fields to contacts stored before they existed"""
+    updated = 0
+    cursor = db.contacts.find(
+        {"email_normalized": {"$exists": False}},
+        {"_id": 1, "email": 1, "phone": 1}
+    ).batch_size(batch_size)
+
+    batch = []
+    async for contact in cursor:
+        fields = contact_search_fields(contact.get("email", ""), contact.get("phone", ""))
+        batch.append(UpdateOne({"_id": contact["_id"]}, {"$set": fields}))
+        if len(batch) >= batch_size:
+            await db.contacts.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await db.contacts.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    if updated:
+        logger.info(f"✅ Backfilled search fields for {updated} contacts")
+    return updated
@@ -0,0 +1,212 @@
+"""
+Transactional email outbox.
+
+Request handlers insert emails into the ``email_outbox`` collection instead
+of talking to SMTP. A background sender (started with the app, or as a
+standalone worker) claims pending messages atomically, sends them, and
+retries failures with exponential backoff. Messages that keep failing end
+up in the ``dead`` state for an admin to inspect and retry.
+
+Standalone worker (from backend/):
+    python email_outbox.py          # run until stopped
+    python email_outbox.py --once   # drain what is due and exit
+Set EMAIL_OUTBOX_IN_APP=false on the API when running the standalone worker.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+
+from background_tasks import BackgroundTask
+
+# Standalone workers need the same settings as the API before email_service loads
+load_dotenv(Path(__file__).parent / '.env')
+
+from email_service import send_contact_email, send_auto_response_email, send_meeting_request_email
+
+logger = logging.getLogger(__name__)
+
+EMAIL_OUTBOX_IN_APP = os.environ.get('EMAIL_OUTBOX_IN_APP', 'true').lower() == 'true'
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+EMAIL_OUTBOX_BASE_DELAY_SECONDS = float(os.environ.get('EMAIL_OUTBOX_BASE_DELAY_SECONDS', 30))
+EMAIL_OUTBOX_MAX_DELAY_SECONDS = float(os.environ.get('EMAIL_OUTBOX_MAX_DELAY_SECONDS', 3600))
+EMAIL_OUTBOX_POLL_INTERVAL_SECONDS = float(os.environ.get('EMAIL_OUTBOX_POLL_INTERVAL_SECONDS', 10))
+# How long a claimed message stays locked before another sender may retry it
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+
+# Outbox message kind -> sender function (called with the stored payload)
+EMAIL_SENDERS = {
+    "contact_notification": send_contact_email,
+    "contact_auto_response": send_auto_response_email,
+    "meeting_request": send_meeting_request_email,
+}
+
+# Senders running in this process, woken up when new mail is enqueued
+_local_senders: List["EmailOutboxSender"] = []
+
+
+def backoff_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt, with jitter"""
+    delay = min(EMAIL_OUTBOX_BASE_DELAY_SECONDS * (2 ** (attempts - 1)), EMAIL_OUTBOX_MAX_DELAY_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def enqueue_emails(db, messages: List[Tuple[str, dict]]) -> List[str]:
+    """Insert (kind, payload) messages into the outbox and wake local senders"""
+    now = datetime.utcnow()
+    docs = []
+    for kind, payload in messages:
+        if kind not in EMAIL_SENDERS:
+            raise ValueError(f"Unknown email kind: {kind}")
+        docs.append({
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "locked_until": None,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now
+        })
+    await db.email_outbox.insert_many(docs)
+    for sender in _local_senders:
+        sender.wake()
+    return [doc["id"] for doc in docs]
+
+
+class EmailOutboxSender(BackgroundTask):
+    """Drain the email outbox with retries and a dead-letter state"""
+
+    error_label = "Email outbox"
+
+    def __init__(self, db, poll_interval: float = EMAIL_OUTBOX_POLL_INTERVAL_SECONDS):
+        super().__init__(poll_interval)
+        self.db = db
+        self.sent = 0
+        self.failed = 0
+
+    def start(self):
+        """Start draining in a background task"""
+        if not self._tasks:
+            _local_senders.append(self)
+        return super().start()
+
+    async def stop(self):
+        """Cancel the background task"""
+        if self in _local_senders:
+            _local_senders.remove(self)
+        await super().stop()
+
+    async def run_once(self):
+        await self.drain()
+
+    async def drain(self) -> int:
+        """Send every message that is due; return how many were attempted"""
+        attempted = 0
+        while True:
+            message = await self.claim_next()
+            if message is None:
+                return attempted
+            attempted += 1
+            await self.deliver(message)
+
+    async def claim_next(self) -> Optional[dict]:
+        """Atomically claim one due message (or one whose lease expired)"""
+        now = datetime.utcnow()
+        return await self.db.email_outbox.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "sending", "locked_until": {"$lte": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "status": "sending",
+                    "locked_until": now + timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def deliver(self, message: dict):
+        """Send one claimed message and record the outcome"""
+        try:
+            await EMAIL_SENDERS[message["kind"]](**message["payload"])
+        except Exception as e:
+            await self._record_failure(message, str(e))
+            return
+
+        await self.db.email_outbox.update_one(
+            {"id": message["id"]},
+            {"$set": {
+                "status": "sent",
+                "sent_at": datetime.utcnow(),
+                "locked_until": None,
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        self.sent += 1
+        logger.info(f"✅ Outbox email sent: {message['kind']} ({message['id']})")
+
+    async def _record_failure(self, message: dict, error: str):
+        self.failed += 1
+        now = datetime.utcnow()
+        attempts = message.get("attempts", 1)
+
+        if attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+            update = {"status": "dead", "locked_until": None, "last_error": error, "updated_at": now}
+            logger.error(f"❌ Outbox email dead after {attempts} attempts: {message['kind']} ({message['id']}): {error}")
+        else:
+            next_attempt_at = now + timedelta(seconds=backoff_delay(attempts))
+            update = {
+                "status": "pending",
+                "next_attempt_at": next_attempt_at,
+                "locked_until": None,
+                "last_error": error,
+                "updated_at": now
+            }
+            logger.warning(f"⚠️ Outbox email attempt {attempts} failed, retrying at {next_attempt_at}: {error}")
+
+        await self.db.email_outbox.update_one({"id": message["id"]}, {"$set": update})
+
+
+async def _main(once: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ.get('MONGO_URL'))
+    db = client[os.environ.get('DB_NAME', 'mita_ict')]
+    sender = EmailOutboxSender(db)
+    try:
+        if once:
+            attempted = await sender.drain()
+            logger.info(f"✅ Outbox drained: {attempted} attempted, {sender.sent} sent, {sender.failed} failed")
+        else:
+            logger.info("✅ Email outbox worker started")
+            await asyncio.gather(*sender.start())
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Email outbox worker")
+    parser.add_argument("--once", action="store_true", help="drain due messages and exit")
+    args = parser.parse_args()
+
+    asyncio.run(_main(args.once))
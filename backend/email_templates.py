@@ -0,0 +1,78 @@
+"""
+Compiled email templates.
+
+Each email kind has a ``.html`` and a ``.txt`` template in
+``templates/email/`` with ``{{ field }}`` placeholders. A template is read
+and split into its static chunks and field slots once, on first use, and
+cached; rendering only converts and escapes the field values and joins the
+pieces. HTML templates escape every value, so user input (names, comments)
+can't inject markup. Templates have no logic: callers pass display-ready
+values (defaults, service labels).
+"""
+
+import html
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+TEMPLATE_DIR = Path(__file__).parent / 'templates' / 'email'
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Subject lines are plain text templates
+EMAIL_SUBJECTS = {
+    "contact_notification": "New Contact Form Submission from {{ name }}",
+    "contact_auto_response": "Thank You for Contacting MITAICT",
+    "meeting_request": "🗓️ Meeting Request from {{ name }} - Approval Required",
+}
+
+
+def escape_html(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def escape_header(value) -> str:
+    # A newline in a header value would start a new header
+    return " ".join(str(value).split())
+
+
+class CompiledTemplate:
+    """Template split once into static text and the fields between it"""
+
+    def __init__(self, source: str, escape=str):
+        parts = PLACEHOLDER_PATTERN.split(source)
+        # parts alternates static text and field names: [text, field, text, ..., text]
+        self.static: List[str] = parts[0::2]
+        self.fields: List[str] = parts[1::2]
+        self.escape = escape
+
+    def render(self, context: dict) -> str:
+        """Fill in the fields; a missing field raises KeyError"""
+        static, escape = self.static, self.escape
+        out = [static[0]]
+        for i, field in enumerate(self.fields, 1):
+            out.append(escape(context[field]))
+            out.append(static[i])
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> CompiledTemplate:
+    """Load and compile templates/email/<name> once"""
+    source = (TEMPLATE_DIR / name).read_text(encoding="utf-8")
+    return CompiledTemplate(source, escape_html if name.endswith(".html") else str)
+
+
+@lru_cache(maxsize=None)
+def get_subject_template(kind: str) -> CompiledTemplate:
+    return CompiledTemplate(EMAIL_SUBJECTS[kind], escape_header)
+
+
+def render_email(kind: str, context: dict) -> Tuple[str, str, str]:
+    """Render (subject, text body, HTML body) for an email kind"""
+    return (
+        get_subject_template(kind).render(context),
+        get_template(f"{kind}.txt").render(context),
+        get_template(f"{kind}.html").render(context),
+    )
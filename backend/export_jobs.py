@@ -0,0 +1,255 @@
+"""
+Background export jobs.
+
+Large exports shouldn't hold an HTTP request open for minutes. Creating an
+export inserts a job into ``export_jobs``; an ``ExportJobRunner`` in the API
+process claims pending jobs, writes the artifact into EXPORT_DIR and marks
+the job ready. Clients poll the job and download the file once it's ready.
+
+Artifacts are reused: each job records the data version of its collection
+(bumped by ``stats_counters.record_change`` on every write), and a request
+for the same dataset, format and filters at an unchanged data version gets
+the existing job back instead of a new render. Jobs and their files expire
+EXPORT_ARTIFACT_TTL_SECONDS after they were last built or reused.
+
+Artifacts live on local disk; with several API containers EXPORT_DIR must
+be a shared volume.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from background_tasks import BackgroundTask
+from contact_search import build_contacts_filter, created_at_range
+from exports import EXPORT_DATASETS, EXPORT_FORMATS, RenderPoolBusy, remove_file, render_pool, write_export
+from stats_counters import get_data_version
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.environ.get('EXPORT_DIR') or os.path.join(tempfile.gettempdir(), 'mita_exports')
+EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+EXPORT_JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('EXPORT_JOB_POLL_INTERVAL_SECONDS', 5))
+EXPORT_ARTIFACT_TTL_SECONDS = float(os.environ.get('EXPORT_ARTIFACT_TTL_SECONDS', 86400))
+# How long a claimed job stays locked before another runner may retry it
+EXPORT_JOB_LEASE_SECONDS = 1800
+EXPORT_JOB_MAX_ATTEMPTS = 3
+
+# Job statuses whose artifact is, or will be, usable
+LIVE_STATUSES = ["pending", "running", "ready"]
+
+# Runners in this process, woken up when a job is created
+_local_runners: List["ExportJobRunner"] = []
+
+
+def export_cache_key(dataset: str, export_format: str, filters: dict) -> str:
+    """Identical exports share a key"""
+    return f"{dataset}:{export_format}:{json.dumps(filters, sort_keys=True)}"
+
+
+def export_query(job: dict) -> dict:
+    """MongoDB query for a job's filters"""
+    filters = job.get("filters") or {}
+    date_from = date.fromisoformat(filters["date_from"]) if filters.get("date_from") else None
+    date_to = date.fromisoformat(filters["date_to"]) if filters.get("date_to") else None
+    if job["dataset"] == "contacts":
+        query, _ = build_contacts_filter(filters.get("search"), filters.get("service"), date_from, date_to)
+        return query
+    return created_at_range(date_from, date_to)
+
+
+def job_view(job: dict) -> dict:
+    """Job fields for API responses (no paths or lease state)"""
+    view = {
+        key: job.get(key)
+        for key in (
+            "id", "dataset", "format", "filters", "status", "rows", "size", "error",
+            "created_at", "started_at", "finished_at", "expires_at"
+        )
+    }
+    view["download_url"] = f"/api/admin/exports/{job['id']}/download" if job["status"] == "ready" else None
+    return view
+
+
+def download_filename(job: dict) -> str:
+    return f"{job['dataset']}_{job['created_at'].strftime('%Y%m%d')}{EXPORT_FORMATS[job['format']]['extension']}"
+
+
+async def create_export_job(db, dataset: str, export_format: str, filters: dict) -> Tuple[dict, bool]:
+    """Create an export job, or reuse an identical one over unchanged data
+
+    Returns (job, reused).
+    """
+    cache_key = export_cache_key(dataset, export_format, filters)
+    data_version = await get_data_version(db, EXPORT_DATASETS[dataset]["collection"])
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=EXPORT_ARTIFACT_TTL_SECONDS)
+
+    existing = await db.export_jobs.find_one(
+        {"cache_key": cache_key, "data_version": data_version, "status": {"$in": LIVE_STATUSES}},
+        {"_id": 0},
+        sort=[("created_at", -1)]
+    )
+    if existing and (existing["status"] != "ready" or os.path.exists(existing["path"])):
+        # Same export of the same data: keep it around for another TTL
+        await db.export_jobs.update_one({"id": existing["id"]}, {"$set": {"expires_at": expires_at}})
+        existing["expires_at"] = expires_at
+        logger.info(f"✅ Export job reused: {existing['id']} ({cache_key})")
+        return existing, True
+
+    job_id = str(uuid.uuid4())
+    job = {
+        "id": job_id,
+        "dataset": dataset,
+        "format": export_format,
+        "filters": filters,
+        "cache_key": cache_key,
+        "data_version": data_version,
+        "status": "pending",
+        "path": os.path.join(EXPORT_DIR, f"{job_id}{EXPORT_FORMATS[export_format]['extension']}"),
+        "rows": None,
+        "size": None,
+        "error": None,
+        "attempts": 0,
+        "locked_until": None,
+        "created_at": now,
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": expires_at
+    }
+    await db.export_jobs.insert_one(dict(job))
+    for runner in _local_runners:
+        runner.wake()
+    logger.info(f"✅ Export job created: {job_id} ({cache_key})")
+    return job, False
+
+
+class ExportJobRunner(BackgroundTask):
+    """Run pending export jobs in the background and expire old artifacts"""
+
+    error_label = "Export job runner"
+
+    def __init__(self, db, workers: int = EXPORT_JOB_WORKERS, poll_interval: float = EXPORT_JOB_POLL_INTERVAL_SECONDS):
+        super().__init__(poll_interval, concurrency=workers)
+        self.db = db
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start `concurrency` background tasks"""
+        if not self._tasks:
+            _local_runners.append(self)
+        return super().start()
+
+    async def stop(self):
+        """Cancel the background tasks; interrupted jobs go back to pending"""
+        if self in _local_runners:
+            _local_runners.remove(self)
+        await super().stop()
+
+    async def run_once(self):
+        await self.drain()
+        await self.expire_jobs()
+
+    async def drain(self) -> int:
+        """Run jobs until none are pending or renders are saturated; return how many ran"""
+        ran = 0
+        while True:
+            job = await self.claim_next()
+            if job is None:
+                return ran
+            if not await self.run_job(job):
+                return ran
+            ran += 1
+
+    async def claim_next(self) -> Optional[dict]:
+        """Atomically claim the oldest pending job (or one whose lease expired)
+
+        While the render pool is full only CSV jobs are claimed; XLSX and PDF
+        jobs stay pending instead of being claimed and put back every poll.
+        """
+        now = datetime.utcnow()
+        query = {
+            "$or": [
+                {"status": "pending"},
+                {"status": "running", "locked_until": {"$lte": now}}
+            ],
+            "attempts": {"$lt": EXPORT_JOB_MAX_ATTEMPTS}
+        }
+        if not render_pool.has_capacity():
+            query["format"] = {"$nin": [name for name, spec in EXPORT_FORMATS.items() if spec["rendered"]]}
+        return await self.db.export_jobs.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": "running",
+                    "started_at": now,
+                    "locked_until": now + timedelta(seconds=EXPORT_JOB_LEASE_SECONDS)
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def run_job(self, job: dict) -> bool:
+        """Build a claimed job's artifact; False if it had to be put back (render pool busy)"""
+        path = job["path"]
+        # Per attempt, so a retry after an expired lease can't write into a live render's file
+        partial = f"{path}.{job['attempts']}.part"
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        try:
+            rows = await write_export(self.db, job["dataset"], job["format"], partial, export_query(job))
+            os.replace(partial, path)
+        except (RenderPoolBusy, asyncio.CancelledError) as e:
+            remove_file(partial)
+            await self.db.export_jobs.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": "pending", "locked_until": None}, "$inc": {"attempts": -1}}
+            )
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+        except Exception as e:
+            remove_file(partial)
+            await self._finish(job, {"status": "failed", "error": str(e)})
+            self.failed += 1
+            logger.error(f"❌ Export job failed: {job['id']} ({job['cache_key']}): {str(e)}")
+            return True
+
+        await self._finish(job, {"status": "ready", "rows": rows, "size": os.path.getsize(path)})
+        self.completed += 1
+        logger.info(f"✅ Export job ready: {job['id']} ({job['cache_key']}, {rows} rows)")
+        return True
+
+    async def _finish(self, job: dict, update: dict):
+        now = datetime.utcnow()
+        update.update({
+            "finished_at": now,
+            "locked_until": None,
+            "expires_at": now + timedelta(seconds=EXPORT_ARTIFACT_TTL_SECONDS)
+        })
+        await self.db.export_jobs.update_one({"id": job["id"]}, {"$set": update})
+
+    async def expire_jobs(self) -> int:
+        """Delete expired jobs with their files; fail jobs that ran out of attempts"""
+        now = datetime.utcnow()
+        await self.db.export_jobs.update_many(
+            {"status": "running", "locked_until": {"$lte": now}, "attempts": {"$gte": EXPORT_JOB_MAX_ATTEMPTS}},
+            {"$set": {"status": "failed", "error": "Export did not finish", "finished_at": now, "locked_until": None}}
+        )
+        expired = await self.db.export_jobs.find(
+            {"expires_at": {"$lte": now}, "status": {"$ne": "running"}},
+            {"_id": 0, "id": 1, "path": 1}
+        ).to_list(None)
+        for job in expired:
+            remove_file(job["path"])
+            await self.db.export_jobs.delete_one({"id": job["id"]})
+        return len(expired)
@@ -0,0 +1,654 @@
+"""
+Admin data exports.
+
+Exports read MongoDB through a cursor in fixed-size batches, so memory
+stays flat however many rows there are. CSV and NDJSON need no file: rows
+are encoded batch by batch as the response is sent, optionally
+gzip-compressed on the fly.
+
+Excel and PDF rendering is CPU-bound and would stall the event loop, so it
+runs in a bounded process pool. The batches are spooled to a temporary file
+as pickled lists of value tuples (no field names), and the worker process
+renders from that file into the output file. The output is streamed to the
+client in chunks and removed once the response has been sent.
+
+openpyxl and reportlab are heavy and only loaded in the render workers.
+"""
+
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import re
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from bounded_executor import BoundedExecutor, ExecutorBusy
+from lazy_imports import lazy_module
+
+openpyxl = lazy_module("openpyxl")
+xl_cell = lazy_module("openpyxl.cell")
+xl_styles = lazy_module("openpyxl.styles")
+xl_utils = lazy_module("openpyxl.utils")
+pagesizes = lazy_module("reportlab.lib.pagesizes")
+colors = lazy_module("reportlab.lib.colors")
+platypus = lazy_module("reportlab.platypus")
+rl_styles = lazy_module("reportlab.lib.styles")
+rl_utils = lazy_module("reportlab.lib.utils")
+pdfmetrics = lazy_module("reportlab.pdfbase.pdfmetrics")
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+STREAM_CHUNK_SIZE = 64 * 1024
+EXPORT_GZIP_LEVEL = int(os.environ.get('EXPORT_GZIP_LEVEL', 6))
+# Worker processes rendering Excel / PDF, and renders allowed to wait for one
+EXPORT_RENDER_WORKERS = int(os.environ.get('EXPORT_RENDER_WORKERS', 2))
+EXPORT_RENDER_MAX_PENDING = int(os.environ.get('EXPORT_RENDER_MAX_PENDING', 4))
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MEDIA_TYPE = 'text/csv; charset=utf-8'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+# (header, document field, column width)
+Column = Tuple[str, str, int]
+
+CONTACT_COLUMNS: List[Column] = [
+    ("Name", "name", 20),
+    ("Email", "email", 30),
+    ("Phone", "phone", 15),
+    ("Service", "service", 25),
+    ("Comment", "comment", 40),
+    ("Date", "created_at", 18),
+]
+
+# Raw fields for CSV / NDJSON exports, in column order
+CONTACT_EXPORT_FIELDS = ["id", "name", "email", "phone", "service", "comment", "created_at"]
+
+# Widths in points; A4 minus margins leaves 535
+PDF_CONTACT_COLUMNS: List[Column] = [
+    ("Name", "name", 80),
+    ("Email", "email", 115),
+    ("Phone", "phone", 65),
+    ("Service", "service", 70),
+    ("Comment", "comment", 150),
+    ("Date", "created_at", 55),
+]
+
+CHAT_COLUMNS: List[Column] = [
+    ("Name", "lead_name", 20),
+    ("Email", "lead_email", 30),
+    ("Phone", "lead_phone", 15),
+    ("Interest", "lead_interest", 30),
+    ("Lead Captured", "lead_captured", 14),
+    ("Started", "created_at", 18),
+    ("Last Activity", "updated_at", 18),
+]
+CHAT_EXPORT_FIELDS = [
+    "id", "lead_name", "lead_email", "lead_phone", "lead_interest", "lead_captured", "created_at", "updated_at"
+]
+PDF_CHAT_COLUMNS: List[Column] = [
+    ("Name", "lead_name", 85),
+    ("Email", "lead_email", 120),
+    ("Phone", "lead_phone", 70),
+    ("Interest", "lead_interest", 160),
+    ("Lead", "lead_captured", 35),
+    ("Date", "created_at", 65),
+]
+
+MEETING_COLUMNS: List[Column] = [
+    ("Name", "name", 20),
+    ("Email", "email", 30),
+    ("Phone", "phone", 15),
+    ("Preferred Time", "preferred_datetime", 22),
+    ("Topic", "topic", 30),
+    ("Status", "status", 12),
+    ("Admin Notes", "admin_notes", 30),
+    ("Date", "created_at", 18),
+]
+MEETING_EXPORT_FIELDS = [
+    "id", "session_id", "name", "email", "phone", "preferred_datetime", "topic", "status", "admin_notes", "created_at"
+]
+PDF_MEETING_COLUMNS: List[Column] = [
+    ("Name", "name", 75),
+    ("Email", "email", 105),
+    ("Preferred Time", "preferred_datetime", 75),
+    ("Topic", "topic", 110),
+    ("Status", "status", 45),
+    ("Notes", "admin_notes", 70),
+    ("Date", "created_at", 55),
+]
+
+# Exportable datasets: collection, raw fields (CSV / NDJSON), Excel and PDF columns, titles
+EXPORT_DATASETS = {
+    "contacts": {
+        "collection": "contacts",
+        "fields": CONTACT_EXPORT_FIELDS,
+        "columns": CONTACT_COLUMNS,
+        "pdf_columns": PDF_CONTACT_COLUMNS,
+        "sheet": "Contacts",
+        "title": "MITA ICT - Contact Submissions",
+    },
+    "chats": {
+        "collection": "chat_sessions",
+        "fields": CHAT_EXPORT_FIELDS,
+        "columns": CHAT_COLUMNS,
+        "pdf_columns": PDF_CHAT_COLUMNS,
+        "sheet": "Chat Sessions",
+        "title": "MITA ICT - Chat Sessions",
+    },
+    "meetings": {
+        "collection": "meeting_requests",
+        "fields": MEETING_EXPORT_FIELDS,
+        "columns": MEETING_COLUMNS,
+        "pdf_columns": PDF_MEETING_COLUMNS,
+        "sheet": "Meeting Requests",
+        "title": "MITA ICT - Meeting Requests",
+    },
+}
+
+# rendered: built in the render pool rather than streamed
+EXPORT_FORMATS = {
+    "csv": {"extension": ".csv", "media_type": CSV_MEDIA_TYPE, "rendered": False},
+    "xlsx": {"extension": ".xlsx", "media_type": XLSX_MEDIA_TYPE, "rendered": True},
+    "pdf": {"extension": ".pdf", "media_type": "application/pdf", "rendered": True},
+}
+
+EXPORT_SORT = [("created_at", -1), ("id", -1)]
+
+# Control characters that are not allowed in XLSX cell text
+ILLEGAL_XLSX_CHARACTERS = re.compile(r"[\000-\010]|[\013-\014]|[\016-\037]")
+
+
+def column_fields(columns: Sequence[Column]) -> List[str]:
+    return [field for _, field, _ in columns]
+
+
+def projection_for(fields: Sequence[str]) -> Dict[str, int]:
+    projection = {"_id": 0}
+    projection.update({field: 1 for field in fields})
+    return projection
+
+
+def format_value(value) -> str:
+    """Cell text for a document value"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    return str(value)
+
+
+async def iter_batches(cursor, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Group documents from a Motor cursor into lists of batch_size"""
+    batch = []
+    async for doc in cursor.batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_cursor(db, collection: str, query: Optional[dict], fields: Sequence[str]):
+    """Cursor over a collection in export order, newest first"""
+    return db[collection].find(query or {}, projection_for(fields)).sort(EXPORT_SORT)
+
+
+def contacts_cursor(db, query: Optional[dict] = None, fields: Sequence[str] = CONTACT_EXPORT_FIELDS):
+    return export_cursor(db, "contacts", query, fields)
+
+
+def new_temp_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_file(path: str, chunk_size: int = STREAM_CHUNK_SIZE, delete: bool = True):
+    """Yield a file in chunks without blocking the event loop, then remove it"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = await run_in_threadpool(f.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        if delete:
+            remove_file(path)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows a gzip response"""
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() not in ("gzip", "x-gzip", "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = EXPORT_GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Compress a byte stream into one gzip member as it is produced"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ==================== RENDER POOL ====================
+
+class RenderPoolBusy(ExecutorBusy):
+    """Every render worker is busy and the wait queue is full"""
+
+
+def new_render_executor(workers: int) -> ProcessPoolExecutor:
+    # Spawned, not forked, so workers don't inherit the event loop or database client threads
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class RenderPool(BoundedExecutor):
+    """Bounded process pool for CPU-bound document rendering
+
+    At most `workers` renders run at once and `max_pending` more may wait;
+    beyond that `run` raises RenderPoolBusy instead of queueing without
+    limit. fn and args passed to `run` must be picklable.
+    """
+
+    def __init__(self, workers: int = EXPORT_RENDER_WORKERS, max_pending: int = EXPORT_RENDER_MAX_PENDING):
+        super().__init__(new_render_executor, workers, max_pending, RenderPoolBusy, "renders")
+
+
+render_pool = RenderPool()
+
+
+async def spool_documents(batches: AsyncIterator[List[dict]], fields: Sequence[str]) -> Tuple[str, int]:
+    """Write batches to a temp file as pickled lists of value tuples; returns (path, rows)"""
+    path = new_temp_path(".spool")
+    rows = 0
+    try:
+        with open(path, 'wb') as f:
+            async for batch in batches:
+                data = pickle.dumps([tuple(doc.get(field) for field in fields) for doc in batch], pickle.HIGHEST_PROTOCOL)
+                await run_in_threadpool(f.write, data)
+                rows += len(batch)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path, rows
+
+
+def read_spool(path: str) -> Iterator[List[tuple]]:
+    """Batches of value tuples written by spool_documents"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+async def render_export(render: Callable, path: str, batches: AsyncIterator[List[dict]],
+                        columns: Sequence[Column], title: str) -> int:
+    """Spool batches and render them to path in the pool; returns the number of rows
+
+    The render slot is taken before spooling, so a busy pool is reported
+    without first reading the whole export from the database.
+    """
+    render_pool.reserve()
+    try:
+        spool_path, _ = await spool_documents(batches, column_fields(columns))
+    except BaseException:
+        render_pool.release()
+        raise
+    try:
+        return await render_pool.run(render, spool_path, path, list(columns), title, reserved=True)
+    finally:
+        remove_file(spool_path)
+
+
+# ==================== CSV / NDJSON ====================
+
+def raw_value(value):
+    """Dates as ISO 8601 so CSV and NDJSON round-trip exactly"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def csv_chunks(batches: AsyncIterator[List[dict]], fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode batches of documents as CSV with a header row, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    yield buffer.getvalue().encode('utf-8')
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([raw_value(doc.get(field)) for field in fields] for doc in batch)
+        yield buffer.getvalue().encode('utf-8')
+
+
+async def write_csv(path: str, batches: AsyncIterator[List[dict]], fields: Sequence[str]) -> int:
+    """Write batches of documents to a CSV file; returns the number of rows"""
+    rows = 0
+
+    async def counted():
+        nonlocal rows
+        async for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    with open(path, 'wb') as f:
+        async for chunk in csv_chunks(counted(), fields):
+            await run_in_threadpool(f.write, chunk)
+    return rows
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """Encode batches of documents as newline-delimited JSON, one chunk per batch"""
+    async for batch in batches:
+        lines = [json.dumps(doc, default=json_default, ensure_ascii=False, separators=(",", ":")) for doc in batch]
+        yield ("\n".join(lines) + "\n").encode('utf-8')
+
+
+# ==================== EXCEL ====================
+
+class XlsxWriter:
+    """Write-only workbook: rows go straight to a temp file as they are appended"""
+
+    def __init__(self, columns: Sequence[Column], title: str):
+        self.columns = columns
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title)
+        self.rows = 0
+
+        # Column widths must be set before the first row is written
+        for index, (_, _, width) in enumerate(columns, 1):
+            self.sheet.column_dimensions[xl_utils.get_column_letter(index)].width = width
+
+        header_fill = xl_styles.PatternFill(start_color='00FFD1', end_color='00FFD1', fill_type='solid')
+        header_font = xl_styles.Font(bold=True, color='000000')
+        header_alignment = xl_styles.Alignment(horizontal='center')
+        header = []
+        for name, _, _ in columns:
+            cell = xl_cell.WriteOnlyCell(self.sheet, value=name)
+            cell.fill = header_fill
+            cell.font = header_font
+            cell.alignment = header_alignment
+            header.append(cell)
+        self.sheet.append(header)
+
+    def append_rows(self, rows: List[tuple]):
+        for row in rows:
+            self.sheet.append([ILLEGAL_XLSX_CHARACTERS.sub('', format_value(value)) for value in row])
+        self.rows += len(rows)
+
+    def save(self, path: str):
+        self.workbook.save(path)
+
+
+def render_xlsx(spool_path: str, path: str, columns: Sequence[Column], title: str) -> int:
+    """Render a spool file to XLSX (runs in a render worker); returns the number of rows"""
+    writer = XlsxWriter(columns, title)
+    for rows in read_spool(spool_path):
+        writer.append_rows(rows)
+    writer.save(path)
+    return writer.rows
+
+
+async def write_xlsx(path: str, batches: AsyncIterator[List[dict]], columns: Sequence[Column], title: str) -> int:
+    """Write batches of documents to an XLSX file in the render pool; returns the number of rows"""
+    return await render_export(render_xlsx, path, batches, columns, title)
+
+
+# ==================== PDF ====================
+
+PDF_MARGIN = 30
+PDF_FONT = 'Helvetica'
+PDF_FONT_SIZE = 8
+PDF_CELL_PADDING = 3
+# Rows per body table: small tables lay out in constant time, and the
+# page header is drawn on the canvas instead of repeated per table
+PDF_ROWS_PER_TABLE = 50
+# A row can't be split across pages, so a cell never wraps past this
+PDF_MAX_CELL_LINES = 12
+PDF_MAX_CELL_CHARS = 2400
+PDF_ACCENT = '#00FFD1'
+
+
+def pdf_value(value) -> str:
+    if value is None or value == '':
+        return 'N/A'
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+
+def text_width(text: str) -> float:
+    return pdfmetrics.stringWidth(text, PDF_FONT, PDF_FONT_SIZE)
+
+
+def break_long_line(line: str, width: float) -> List[str]:
+    """Split a line with no break opportunity (an email address, a URL) by characters"""
+    if text_width(line) <= width:
+        return [line]
+    pieces, current, current_width = [], '', 0.0
+    for char in line:
+        char_width = text_width(char)
+        if current and current_width + char_width > width:
+            pieces.append(current)
+            current, current_width = '', 0.0
+        current += char
+        current_width += char_width
+    pieces.append(current)
+    return pieces
+
+
+def truncate_line(line: str, width: float, marker: str = ' ...') -> str:
+    """The line with a marker appended, shortened to fit the width"""
+    while line and text_width(line + marker) > width:
+        line = line[:-1]
+    return line + marker
+
+
+def wrap_cell(value, width: float) -> str:
+    """Cell text wrapped to the column width, at most PDF_MAX_CELL_LINES lines"""
+    text = pdf_value(value)
+    # More text than the line cap can show is cut before wrapping
+    truncated = len(text) > PDF_MAX_CELL_CHARS
+    lines = []
+    for paragraph in text[:PDF_MAX_CELL_CHARS].splitlines() or ['']:
+        for line in rl_utils.simpleSplit(paragraph, PDF_FONT, PDF_FONT_SIZE, width) or ['']:
+            lines.extend(break_long_line(line, width))
+        if len(lines) > PDF_MAX_CELL_LINES:
+            lines = lines[:PDF_MAX_CELL_LINES]
+            truncated = True
+            break
+    if truncated:
+        lines[-1] = truncate_line(lines[-1], width)
+    return '\n'.join(lines)
+
+
+class PdfTableWriter:
+    """Paged PDF table: rows go into fixed-size tables under a per-page header
+
+    Styles, column widths and the header are built once; the title and the
+    column header are drawn on the page canvas. Cell text is wrapped to its
+    column width up front, so the tables hold plain strings.
+    """
+
+    def __init__(self, path: str, columns: Sequence[Column], title: str):
+        self.columns = columns
+        self.title = title
+        self.generated = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        self.rows = 0
+        self.story = []
+
+        self.widths = [width for _, _, width in columns]
+        self.text_widths = [width - 2 * PDF_CELL_PADDING for width in self.widths]
+        page_width, page_height = pagesizes.A4
+        self.page_width, self.page_height = page_width, page_height
+
+        padding = [
+            ('LEFTPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+            ('RIGHTPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+            ('TOPPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), PDF_CELL_PADDING),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#333333')),
+        ]
+        self.body_style = platypus.TableStyle(padding + [
+            ('FONTNAME', (0, 0), (-1, -1), PDF_FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), PDF_FONT_SIZE),
+            ('LEADING', (0, 0), (-1, -1), PDF_FONT_SIZE + 2),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor('#1a1a1a'), colors.HexColor('#222222')]),
+        ])
+        self.header = platypus.Table([[name for name, _, _ in columns]], colWidths=self.widths)
+        self.header.setStyle(platypus.TableStyle(padding + [
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(PDF_ACCENT)),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ]))
+        _, self.header_height = self.header.wrap(page_width, page_height)
+        self.title_height = 46
+
+        content_width = page_width - 2 * PDF_MARGIN
+        content_height = page_height - 2 * PDF_MARGIN
+        first_frame = platypus.Frame(
+            PDF_MARGIN, PDF_MARGIN, content_width, content_height - self.title_height - self.header_height,
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0
+        )
+        later_frame = platypus.Frame(
+            PDF_MARGIN, PDF_MARGIN, content_width, content_height - self.header_height,
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0
+        )
+        self.doc = platypus.BaseDocTemplate(path, pagesize=pagesizes.A4, title=title)
+        self.doc.addPageTemplates([
+            platypus.PageTemplate('first', [first_frame], onPage=self._draw_first_page, autoNextPageTemplate='later'),
+            platypus.PageTemplate('later', [later_frame], onPage=self._draw_page),
+        ])
+
+    def _draw_first_page(self, canvas, doc):
+        top = self.page_height - PDF_MARGIN
+        canvas.saveState()
+        canvas.setFillColor(colors.HexColor(PDF_ACCENT))
+        canvas.setFont('Helvetica-Bold', 18)
+        canvas.drawString(PDF_MARGIN, top - 18, self.title)
+        canvas.setFillColor(colors.black)
+        canvas.setFont(PDF_FONT, 10)
+        canvas.drawString(PDF_MARGIN, top - 36, self.generated)
+        canvas.restoreState()
+        self._draw_page(canvas, doc, top - self.title_height)
+
+    def _draw_page(self, canvas, doc, top: Optional[float] = None):
+        """Column header at the top of the frame, page number at the bottom"""
+        if top is None:
+            top = self.page_height - PDF_MARGIN
+        self.header.drawOn(canvas, PDF_MARGIN, top - self.header_height)
+        canvas.saveState()
+        canvas.setFont(PDF_FONT, 7)
+        canvas.drawRightString(self.page_width - PDF_MARGIN, PDF_MARGIN / 2, f"Page {doc.page}")
+        canvas.restoreState()
+
+    def append_rows(self, rows: List[tuple]):
+        widths = self.text_widths
+        for start in range(0, len(rows), PDF_ROWS_PER_TABLE):
+            chunk = rows[start:start + PDF_ROWS_PER_TABLE]
+            data = [[wrap_cell(value, widths[i]) for i, value in enumerate(row)] for row in chunk]
+            table = platypus.Table(data, colWidths=self.widths)
+            table.setStyle(self.body_style)
+            self.story.append(table)
+        self.rows += len(rows)
+
+    def save(self):
+        if not self.story:
+            self.story.append(platypus.Paragraph("No records", rl_styles.getSampleStyleSheet()['Normal']))
+        self.doc.build(self.story)
+
+
+def render_pdf(spool_path: str, path: str, columns: Sequence[Column], title: str) -> int:
+    """Render a spool file to a paged PDF table (runs in a render worker); returns the number of rows"""
+    writer = PdfTableWriter(path, columns, title)
+    for rows in read_spool(spool_path):
+        writer.append_rows(rows)
+    writer.save()
+    return writer.rows
+
+
+# ==================== DATASET EXPORTS ====================
+
+async def write_export(db, dataset: str, export_format: str, path: str, query: Optional[dict] = None) -> int:
+    """Write a dataset to path as CSV, XLSX or PDF; returns the number of rows"""
+    spec = EXPORT_DATASETS[dataset]
+    collection = spec["collection"]
+    if export_format == "csv":
+        batches = iter_batches(export_cursor(db, collection, query, spec["fields"]))
+        return await write_csv(path, batches, spec["fields"])
+    if export_format == "xlsx":
+        columns = spec["columns"]
+        batches = iter_batches(export_cursor(db, collection, query, column_fields(columns)))
+        return await render_export(render_xlsx, path, batches, columns, spec["sheet"])
+    if export_format == "pdf":
+        columns = spec["pdf_columns"]
+        batches = iter_batches(export_cursor(db, collection, query, column_fields(columns)))
+        return await render_export(render_pdf, path, batches, columns, spec["title"])
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+async def export_to_temp_file(db, dataset: str, export_format: str, query: Optional[dict] = None) -> Tuple[str, int]:
+    """Write a dataset export to a temporary file; returns (path, rows)"""
+    path = new_temp_path(EXPORT_FORMATS[export_format]["extension"])
+    try:
+        rows = await write_export(db, dataset, export_format, path, query)
+    except BaseException:
+        remove_file(path)
+        raise
+    return path, rows
+
+
+async def export_contacts_xlsx(db, query: Optional[dict] = None) -> Tuple[str, int]:
+    """Write all matching contacts to a temporary XLSX file; returns (path, rows)"""
+    return await export_to_temp_file(db, "contacts", "xlsx", query)
+
+
+async def export_contacts_pdf_file(db, query: Optional[dict] = None) -> Tuple[str, int]:
+    """Render all matching contacts to a temporary PDF; returns (path, rows)"""
+    return await export_to_temp_file(db, "contacts", "pdf", query)
@@ -0,0 +1,65 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+reportlab, openpyxl and emergentintegrations are only needed by exports and
+the chatbot. ``lazy_module`` returns a placeholder that imports the real
+module on first attribute access, so workers that never export or chat
+don't pay the import time or memory. Each first import is timed.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Module name -> seconds spent on its first import
+IMPORT_TIMINGS: Dict[str, float] = {}
+
+_import_lock = threading.Lock()
+
+
+def timed_import(name: str) -> ModuleType:
+    """Import a module, recording how long the first import took"""
+    with _import_lock:
+        if name in IMPORT_TIMINGS:
+            return importlib.import_module(name)
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMINGS[name] = time.perf_counter() - start
+    logger.info(f"📦 Lazily imported {name} in {IMPORT_TIMINGS[name] * 1000:.1f} ms")
+    return module
+
+
+class LazyModule(ModuleType):
+    """Module placeholder that imports the real module on first use"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            self._module = timed_import(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        # Only called for attributes not set on the placeholder itself
+        return getattr(self._load(), attr)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return a placeholder for name that is imported on first attribute access"""
+    return LazyModule(name)
+
+
+def get_import_timings() -> Dict[str, float]:
+    """Return first-import durations in milliseconds"""
+    return {name: round(seconds * 1000, 1) for name, seconds in IMPORT_TIMINGS.items()}
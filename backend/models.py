@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Optional
-from datetime import datetime
+from typing import List, Literal, Optional, Optional
+from datetime import date, datetime
 import uuid
 
 # Service Models
@@ -76,6 +76,12 @@ class AboutContent(BaseModel):
     expertise: Optional[List[dict]] = []
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Public site bundle - everything the SPA needs on first load
+class SiteBundle(BaseModel):
+    services: List[Service] = []
+    saas_products: List[SaasProduct] = []
+    about: Optional[AboutContent] = None
+
 # Admin Models
 class AdminLogin(BaseModel):
     username: str
@@ -194,4 +200,13 @@ class MeetingRequestCreate(BaseModel):
     email: str
     phone: Optional[str] = None
     preferred_datetime: str
-    topic: Optional[str] = None
\ No newline at end of file
+    topic: Optional[str] = None
+
+# Export Job Models
+class ExportJobCreate(BaseModel):
+    format: Literal["pdf", "xlsx", "csv"]
+    dataset: Literal["contacts", "chats", "meetings"]
+    date_from: Optional[date] = None  # created_at range, inclusive UTC days
+    date_to: Optional[date] = None
+    search: Optional[str] = None  # contacts only
+    service: Optional[str] = None  # contacts only
@@ -0,0 +1,203 @@
+"""
+reCAPTCHA verification with a shared HTTP client.
+
+One ``httpx.AsyncClient`` is kept for the life of the app so siteverify
+calls reuse keep-alive connections, and every call has a strict timeout.
+Repeated network failures open a circuit breaker: while it is open the
+contact form fails closed (503) without calling Google, and after a
+cool-down one trial request decides whether to close it again.
+
+reCAPTCHA tokens are single-use. Tokens that were already checked are
+remembered for their lifetime (2 minutes) and replays are rejected without
+a network call.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RECAPTCHA_VERIFY_URL = os.environ.get('RECAPTCHA_VERIFY_URL', 'https://www.google.com/recaptcha/api/siteverify')
+RECAPTCHA_TIMEOUT_SECONDS = float(os.environ.get('RECAPTCHA_TIMEOUT_SECONDS', 5))
+RECAPTCHA_BREAKER_THRESHOLD = int(os.environ.get('RECAPTCHA_BREAKER_THRESHOLD', 5))
+RECAPTCHA_BREAKER_RESET_SECONDS = float(os.environ.get('RECAPTCHA_BREAKER_RESET_SECONDS', 30))
+# Google rejects tokens older than two minutes, so replays only need remembering that long
+RECAPTCHA_TOKEN_TTL_SECONDS = 120
+RECAPTCHA_TOKEN_CACHE_SIZE = 10000
+
+PLACEHOLDER_SECRET = 'YOUR_RECAPTCHA_SECRET_KEY'
+
+
+class RecaptchaUnavailable(Exception):
+    """The verify endpoint is unreachable or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Open after consecutive failures, allow one trial call after a cool-down"""
+
+    def __init__(self, threshold: int = RECAPTCHA_BREAKER_THRESHOLD, reset_timeout: float = RECAPTCHA_BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Whether a call may go out now"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("✅ reCAPTCHA circuit breaker closed")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            # A failed trial restarts the cool-down
+            if self.opened_at is None:
+                logger.warning(f"⚠️ reCAPTCHA circuit breaker opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+class RecaptchaVerifier:
+    """Verify reCAPTCHA tokens against siteverify with a shared client"""
+
+    def __init__(
+        self,
+        secret: Optional[str] = None,
+        verify_url: str = RECAPTCHA_VERIFY_URL,
+        timeout: float = RECAPTCHA_TIMEOUT_SECONDS,
+        breaker: Optional[CircuitBreaker] = None,
+        token_ttl: float = RECAPTCHA_TOKEN_TTL_SECONDS,
+        token_cache_size: int = RECAPTCHA_TOKEN_CACHE_SIZE
+    ):
+        self._secret = secret
+        self.verify_url = verify_url
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.token_ttl = token_ttl
+        self.token_cache_size = token_cache_size
+        self.replays_rejected = 0
+        self._seen_tokens: "OrderedDict[str, float]" = OrderedDict()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+
+    @property
+    def secret(self) -> str:
+        if self._secret is not None:
+            return self._secret
+        return os.environ.get('RECAPTCHA_SECRET_KEY', '')
+
+    @property
+    def enabled(self) -> bool:
+        """Verification is skipped until a real secret is configured"""
+        return bool(self.secret) and self.secret != PLACEHOLDER_SECRET
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it on first use"""
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(
+                        timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 3)),
+                        limits=httpx.Limits(max_connections=20, max_keepalive_connections=5, keepalive_expiry=60)
+                    )
+        return self._client
+
+    async def close(self):
+        """Close the shared client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def verify(self, token: str) -> bool:
+        """Return whether the token is valid
+
+        Raises RecaptchaUnavailable when the verify endpoint can't be
+        reached or the circuit breaker is open.
+        """
+        if not token:
+            return False
+
+        digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        if not self._claim_token(digest):
+            self.replays_rejected += 1
+            logger.warning("⚠️ reCAPTCHA token replay rejected")
+            return False
+
+        if not self.breaker.allow_request():
+            self._release_token(digest)
+            raise RecaptchaUnavailable("reCAPTCHA circuit breaker is open")
+
+        try:
+            client = await self.get_client()
+            response = await client.post(self.verify_url, data={'secret': self.secret, 'response': token})
+            if response.status_code >= 500:
+                raise RecaptchaUnavailable(f"reCAPTCHA verify returned {response.status_code}")
+            result = response.json()
+        except (httpx.HTTPError, ValueError, RecaptchaUnavailable) as e:
+            self.breaker.record_failure()
+            # The token was never checked, so let the user retry it
+            self._release_token(digest)
+            logger.error(f"❌ reCAPTCHA verification unavailable: {str(e)}")
+            if isinstance(e, RecaptchaUnavailable):
+                raise
+            raise RecaptchaUnavailable(str(e)) from e
+
+        self.breaker.record_success()
+        return bool(result.get('success'))
+
+    def _claim_token(self, digest: str) -> bool:
+        """Remember a token; False if it was already seen and hasn't expired"""
+        now = time.monotonic()
+        while self._seen_tokens:
+            expires_at = next(iter(self._seen_tokens.values()))
+            if expires_at > now and len(self._seen_tokens) < self.token_cache_size:
+                break
+            self._seen_tokens.popitem(last=False)
+
+        expires_at = self._seen_tokens.get(digest)
+        if expires_at is not None and expires_at > now:
+            return False
+        self._seen_tokens[digest] = now + self.token_ttl
+        return True
+
+    def _release_token(self, digest: str):
+        self._seen_tokens.pop(digest, None)
+
+    def stats(self) -> dict:
+        """Return breaker state and replay counters"""
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "tracked_tokens": len(self._seen_tokens),
+            "replays_rejected": self.replays_rejected
+        }
+
+
+recaptcha_verifier = RecaptchaVerifier()
@@ -1,27 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 import logging
-import io
+import base64
+import json
+import os
 import uuid
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from lazy_imports import get_import_timings
 
 from models import (
     Service, ServiceCreate, ServiceUpdate,
     SaasProduct, SaasProductCreate, SaasProductUpdate,
     AboutContent, AboutContentUpdate,
     Contact, ContactUpdate,
-    SocialIntegrations
+    SocialIntegrations,
+    ExportJobCreate
+)
+from auth import get_current_user, token_cache
+from catalog_cache import catalog_cache
+from cache_sync import publish_change
+from contact_search import build_contacts_filter, contact_search_fields, created_at_range
+from exports import (
+    export_contacts_xlsx, export_contacts_pdf_file, stream_file, XLSX_MEDIA_TYPE, RenderPoolBusy,
+    contacts_cursor, iter_batches, csv_chunks, ndjson_chunks, gzip_chunks, accepts_gzip,
+    CONTACT_EXPORT_FIELDS, CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, EXPORT_FORMATS
+)
+from export_jobs import create_export_job, job_view, download_filename
+from columnar_exports import export_leads, COLUMNAR_FORMATS
+from sync_feed import sync_page, SyncTokenError, SyncTokenExpired, SYNC_FEEDS, SYNC_PAGE_SIZE
+from stats_counters import (
+    record_change, get_total, get_stats, reconcile_stats, COUNTED_COLLECTIONS,
+    get_daily_analytics, rebuild_daily_rollups
 )
-from auth import get_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +58,7 @@ async def create_service(service: ServiceCreate, current_user: dict = Depends(ge
         icon=service.icon
     )
     await db.services.insert_one(service_data.dict())
+    await publish_change(db, "services")
     logger.info(f"✅ Service created: {service.title}")
     return service_data
 
@@ -66,6 +79,7 @@ async def update_service(
     update_data['updated_at'] = datetime.utcnow()
     
     await db.services.update_one({"id": service_id}, {"$set": update_data})
+    await publish_change(db, "services")
     updated = await db.services.find_one({"id": service_id})
     logger.info(f"✅ Service updated: {service_id}")
     return Service(**updated)
@@ -78,6 +92,7 @@ async def delete_service(service_id: str, current_user: dict = Depends(get_curre
     result = await db.services.delete_one({"id": service_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Service not found")
+    await publish_change(db, "services")
     logger.info(f"✅ Service deleted: {service_id}")
     return {"message": "Service deleted successfully"}
 
@@ -95,6 +110,7 @@ async def create_saas_product(product: SaasProductCreate, current_user: dict = D
         features=product.features
     )
     await db.saas_products.insert_one(product_data.dict())
+    await publish_change(db, "saas_products")
     logger.info(f"✅ SaaS product created: {product.name}")
     return product_data
 
@@ -115,6 +131,7 @@ async def update_saas_product(
     update_data['updated_at'] = datetime.utcnow()
     
     await db.saas_products.update_one({"id": product_id}, {"$set": update_data})
+    await publish_change(db, "saas_products")
     updated = await db.saas_products.find_one({"id": product_id})
     logger.info(f"✅ SaaS product updated: {product_id}")
     return SaasProduct(**updated)
@@ -127,6 +144,7 @@ async def delete_saas_product(product_id: str, current_user: dict = Depends(get_
     result = await db.saas_products.delete_one({"id": product_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
+    await publish_change(db, "saas_products")
     logger.info(f"✅ SaaS product deleted: {product_id}")
     return {"message": "Product deleted successfully"}
 
@@ -148,54 +166,228 @@ async def update_about_content(about: AboutContentUpdate, current_user: dict = D
     else:
         new_about = AboutContent(**update_data)
         await db.about_content.insert_one(new_about.dict())
+    await publish_change(db, "about_content")
     
     updated = await db.about_content.find_one()
     logger.info("✅ About content updated")
     return AboutContent(**updated)
 
 
+# ==================== STATS ====================
+
+@router.get("/stats")
+async def get_admin_stats(current_user: dict = Depends(get_current_user)):
+    """Get maintained totals for contacts, chat sessions and meeting requests (admin only)"""
+    db = get_db()
+    result = {}
+    for collection in COUNTED_COLLECTIONS:
+        result[collection] = await get_stats(db, collection) or {"total": await get_total(db, collection)}
+    return result
+
+
+@router.post("/stats/reconcile")
+async def reconcile_admin_stats(current_user: dict = Depends(get_current_user)):
+    """Recount the totals now instead of waiting for the periodic job (admin only)"""
+    db = get_db()
+    drift = await reconcile_stats(db)
+    logger.info(f"✅ Stats reconciled, {len(drift)} collections corrected")
+    return {"corrected": drift}
+
+
+MAX_ANALYTICS_DAYS = 731
+
+
+def parse_day(value: str, name: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} date, expected YYYY-MM-DD")
+
+
+@router.get("/analytics")
+async def get_analytics(
+    current_user: dict = Depends(get_current_user),
+    days: int = 30,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """Get per-day contacts, chat sessions and meetings from the daily rollups (admin only)
+
+    Reads one rollup document per collection and day, never the raw documents.
+    Defaults to the last `days` days up to today (UTC).
+    """
+    db = get_db()
+    end_day = parse_day(end, "end") if end else datetime.utcnow()
+    start_day = parse_day(start, "start") if start else end_day - timedelta(days=max(1, days) - 1)
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end_day.date() - start_day.date()).days >= MAX_ANALYTICS_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_ANALYTICS_DAYS} days")
+    return await get_daily_analytics(db, start_day, end_day)
+
+
+@router.post("/analytics/rebuild")
+async def rebuild_analytics(
+    current_user: dict = Depends(get_current_user),
+    days: Optional[int] = Query(None, ge=1, le=MAX_ANALYTICS_DAYS)
+):
+    """Recompute the daily rollups from the raw collections; all history unless days is given (admin only)"""
+    db = get_db()
+    await rebuild_daily_rollups(db, days)
+    return {"message": "Analytics rebuilt"}
+
+
+# ==================== CACHE ====================
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get public catalog cache counters (admin only)"""
+    return catalog_cache.stats()
+
+
+@router.get("/token-cache-stats")
+async def get_token_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Get verified-token cache counters (admin only)"""
+    return token_cache.stats()
+
+
+@router.get("/import-timings")
+async def get_lazy_import_timings(current_user: dict = Depends(get_current_user)):
+    """Get first-import durations of lazily loaded libraries in ms (admin only)"""
+    return get_import_timings()
+
+
 # ==================== CONTACTS MANAGEMENT ====================
 
+def encode_contacts_cursor(contact: dict) -> str:
+    """Encode the (created_at, id) position of a contact as an opaque cursor
+
+    Text search results also carry their relevance score, which sorts first.
+    """
+    position = {"c": contact["created_at"].isoformat(), "i": contact["id"]}
+    if "score" in contact:
+        position["s"] = contact["score"]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_contacts_cursor(cursor: str) -> dict:
+    """Turn an opaque cursor into a query for contacts after that position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(position["c"])
+        contact_id = str(position["i"])
+        score = float(position["s"]) if "s" in position else None
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    # Newest first, ties broken by id - matches the (created_at, id) index
+    after = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": contact_id}}
+    ]
+    if score is None:
+        return {"$or": after}
+    # Text search: lower relevance first, then the same tie-breakers
+    return {"$or": [{"score": {"$lt": score}}] + [dict(clause, score=score) for clause in after]}
+
+
+async def find_text_search_page(db, query: dict, projection: dict, cursor: Optional[str], limit: int) -> List[dict]:
+    """Page through $text results by (score, created_at, id)
+
+    The score only exists once computed, so the seek runs in an aggregation
+    after $text has scored the matches.
+    """
+    pipeline = [
+        {"$match": query},
+        {"$addFields": {"score": {"$meta": "textScore"}}}
+    ]
+    if cursor:
+        pipeline.append({"$match": decode_contacts_cursor(cursor)})
+    pipeline += [
+        {"$sort": {"score": -1, "created_at": -1, "id": -1}},
+        {"$limit": limit},
+        {"$project": dict(projection, score=1)}
+    ]
+    return await db.contacts.aggregate(pipeline).to_list(limit)
+
+
+def contacts_filter(search: Optional[str], service: Optional[str], date_from: Optional[date], date_to: Optional[date]):
+    """Contacts query and text-search flag for the list and export filters"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return build_contacts_filter(search, service, date_from, date_to)
+
+
+# Largest contacts page; keeps one request from pulling the whole collection
+CONTACTS_MAX_LIMIT = 200
+
+
 @router.get("/contacts")
 async def get_contacts(
     current_user: dict = Depends(get_current_user),
-    page: int = 1,
-    limit: int = 50,
-    search: str = None
+    page: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=CONTACTS_MAX_LIMIT),
+    search: str = None,
+    service: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False
 ):
-    """Get contacts with pagination (admin only)"""
+    """Get contacts with cursor pagination, or page numbers for compatibility (admin only)"""
     db = get_db()
     
-    # Build query filter
-    query = {}
-    if search:
-        query = {
-            "$or": [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"email": {"$regex": search, "$options": "i"}},
-                {"phone": {"$regex": search, "$options": "i"}},
-                {"service": {"$regex": search, "$options": "i"}}
-            ]
-        }
-    
-    # Get total count for pagination
-    total = await db.contacts.count_documents(query)
-    
-    # Calculate skip value
-    skip = (page - 1) * limit
+    # Build query filter: email/phone prefixes on normalized fields, otherwise the text index
+    query, text_search = contacts_filter(search, service, date_from, date_to)
     
     # Use projection to fetch only needed fields
     projection = {"_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1, "service": 1, "comment": 1, "created_at": 1}
+    sort = [("created_at", -1), ("id", -1)]
+    if text_search:
+        # Most relevant first
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"})] + sort
+    
+    if page is not None:
+        # Compatibility mode: page numbers with skip and a full count
+        page = max(1, page)
+        total = await db.contacts.count_documents(query) if query else await get_total(db, "contacts")
+        skip = (page - 1) * limit
+        contacts = await db.contacts.find(query, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
+        
+        return {
+            "data": contacts,
+            "total": total,
+            "page": page,
+            "limit": limit,
+            "pages": (total + limit - 1) // limit
+        }
     
-    contacts = await db.contacts.find(query, projection).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
-    
-    return {
+    # Keyset mode: seek past the cursor position instead of skipping rows
+    if text_search:
+        contacts = await find_text_search_page(db, query, projection, cursor, limit + 1)
+    else:
+        page_query = query
+        if cursor:
+            position = decode_contacts_cursor(cursor)
+            page_query = {"$and": [query, position]} if query else position
+        contacts = await db.contacts.find(page_query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    has_more = len(contacts) > limit
+    contacts = contacts[:limit]
+    
+    result = {
         "data": contacts,
-        "total": total,
-        "page": page,
         "limit": limit,
-        "pages": (total + limit - 1) // limit
+        "next_cursor": encode_contacts_cursor(contacts[-1]) if has_more else None
     }
+    if include_total:
+        # Maintained counter when unfiltered, so the count stays O(1)
+        if query:
+            result["total"] = await db.contacts.count_documents(query)
+        else:
+            result["total"] = await get_total(db, "contacts")
+    return result
 
 
 @router.put("/contacts/{contact_id}")
@@ -211,9 +403,14 @@ async def update_contact(
         raise HTTPException(status_code=404, detail="Contact not found")
     
     update_data = contact.dict(exclude_unset=True)
+    update_data.update(contact_search_fields(
+        update_data.get("email", existing.get("email", "")),
+        update_data.get("phone", existing.get("phone", ""))
+    ))
     
     await db.contacts.update_one({"id": contact_id}, {"$set": update_data})
     updated = await db.contacts.find_one({"id": contact_id})
+    await record_change(db, "contacts", existing, updated)
     
     logger.info(f"✅ Contact updated: {contact_id}")
     return {
@@ -231,121 +428,267 @@ async def update_contact(
 async def delete_contact(contact_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a contact (admin only)"""
     db = get_db()
-    result = await db.contacts.delete_one({"id": contact_id})
-    if result.deleted_count == 0:
+    deleted = await db.contacts.find_one_and_delete({"id": contact_id}, {"_id": 0, "id": 1, "service": 1, "created_at": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Contact not found")
+    await record_change(db, "contacts", deleted, None)
     logger.info(f"✅ Contact deleted: {contact_id}")
     return {"message": "Contact deleted successfully"}
 
 
+def render_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many exports in progress, please try again shortly",
+        headers={"Retry-After": "10"}
+    )
+
+
 @router.get("/contacts/export-pdf")
 async def export_contacts_pdf(current_user: dict = Depends(get_current_user)):
-    """Export contacts as PDF (admin only)"""
+    """Export all contacts as a paged PDF, rendered in a worker process (admin only)"""
     db = get_db()
-    contacts = await db.contacts.find().sort("created_at", -1).to_list(1000)
+    try:
+        path, rows = await export_contacts_pdf_file(db)
+    except RenderPoolBusy:
+        raise render_busy()
     
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=20,
-        textColor=colors.HexColor('#00FFD1')
-    )
-    elements.append(Paragraph("MITA ICT - Contact Submissions", title_style))
-    elements.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-    elements.append(Spacer(1, 20))
-    
-    table_data = [['Name', 'Email', 'Phone', 'Service', 'Date']]
-    
-    for contact in contacts:
-        table_data.append([
-            contact.get('name', 'N/A'),
-            contact.get('email', 'N/A'),
-            contact.get('phone', 'N/A'),
-            contact.get('service', 'N/A'),
-            contact.get('created_at', datetime.now()).strftime('%Y-%m-%d') if contact.get('created_at') else 'N/A'
-        ])
-    
-    table = Table(table_data, colWidths=[1.3*inch, 1.8*inch, 1*inch, 1.5*inch, 0.9*inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#00FFD1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#1a1a1a')),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.white),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#333333')),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.HexColor('#1a1a1a'), colors.HexColor('#222222')]),
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    
-    buffer.seek(0)
-    
-    logger.info("✅ Contacts PDF export generated")
+    logger.info(f"✅ Contacts PDF export generated: {rows} rows")
     return StreamingResponse(
-        buffer,
+        stream_file(path),
         media_type='application/pdf',
-        headers={"Content-Disposition": f"attachment; filename=contacts_{datetime.now().strftime('%Y%m%d')}.pdf"}
+        headers={
+            "Content-Disposition": f"attachment; filename=contacts_{datetime.now().strftime('%Y%m%d')}.pdf",
+            "Content-Length": str(os.path.getsize(path))
+        }
     )
 
 
 @router.get("/contacts/export-excel")
 async def export_contacts_excel(current_user: dict = Depends(get_current_user)):
-    """Export contacts as Excel (admin only)"""
+    """Export all contacts as Excel, rendered in a worker process and streamed in chunks (admin only)"""
     db = get_db()
-    contacts = await db.contacts.find().sort("created_at", -1).to_list(1000)
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Contacts"
+    try:
+        path, rows = await export_contacts_xlsx(db)
+    except RenderPoolBusy:
+        raise render_busy()
     
-    headers = ['Name', 'Email', 'Phone', 'Service', 'Comment', 'Date']
-    header_fill = PatternFill(start_color='00FFD1', end_color='00FFD1', fill_type='solid')
-    header_font = Font(bold=True, color='000000')
+    logger.info(f"✅ Contacts Excel export generated: {rows} rows")
+    return StreamingResponse(
+        stream_file(path),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename=contacts_{datetime.now().strftime('%Y%m%d')}.xlsx",
+            "Content-Length": str(os.path.getsize(path))
+        }
+    )
+
+
+def export_stream_response(request: Request, chunks, media_type: str, extension: str) -> StreamingResponse:
+    """Stream encoded export chunks, gzip-compressed when the client accepts it"""
+    headers = {
+        "Content-Disposition": f"attachment; filename=contacts_{datetime.now().strftime('%Y%m%d')}.{extension}",
+        "Vary": "Accept-Encoding"
+    }
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+@router.get("/contacts/export.csv")
+async def export_contacts_csv(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    search: str = None,
+    service: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream contacts matching the list filters as CSV (admin only)"""
+    query, _ = contacts_filter(search, service, date_from, date_to)
+    chunks = csv_chunks(iter_batches(contacts_cursor(get_db(), query)), CONTACT_EXPORT_FIELDS)
+    logger.info("✅ Contacts CSV export started")
+    return export_stream_response(request, chunks, CSV_MEDIA_TYPE, "csv")
+
+
+@router.get("/contacts/export.ndjson")
+async def export_contacts_ndjson(
+    request: Request,
+    current_user: dict = Depends(get_current_user),
+    search: str = None,
+    service: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Stream contacts matching the list filters as newline-delimited JSON (admin only)"""
+    query, _ = contacts_filter(search, service, date_from, date_to)
+    chunks = ndjson_chunks(iter_batches(contacts_cursor(get_db(), query)))
+    logger.info("✅ Contacts NDJSON export started")
+    return export_stream_response(request, chunks, NDJSON_MEDIA_TYPE, "ndjson")
+
+
+# ==================== LEADS EXPORT ====================
+
+async def leads_file_response(file_format: str, date_from: Optional[date], date_to: Optional[date]) -> StreamingResponse:
+    """Write leads created in the date range to a columnar file and stream it"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    path, rows = await export_leads(get_db(), file_format, created_at_range(date_from, date_to))
     
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center')
+    logger.info(f"✅ Leads {file_format} export generated: {rows} rows")
+    export_format = COLUMNAR_FORMATS[file_format]
+    return StreamingResponse(
+        stream_file(path),
+        media_type=export_format["media_type"],
+        headers={
+            "Content-Disposition": f"attachment; filename=leads_{datetime.now().strftime('%Y%m%d')}{export_format['extension']}",
+            "Content-Length": str(os.path.getsize(path))
+        }
+    )
+
+
+@router.get("/leads/export.parquet")
+async def export_leads_parquet(
+    current_user: dict = Depends(get_current_user),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Export contacts, chat leads and meeting requests as one typed Parquet file (admin only)"""
+    return await leads_file_response("parquet", date_from, date_to)
+
+
+@router.get("/leads/export.feather")
+async def export_leads_feather(
+    current_user: dict = Depends(get_current_user),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """Export contacts, chat leads and meeting requests as one typed Feather (Arrow IPC) file (admin only)"""
+    return await leads_file_response("feather", date_from, date_to)
+
+
+# ==================== EXPORT JOBS ====================
+
+@router.post("/exports", status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export_request: ExportJobCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Start a background export; an identical export of unchanged data is reused (admin only)"""
+    if export_request.date_from and export_request.date_to and export_request.date_from > export_request.date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if export_request.dataset != "contacts" and (export_request.search or export_request.service):
+        raise HTTPException(status_code=400, detail="search and service filters only apply to contacts")
+    
+    filters = {
+        "date_from": export_request.date_from.isoformat() if export_request.date_from else None,
+        "date_to": export_request.date_to.isoformat() if export_request.date_to else None
+    }
+    if export_request.dataset == "contacts":
+        filters["search"] = (export_request.search or "").strip() or None
+        filters["service"] = export_request.service or None
     
-    for row, contact in enumerate(contacts, 2):
-        ws.cell(row=row, column=1, value=contact.get('name', ''))
-        ws.cell(row=row, column=2, value=contact.get('email', ''))
-        ws.cell(row=row, column=3, value=contact.get('phone', ''))
-        ws.cell(row=row, column=4, value=contact.get('service', ''))
-        ws.cell(row=row, column=5, value=contact.get('comment', ''))
-        created = contact.get('created_at')
-        ws.cell(row=row, column=6, value=created.strftime('%Y-%m-%d %H:%M') if created else '')
+    db = get_db()
+    job, reused = await create_export_job(db, export_request.dataset, export_request.format, filters)
+    if job["status"] == "ready":
+        response.status_code = status.HTTP_200_OK
+    return dict(job_view(job), reused=reused)
+
+
+@router.get("/exports/{job_id}")
+async def get_export(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the status of an export job (admin only)"""
+    db = get_db()
+    job = await db.export_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job_view(job)
+
+
+@router.get("/exports/{job_id}/download")
+async def download_export(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Download a finished export (admin only)"""
+    db = get_db()
+    job = await db.export_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job["status"] != "ready":
+        raise HTTPException(status_code=409, detail=f"Export is {job['status']}")
+    if not os.path.exists(job["path"]):
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
     
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 30
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 25
-    ws.column_dimensions['E'].width = 40
-    ws.column_dimensions['F'].width = 18
+    return StreamingResponse(
+        stream_file(job["path"], delete=False),
+        media_type=EXPORT_FORMATS[job["format"]]["media_type"],
+        headers={
+            "Content-Disposition": f"attachment; filename={download_filename(job)}",
+            "Content-Length": str(os.path.getsize(job["path"]))
+        }
+    )
+
+
+# ==================== SYNC FEED ====================
+
+@router.get("/sync/{feed}")
+async def sync_changes(
+    feed: str,
+    current_user: dict = Depends(get_current_user),
+    since: Optional[str] = None,
+    limit: int = SYNC_PAGE_SIZE
+):
+    """Documents created, updated or deleted since a sync token (admin only)
+
+    Without since, pages through a snapshot first. Keep requesting with
+    next_since while has_more is true; deleted documents come back as
+    tombstones ({"id", "deleted": true}).
+    """
+    if feed not in SYNC_FEEDS:
+        raise HTTPException(status_code=404, detail=f"Unknown sync feed: {feed}")
+    try:
+        return await sync_page(get_db(), feed, since, limit)
+    except SyncTokenError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    except SyncTokenExpired:
+        raise HTTPException(status_code=410, detail="Sync token expired, start again without since")
+
+
+# ==================== EMAIL OUTBOX ====================
+
+@router.get("/email-outbox")
+async def get_email_outbox(
+    current_user: dict = Depends(get_current_user),
+    status_filter: str = "dead",
+    limit: int = 50
+):
+    """Get outbox counts per status and the latest messages in one status (admin only)"""
+    db = get_db()
+    counts = await db.email_outbox.aggregate([
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]).to_list(None)
     
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+    projection = {"_id": 0, "payload": 0}
+    messages = await db.email_outbox.find({"status": status_filter}, projection).sort("updated_at", -1).limit(limit).to_list(limit)
     
-    logger.info("✅ Contacts Excel export generated")
-    return StreamingResponse(
-        buffer,
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={"Content-Disposition": f"attachment; filename=contacts_{datetime.now().strftime('%Y%m%d')}.xlsx"}
+    return {
+        "counts": {c["_id"]: c["count"] for c in counts},
+        "messages": messages
+    }
+
+
+@router.post("/email-outbox/{message_id}/retry")
+async def retry_email(message_id: str, current_user: dict = Depends(get_current_user)):
+    """Move a dead email back to pending (admin only)"""
+    db = get_db()
+    result = await db.email_outbox.update_one(
+        {"id": message_id, "status": "dead"},
+        {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Dead email not found")
+    logger.info(f"✅ Email requeued: {message_id}")
+    return {"message": "Email requeued successfully"}
 
 
 # ==================== SOCIAL MEDIA INTEGRATIONS ====================
@@ -353,6 +696,11 @@ async def export_contacts_excel(current_user: dict = Depends(get_current_user)):
 @router.get("/social-integrations", response_model=SocialIntegrations)
 async def get_social_integrations(current_user: dict = Depends(get_current_user)):
     """Get social media integrations (admin only)"""
+    return await catalog_cache.get_or_load("social_integrations", load_social_integrations)
+
+
+async def load_social_integrations() -> SocialIntegrations:
+    """Load social media integrations, falling back to defaults"""
     db = get_db()
     existing = await db.social_integrations.find_one()
     
@@ -383,6 +731,7 @@ async def update_social_integrations(
         )
     else:
         await db.social_integrations.insert_one(integration_dict)
+    await publish_change(db, "social_integrations")
     
     logger.info("✅ Social media integrations updated")
     return SocialIntegrations(**integration_dict)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Security, status
+from fastapi.security import HTTPAuthorizationCredentials
 from datetime import datetime
 import logging
 
 from models import AdminLogin, Token, ChangePassword
-from auth import verify_password, get_password_hash, create_access_token, get_current_user
+from auth import (
+    password_hasher, PasswordHasherBusy, create_access_token, get_current_user, security,
+    revoke_token, revoke_user_tokens
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,18 +20,42 @@ def get_db():
     return db
 
 
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress, please try again shortly",
+        headers={"Retry-After": "5"}
+    )
+
+
+async def check_password(password: str, hashed_password: str):
+    """Verify a password in the hashing pool; returns (valid, new_hash)"""
+    try:
+        return await password_hasher.verify(password, hashed_password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+
+
 @router.post("/login", response_model=Token)
 async def admin_login(credentials: AdminLogin):
     """Admin login with username/password"""
     db = get_db()
     admin = await db.admins.find_one({"username": credentials.username})
     
-    if not admin or not verify_password(credentials.password, admin["password_hash"]):
+    valid, new_hash = await check_password(credentials.password, admin["password_hash"]) if admin else (False, None)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # The bcrypt cost changed; store the hash at the current cost (unless the password changed meanwhile)
+        await db.admins.update_one(
+            {"username": admin["username"], "password_hash": admin["password_hash"]},
+            {"$set": {"password_hash": new_hash}}
+        )
+        logger.info(f"✅ Password hash upgraded for admin: {admin['username']}")
     
     access_token = create_access_token(data={"sub": admin["username"]})
     logger.info(f"✅ Admin logged in: {credentials.username}")
@@ -44,8 +72,12 @@ async def admin_google_login():
 
 
 @router.post("/logout")
-async def admin_logout(current_user: dict = Depends(get_current_user)):
-    """Admin logout"""
+async def admin_logout(
+    current_user: dict = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Security(security)
+):
+    """Admin logout; the token stops working immediately"""
+    await revoke_token(get_db(), credentials.credentials)
     logger.info(f"✅ Admin logged out: {current_user['username']}")
     return {"message": "Successfully logged out"}
 
@@ -66,17 +98,23 @@ async def change_password(
             detail="Admin user not found"
         )
     
-    if not verify_password(password_data.current_password, admin["password_hash"]):
+    valid, _ = await check_password(password_data.current_password, admin["password_hash"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
-    new_password_hash = get_password_hash(password_data.new_password)
+    try:
+        new_password_hash = await password_hasher.hash(password_data.new_password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
     await db.admins.update_one(
         {"username": username},
         {"$set": {"password_hash": new_password_hash}}
     )
+    # Sessions signed in with the old password end now
+    await revoke_user_tokens(db, username)
     
     logger.info(f"✅ Password changed for admin: {username}")
     return {"message": "Password updated successfully"}
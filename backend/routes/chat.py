@@ -6,19 +6,29 @@ import os
 import re
 import uuid
 
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from pymongo import ReturnDocument
+
+from lazy_imports import lazy_module
 
 from models import (
     ChatMessage, ChatSession, ChatRequest, ChatResponse,
     MeetingRequest, MeetingRequestCreate
 )
 from auth import get_current_user
-from email_service import send_meeting_request_email
+from email_outbox import enqueue_emails
+from catalog_cache import catalog_cache
+from stats_counters import record_change
+
+# The LLM client is only needed once someone chats; load it on first use
+llm_chat = lazy_module("emergentintegrations.llm.chat")
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["Chatbot"])
 
+# Safety-net expiry for the cached system prompt (0 = only on content change)
+CHAT_PROMPT_TTL_SECONDS = float(os.environ.get('CHAT_PROMPT_TTL_SECONDS', 300))
+
 
 def get_db():
     """Dependency to get database - will be set by main app"""
@@ -27,6 +37,18 @@ def get_db():
 
 
 async def get_dynamic_system_prompt(db) -> str:
+    """
+    Get the system prompt, rebuilt only when catalog content changes.
+    Admin CRUD on services, products and about content invalidates it.
+    """
+    return await catalog_cache.get_or_load(
+        "chat_system_prompt",
+        lambda: build_dynamic_system_prompt(db),
+        ttl=CHAT_PROMPT_TTL_SECONDS or None
+    )
+
+
+async def build_dynamic_system_prompt(db) -> str:
     """
     Build system prompt dynamically from database content.
     This ensures the chatbot always has the latest information.
@@ -155,7 +177,7 @@ async def chat_message(request: ChatRequest):
         system_prompt = await get_dynamic_system_prompt(db)
         
         # Create chat instance with Claude model
-        chat = LlmChat(
+        chat = llm_chat.LlmChat(
             api_key=emergent_key,
             session_id=session_id,
             system_message=system_prompt
@@ -169,7 +191,7 @@ async def chat_message(request: ChatRequest):
             })
         
         # Create user message and get AI response
-        user_msg = UserMessage(text=request.message)
+        user_msg = llm_chat.UserMessage(text=request.message)
         ai_response = await chat.send_message(user_msg)
         
         # Add messages to session
@@ -229,24 +251,27 @@ async def chat_message(request: ChatRequest):
                 "created_at": datetime.utcnow()
             }
             await db.meeting_requests.insert_one(meeting_request_data)
+            await record_change(db, "meeting_requests", None, meeting_request_data)
             
             # Update session with lead info
             session.lead_name = meeting_name
             session.lead_email = meeting_email
             session.lead_captured = True
             
-            # Send email to admin
+            # Queue email to admin
             try:
-                await send_meeting_request_email(
-                    name=meeting_name,
-                    email=meeting_email,
-                    phone=session.lead_phone or "",
-                    preferred_datetime=meeting_datetime,
-                    topic=meeting_topic
-                )
-                logger.info(f"✅ Meeting request email sent for: {meeting_email}")
+                await enqueue_emails(db, [
+                    ("meeting_request", {
+                        "name": meeting_name,
+                        "email": meeting_email,
+                        "phone": session.lead_phone or "",
+                        "preferred_datetime": meeting_datetime,
+                        "topic": meeting_topic
+                    })
+                ])
+                logger.info(f"✅ Meeting request email queued for: {meeting_email}")
             except Exception as email_error:
-                logger.error(f"❌ Failed to send meeting request email: {str(email_error)}")
+                logger.error(f"❌ Failed to queue meeting request email: {str(email_error)}")
             
             # Clean up the AI response by removing the MEETING_REQUEST line
             ai_response = re.sub(meeting_request_pattern, '', ai_response).strip()
@@ -258,11 +283,16 @@ async def chat_message(request: ChatRequest):
         session_dict = session.dict()
         session_dict['messages'] = [m.dict() for m in session.messages]
         
-        await db.chat_sessions.update_one(
+        previous = await db.chat_sessions.find_one_and_update(
             {"id": session_id},
             {"$set": session_dict},
-            upsert=True
+            projection={"_id": 0, "id": 1, "lead_captured": 1, "created_at": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
         )
+        await record_change(db, "chat_sessions", previous, {
+            "id": session_id, "lead_captured": session.lead_captured, "created_at": session.created_at
+        })
         
         logger.info(f"✅ Chat message processed for session: {session_id}")
         
@@ -326,9 +356,10 @@ async def delete_chat_session(
 ):
     """Delete a chat session (admin only)"""
     db = get_db()
-    result = await db.chat_sessions.delete_one({"id": session_id})
-    if result.deleted_count == 0:
+    deleted = await db.chat_sessions.find_one_and_delete({"id": session_id}, {"_id": 0, "id": 1, "lead_captured": 1, "created_at": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Session not found")
+    await record_change(db, "chat_sessions", deleted, None)
     
     logger.info(f"✅ Chat session deleted: {session_id}")
     return {"message": "Chat session deleted successfully"}
@@ -375,13 +406,16 @@ async def update_meeting_request_status(
     if new_status not in ["pending", "approved", "rejected"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    result = await db.meeting_requests.update_one(
+    previous = await db.meeting_requests.find_one_and_update(
         {"id": request_id},
-        {"$set": {"status": new_status, "admin_notes": admin_notes}}
+        {"$set": {"status": new_status, "admin_notes": admin_notes}},
+        projection={"_id": 0, "id": 1, "status": 1, "created_at": 1},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Meeting request not found")
+    await record_change(db, "meeting_requests", previous, dict(previous, status=new_status))
     
     logger.info(f"✅ Meeting request {request_id} updated to {new_status}")
     return {"message": f"Meeting request {new_status} successfully"}
@@ -394,9 +428,10 @@ async def delete_meeting_request(
 ):
     """Delete a meeting request (admin only)"""
     db = get_db()
-    result = await db.meeting_requests.delete_one({"id": request_id})
-    if result.deleted_count == 0:
+    deleted = await db.meeting_requests.find_one_and_delete({"id": request_id}, {"_id": 0, "id": 1, "status": 1, "created_at": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Meeting request not found")
+    await record_change(db, "meeting_requests", deleted, None)
     
     logger.info(f"✅ Meeting request deleted: {request_id}")
     return {"message": "Meeting request deleted successfully"}
@@ -2,12 +2,13 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from datetime import datetime
 from typing import List
 import logging
-import os
-import httpx
 
 from models import Contact, ContactCreate
 from auth import get_current_user
-from email_service import send_contact_email, send_auto_response_email
+from email_outbox import enqueue_emails
+from contact_search import contact_search_fields
+from recaptcha import recaptcha_verifier, RecaptchaUnavailable
+from stats_counters import record_change
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +27,19 @@ async def submit_contact(contact: ContactCreate):
     db = get_db()
     try:
         # Verify reCAPTCHA token
-        recaptcha_secret = os.environ.get('RECAPTCHA_SECRET_KEY', '')
-        if recaptcha_secret and recaptcha_secret != 'YOUR_RECAPTCHA_SECRET_KEY':
-            async with httpx.AsyncClient() as client_http:
-                recaptcha_response = await client_http.post(
-                    'https://www.google.com/recaptcha/api/siteverify',
-                    data={
-                        'secret': recaptcha_secret,
-                        'response': contact.recaptcha_token
-                    }
+        if recaptcha_verifier.enabled:
+            try:
+                recaptcha_valid = await recaptcha_verifier.verify(contact.recaptcha_token)
+            except RecaptchaUnavailable:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="reCAPTCHA verification is temporarily unavailable, please try again shortly"
+                )
+            if not recaptcha_valid:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="reCAPTCHA verification failed"
                 )
-                recaptcha_result = recaptcha_response.json()
-                
-                if not recaptcha_result.get('success'):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="reCAPTCHA verification failed"
-                    )
         
         # Save to database
         contact_data = Contact(
@@ -52,29 +49,32 @@ async def submit_contact(contact: ContactCreate):
             service=contact.service,
             comment=contact.comment
         )
-        await db.contacts.insert_one(contact_data.dict())
+        contact_doc = contact_data.dict()
+        contact_doc.update(contact_search_fields(contact.email, contact.phone))
+        await db.contacts.insert_one(contact_doc)
+        await record_change(db, "contacts", None, contact_doc)
         
-        # Send email notifications
+        # Queue email notifications; the outbox sender delivers them with retries.
+        # The contact is already saved, so a failure here must not ask the client to resubmit
         try:
-            await send_contact_email(
-                name=contact.name,
-                email=contact.email,
-                phone=contact.phone,
-                service=contact.service,
-                comment=contact.comment
-            )
-            logger.info(f"✅ Admin notification email sent for: {contact.email}")
-            
-            await send_auto_response_email(
-                name=contact.name,
-                email=contact.email,
-                phone=contact.phone,
-                service=contact.service
-            )
-            logger.info(f"✅ Auto-response email sent to: {contact.email}")
-            
-        except Exception as e:
-            logger.error(f"❌ Email sending failed: {str(e)}")
+            await enqueue_emails(db, [
+                ("contact_notification", {
+                    "name": contact.name,
+                    "email": contact.email,
+                    "phone": contact.phone,
+                    "service": contact.service,
+                    "comment": contact.comment
+                }),
+                ("contact_auto_response", {
+                    "name": contact.name,
+                    "email": contact.email,
+                    "phone": contact.phone,
+                    "service": contact.service
+                })
+            ])
+            logger.info(f"✅ Contact emails queued for: {contact.email}")
+        except Exception as email_error:
+            logger.error(f"❌ Failed to queue contact emails for {contact.email}: {str(email_error)}")
         
         return {
             "success": True,
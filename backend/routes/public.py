@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Header, Response, status
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 import logging
 
 from models import (
     Service, ServiceCreate, ServiceUpdate,
     SaasProduct, SaasProductCreate, SaasProductUpdate,
-    AboutContent, AboutContentUpdate
+    AboutContent, AboutContentUpdate,
+    SiteBundle
 )
+from catalog_cache import catalog_cache, CatalogSnapshot, etag_matches
 
 logger = logging.getLogger(__name__)
 
@@ -20,32 +22,89 @@ def get_db():
     return db
 
 
+async def load_services(db=None) -> CatalogSnapshot:
+    """Load and validate services from the database"""
+    if db is None:
+        db = get_db()
+    services = await db.services.find().to_list(1000)
+    return CatalogSnapshot([Service(**service) for service in services])
+
+
+async def load_saas_products(db=None) -> CatalogSnapshot:
+    """Load and validate SaaS products from the database"""
+    if db is None:
+        db = get_db()
+    products = await db.saas_products.find().to_list(1000)
+    return CatalogSnapshot([SaasProduct(**product) for product in products])
+
+
+async def load_about_content(db=None) -> CatalogSnapshot:
+    """Load and validate About content from the database"""
+    if db is None:
+        db = get_db()
+    about = await db.about_content.find_one()
+    return CatalogSnapshot(AboutContent(**about) if about else None)
+
+
+async def load_site_bundle() -> CatalogSnapshot:
+    """Combine the cached per-resource snapshots into one bundle"""
+    services = await catalog_cache.get_or_load("services", load_services)
+    products = await catalog_cache.get_or_load("saas_products", load_saas_products)
+    about = await catalog_cache.get_or_load("about_content", load_about_content)
+    return build_site_bundle(services, products, about)
+
+
+def build_site_bundle(services: CatalogSnapshot, products: CatalogSnapshot, about: CatalogSnapshot) -> CatalogSnapshot:
+    """Build the bundle snapshot from the per-resource snapshots"""
+    # Splice the already-encoded bodies instead of re-encoding the content
+    body = b"".join([
+        b'{"services":', services.body,
+        b',"saas_products":', products.body,
+        b',"about":', about.body,
+        b'}'
+    ])
+    data = {"services": services.data, "saas_products": products.data, "about": about.data}
+    return CatalogSnapshot(data, body=body)
+
+
+def conditional_response(snapshot: CatalogSnapshot, if_none_match: Optional[str]) -> Response:
+    """Return 304 when the client already has this snapshot, else its pre-encoded body"""
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
 @router.get("/")
 async def root():
     return {"message": "MITA ICT API - Where Technology Meets Strategy"}
 
 
 @router.get("/services", response_model=List[Service])
-async def get_services():
+async def get_services(if_none_match: Optional[str] = Header(None)):
     """Get all consulting services"""
-    db = get_db()
-    services = await db.services.find().to_list(1000)
-    return [Service(**service) for service in services]
+    snapshot = await catalog_cache.get_or_load("services", load_services)
+    return conditional_response(snapshot, if_none_match)
 
 
 @router.get("/saas-products", response_model=List[SaasProduct])
-async def get_saas_products():
+async def get_saas_products(if_none_match: Optional[str] = Header(None)):
     """Get all SaaS products"""
-    db = get_db()
-    products = await db.saas_products.find().to_list(1000)
-    return [SaasProduct(**product) for product in products]
+    snapshot = await catalog_cache.get_or_load("saas_products", load_saas_products)
+    return conditional_response(snapshot, if_none_match)
 
 
 @router.get("/about", response_model=AboutContent)
-async def get_about_content():
+async def get_about_content(if_none_match: Optional[str] = Header(None)):
     """Get About page content"""
-    db = get_db()
-    about = await db.about_content.find_one()
-    if not about:
+    snapshot = await catalog_cache.get_or_load("about_content", load_about_content)
+    if not snapshot.data:
         raise HTTPException(status_code=404, detail="About content not found")
-    return AboutContent(**about)
+    return conditional_response(snapshot, if_none_match)
+
+
+@router.get("/site-bundle", response_model=SiteBundle)
+async def get_site_bundle(if_none_match: Optional[str] = Header(None)):
+    """Get services, SaaS products and About content in a single response"""
+    snapshot = await catalog_cache.get_or_load("site_bundle", load_site_bundle)
+    return conditional_response(snapshot, if_none_match)
@@ -28,7 +28,17 @@ from routes import (
     admin_router,
     chat_router
 )
-from auth import init_admin_user
+from auth import init_admin_user, TokenRevocationSync
+from cache_sync import CacheInvalidationWatcher
+from snapshot_publisher import publish_catalog_snapshots
+from email_outbox import EmailOutboxSender, EMAIL_OUTBOX_IN_APP
+from email_service import smtp_pool
+from recaptcha import recaptcha_verifier
+from exports import render_pool
+from export_jobs import ExportJobRunner
+from contact_search import backfill_contact_search_fields, SEARCH_FIELD_INDEXES
+from stats_counters import StatsReconciler
+from sync_feed import SYNC_RETENTION_DAYS
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -52,12 +62,17 @@ DB_NAME = os.environ.get('DB_NAME', 'mita_ict')
 
 client = None
 db = None
+cache_watcher = None
+email_sender = None
+stats_reconciler = None
+export_runner = None
+token_revocations = None
 
 
 @app.on_event("startup")
 async def startup_db_client():
     """Initialize database connection and seed data on startup"""
-    global client, db
+    global client, db, cache_watcher, email_sender, stats_reconciler, export_runner, token_revocations
     
     try:
         client = AsyncIOMotorClient(MONGO_URL)
@@ -72,6 +87,33 @@ async def startup_db_client():
         # Seed default data if collections are empty
         await seed_default_data()
         
+        # One-off: add search fields to contacts stored before they existed
+        await backfill_contact_search_fields(db)
+        
+        # Keep this worker's caches in sync with writes from other workers
+        cache_watcher = CacheInvalidationWatcher(db)
+        cache_watcher.start()
+        
+        # Apply logouts and password changes made through other workers
+        token_revocations = TokenRevocationSync(db)
+        token_revocations.start()
+        
+        # Publish static catalog files for nginx (if CATALOG_SNAPSHOT_DIR is set)
+        await publish_catalog_snapshots()
+        
+        # Recount the admin totals now and periodically to correct drift
+        stats_reconciler = StatsReconciler(db)
+        stats_reconciler.start()
+        
+        # Build requested exports in the background
+        export_runner = ExportJobRunner(db)
+        export_runner.start()
+        
+        # Deliver queued emails in the background (unless a standalone worker does)
+        if EMAIL_OUTBOX_IN_APP:
+            email_sender = EmailOutboxSender(db)
+            email_sender.start()
+        
         logger.info("✅ Database initialized successfully")
         
     except Exception as e:
@@ -86,11 +128,16 @@ async def create_indexes():
     try:
         # Contacts indexes
         await db.contacts.create_index([("created_at", -1)])
+        await db.contacts.create_index([("created_at", -1), ("id", -1)])
         await db.contacts.create_index([("email", 1)])
+        await db.contacts.create_index([("id", 1)])
         await db.contacts.create_index([("name", "text"), ("email", "text"), ("service", "text")])
+        for field in SEARCH_FIELD_INDEXES:
+            await db.contacts.create_index([(field, 1)])
         
         # Chat sessions indexes
         await db.chat_sessions.create_index([("updated_at", -1)])
+        await db.chat_sessions.create_index([("created_at", -1)])
         await db.chat_sessions.create_index([("lead_captured", 1)])
         await db.chat_sessions.create_index([("id", 1)], unique=True)
         
@@ -103,9 +150,30 @@ async def create_indexes():
         await db.services.create_index([("id", 1)], unique=True)
         await db.saas_products.create_index([("id", 1)], unique=True)
         
+        # Daily analytics rollups, read by date range
+        await db.analytics_daily.create_index([("date", 1), ("collection", 1)])
+        
+        # Export jobs: claiming, reuse of identical exports, expiry
+        await db.export_jobs.create_index([("id", 1)], unique=True)
+        await db.export_jobs.create_index([("status", 1), ("created_at", 1)])
+        await db.export_jobs.create_index([("cache_key", 1), ("data_version", 1)])
+        await db.export_jobs.create_index([("expires_at", 1)])
+        
+        # Sync changelog: reads by position, entries expire after the retention period
+        await db.sync_changes.create_index([("collection", 1), ("seq", 1)], unique=True)
+        await db.sync_changes.create_index([("at", 1)], expireAfterSeconds=int(SYNC_RETENTION_DAYS * 86400))
+        
+        # Email outbox indexes
+        await db.email_outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+        await db.email_outbox.create_index([("status", 1), ("locked_until", 1)])
+        await db.email_outbox.create_index([("id", 1)], unique=True)
+        
         # Admin users index
         await db.admins.create_index([("username", 1)], unique=True)
         
+        # Revoked tokens are dropped once they would have expired anyway
+        await db.revoked_tokens.create_index([("expires_at", 1)], expireAfterSeconds=0)
+        
         logger.info("✅ Database indexes created successfully")
         
     except Exception as e:
@@ -116,6 +184,19 @@ async def create_indexes():
 async def shutdown_db_client():
     """Close database connection on shutdown"""
     global client
+    if cache_watcher:
+        await cache_watcher.stop()
+    if email_sender:
+        await email_sender.stop()
+    if stats_reconciler:
+        await stats_reconciler.stop()
+    if export_runner:
+        await export_runner.stop()
+    if token_revocations:
+        await token_revocations.stop()
+    await smtp_pool.close()
+    await recaptcha_verifier.close()
+    render_pool.shutdown()
     if client:
         client.close()
         logger.info("✅ Database connection closed")
@@ -0,0 +1,146 @@
+"""
+Static JSON snapshot publisher for the public catalog.
+
+Writes services.json, saas-products.json, about.json and site-bundle.json
+(plus precompressed .gz variants) into CATALOG_SNAPSHOT_DIR so nginx can
+serve catalog reads without reaching the backend. Files are written to a
+temporary name in the same directory and renamed into place, so readers
+never see a partial file.
+
+The app publishes once at startup and after every admin catalog write.
+To publish by hand (from backend/):
+    python snapshot_publisher.py --dir /var/www/catalog
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from catalog_cache import catalog_cache, CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+CATALOG_SNAPSHOT_DIR = os.environ.get('CATALOG_SNAPSHOT_DIR', '')
+
+# Cache key -> published file name (matches the public API paths)
+SNAPSHOT_FILES = {
+    "services": "services.json",
+    "saas_products": "saas-products.json",
+    "about_content": "about.json",
+    "site_bundle": "site-bundle.json",
+}
+
+_publish_lock = asyncio.Lock()
+
+
+async def collect_snapshots(db=None) -> Dict[str, CatalogSnapshot]:
+    """Gather catalog snapshots, from the app cache or straight from a database"""
+    from routes.public import (
+        load_services, load_saas_products, load_about_content, build_site_bundle
+    )
+
+    if db is None:
+        snapshots = {
+            "services": await catalog_cache.get_or_load("services", load_services),
+            "saas_products": await catalog_cache.get_or_load("saas_products", load_saas_products),
+            "about_content": await catalog_cache.get_or_load("about_content", load_about_content),
+        }
+    else:
+        snapshots = {
+            "services": await load_services(db),
+            "saas_products": await load_saas_products(db),
+            "about_content": await load_about_content(db),
+        }
+    snapshots["site_bundle"] = build_site_bundle(
+        snapshots["services"], snapshots["saas_products"], snapshots["about_content"]
+    )
+    return snapshots
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write data to path via a temporary file and rename"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_snapshot_files(directory: str, snapshots: Dict[str, CatalogSnapshot]):
+    """Write each snapshot and its gzip variant into directory"""
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+
+    for key, filename in SNAPSHOT_FILES.items():
+        snapshot = snapshots[key]
+        path = target / filename
+        gz_path = target / f"{filename}.gz"
+
+        # Missing About content is a 404; let nginx fall through to the API
+        if snapshot.data is None:
+            for stale in (path, gz_path):
+                if stale.exists():
+                    stale.unlink()
+            continue
+
+        atomic_write(gz_path, gzip.compress(snapshot.body, compresslevel=9, mtime=0))
+        atomic_write(path, snapshot.body)
+
+
+async def publish_catalog_snapshots(db=None, directory: Optional[str] = None) -> bool:
+    """Publish catalog snapshot files; a no-op when no directory is configured"""
+    directory = directory or CATALOG_SNAPSHOT_DIR
+    if not directory:
+        return False
+
+    try:
+        async with _publish_lock:
+            snapshots = await collect_snapshots(db)
+            await run_in_threadpool(write_snapshot_files, directory, snapshots)
+        logger.info(f"✅ Catalog snapshots published to {directory}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Catalog snapshot publish failed: {str(e)}")
+        return False
+
+
+async def _main(directory: str, mongo_url: str, db_name: str):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_url)
+    try:
+        if not await publish_catalog_snapshots(client[db_name], directory):
+            raise SystemExit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv(Path(__file__).parent / '.env')
+
+    parser = argparse.ArgumentParser(description="Publish static catalog JSON snapshots")
+    parser.add_argument("--dir", default=os.environ.get('CATALOG_SNAPSHOT_DIR', ''), help="output directory")
+    parser.add_argument("--mongo-url", default=os.environ.get('MONGO_URL'), help="MongoDB connection URL")
+    parser.add_argument("--db-name", default=os.environ.get('DB_NAME', 'mita_ict'), help="database name")
+    args = parser.parse_args()
+
+    if not args.dir:
+        parser.error("--dir or CATALOG_SNAPSHOT_DIR is required")
+    asyncio.run(_main(args.dir, args.mongo_url, args.db_name))
@@ -0,0 +1,394 @@
+"""
+Maintained counters for admin lists and the dashboard.
+
+The ``stats`` collection holds one document per counted collection
+(``_id`` is the collection name) with a ``total`` plus per-service
+(contacts), per-status (meeting requests) or lead-captured (chat sessions)
+counts. Write handlers call ``record_change`` with the document before and
+after the write, and the difference is applied with a single ``$inc``, so
+unfiltered totals are read in O(1) instead of counting on every request.
+
+The same increments are applied to ``analytics_daily``: one document per
+collection and UTC day of ``created_at`` (``_id`` "contacts:2026-01-31"),
+so dashboard charts read O(days) rollups instead of raw documents.
+
+Every recorded write also bumps the ``data_version`` in the same stats
+document, so derived artifacts (export files) can tell whether the data
+changed since they were built, and is appended to the sync changelog
+(``sync_feed``) so integrations can fetch only what changed. The stats,
+rollup and changelog writes are independent and run concurrently.
+
+Writes that bypass the API (or a crash between a write and its counter
+update) can make the counters drift; ``StatsReconciler`` recounts them
+with one ``$group`` per collection at startup and periodically after that,
+and rebuilds recent daily rollups with a ``$merge`` aggregation. A
+correction is applied as an ``$inc`` of the difference, and only if the
+data version shows no write during the recount. With several workers, only
+the one holding the ``locks`` lease reconciles.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+from background_tasks import BackgroundTask
+from sync_feed import in_sync_feed, record_sync_change
+
+logger = logging.getLogger(__name__)
+
+STATS_RECONCILE_INTERVAL_SECONDS = float(os.environ.get('STATS_RECONCILE_INTERVAL_SECONDS', 3600))
+# How many recent days each periodic reconciliation rebuilds in analytics_daily
+ANALYTICS_REBUILD_DAYS = int(os.environ.get('ANALYTICS_REBUILD_DAYS', 7))
+DAY_FORMAT = "%Y-%m-%d"
+
+# Counted collection -> the field its counters are broken down by
+COUNTED_COLLECTIONS = {
+    "contacts": "service",
+    "meeting_requests": "status",
+    "chat_sessions": "lead_captured",
+}
+
+
+def counter_key(value) -> str:
+    """Make a field value safe to use as a counter key"""
+    return str(value or "unknown").replace(".", "_").replace("$", "_")
+
+
+def counter_fields(collection: str, doc: Optional[dict]) -> Dict[str, int]:
+    """Counters a single document contributes to, as dotted field paths"""
+    if doc is None:
+        return {}
+    fields = {"total": 1}
+    if collection == "contacts":
+        fields[f"by_service.{counter_key(doc.get('service'))}"] = 1
+    elif collection == "meeting_requests":
+        fields[f"by_status.{counter_key(doc.get('status') or 'pending')}"] = 1
+    elif collection == "chat_sessions" and doc.get("lead_captured"):
+        fields["lead_captured"] = 1
+    return fields
+
+
+def counter_delta(collection: str, before: Optional[dict], after: Optional[dict]) -> Dict[str, int]:
+    """Counter increments for a write that turned before into after"""
+    delta = dict(counter_fields(collection, after))
+    for field, count in counter_fields(collection, before).items():
+        delta[field] = delta.get(field, 0) - count
+    return {field: count for field, count in delta.items() if count}
+
+
+def daily_deltas(collection: str, before: Optional[dict], after: Optional[dict]) -> Dict[str, Dict[str, int]]:
+    """Counter increments per day of created_at for a write that turned before into after"""
+    days = {}
+    for doc, sign in ((after, 1), (before, -1)):
+        if doc is None or not isinstance(doc.get("created_at"), datetime):
+            continue
+        delta = days.setdefault(doc["created_at"].strftime(DAY_FORMAT), {})
+        for field, count in counter_fields(collection, doc).items():
+            delta[field] = delta.get(field, 0) + sign * count
+    return {
+        day: {field: count for field, count in delta.items() if count}
+        for day, delta in days.items()
+        if any(delta.values())
+    }
+
+
+async def get_data_version(db, collection: str) -> int:
+    """Version of a collection's data; changes on every recorded write"""
+    doc = await db.stats.find_one({"_id": collection}, {"data_version": 1})
+    return (doc or {}).get("data_version", 0)
+
+
+async def record_change(db, collection: str, before: Optional[dict], after: Optional[dict]):
+    """Apply the counter changes of an insert (before=None), delete (after=None) or update
+
+    Pass created_at in before/after so the daily rollups can be updated too,
+    and id so the write reaches the sync feed.
+    """
+    now = datetime.utcnow()
+    writes = [(
+        "stats",
+        db.stats.update_one(
+            {"_id": collection},
+            {"$inc": {"data_version": 1, **counter_delta(collection, before, after)}, "$set": {"updated_at": now}},
+            upsert=True
+        )
+    )]
+    for day, day_delta in daily_deltas(collection, before, after).items():
+        writes.append((
+            "daily analytics",
+            db.analytics_daily.update_one(
+                {"_id": f"{collection}:{day}"},
+                {"$inc": day_delta, "$set": {"collection": collection, "date": day, "updated_at": now}},
+                upsert=True
+            )
+        ))
+    if in_sync_feed(collection, before, after):
+        writes.append(("sync change", record_sync_change(db, collection, (after or before).get("id"), deleted=after is None)))
+
+    results = await asyncio.gather(*(write for _, write in writes), return_exceptions=True)
+    for (name, _), result in zip(writes, results):
+        if isinstance(result, PyMongoError):
+            # The write itself succeeded; reconciliation will fix the counters
+            logger.warning(f"⚠️ Failed to record {collection} {name}: {str(result)}")
+        elif isinstance(result, BaseException):
+            raise result
+
+
+async def get_stats(db, collection: str) -> Optional[dict]:
+    """Return the counters for a collection, or None before the first reconcile"""
+    return await db.stats.find_one({"_id": collection}, {"_id": 0, "data_version": 0})
+
+
+async def get_total(db, collection: str) -> int:
+    """Unfiltered document count from the counters"""
+    stats = await get_stats(db, collection)
+    if stats is None:
+        return await db[collection].estimated_document_count()
+    return stats.get("total", 0)
+
+
+def nest_counters(counters: Dict[str, int]) -> dict:
+    """Turn {"by_service.saas": 3} into {"by_service": {"saas": 3}}"""
+    nested = {}
+    for path, count in counters.items():
+        parent, _, leaf = path.rpartition(".")
+        target = nested.setdefault(parent, {}) if parent else nested
+        target[leaf] = count
+    return nested
+
+
+def comparable(stats: dict) -> dict:
+    """Counters without timestamps or empty buckets (a bucket decremented to 0 is not drift)"""
+    return {
+        key: {bucket: count for bucket, count in value.items() if count} if isinstance(value, dict) else value
+        for key, value in stats.items()
+        if key not in ("updated_at", "reconciled_at", "data_version")
+    }
+
+
+async def recount(db, collection: str) -> dict:
+    """Count a collection from scratch, in the same shape as its stats document"""
+    field = COUNTED_COLLECTIONS[collection]
+    counters = {"total": 0}
+    if collection == "chat_sessions":
+        counters["lead_captured"] = 0
+    async for group in db[collection].aggregate([{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]):
+        for path, count in counter_fields(collection, {field: group["_id"]}).items():
+            counters[path] = counters.get(path, 0) + count * group["count"]
+    return nest_counters(counters)
+
+
+def flat_counters(stats: dict) -> Dict[str, int]:
+    """Turn {"by_service": {"saas": 3}} into {"by_service.saas": 3}, the inverse of nest_counters"""
+    flat = {}
+    for key, value in comparable(stats).items():
+        if isinstance(value, dict):
+            for bucket, count in value.items():
+                flat[f"{key}.{bucket}"] = count
+        else:
+            flat[key] = value
+    return flat
+
+
+async def reconcile_stats(db) -> Dict[str, dict]:
+    """Recount every counted collection and correct drifted counters
+
+    The correction is the difference between the recount and the stored
+    counters, applied only if the counters weren't updated during the
+    recount; otherwise the comparison is unreliable and the collection is
+    left for the next run. Returns the collections whose counters were
+    wrong, with old and new values.
+    """
+    drift = {}
+    for collection in COUNTED_COLLECTIONS:
+        stored = await db.stats.find_one({"_id": collection}, {"_id": 0})
+        counted = await recount(db, collection)
+        now = datetime.utcnow()
+        stored_counters = flat_counters(stored or {})
+        counted_counters = flat_counters(counted)
+        correction = {
+            path: counted_counters.get(path, 0) - stored_counters.get(path, 0)
+            for path in set(stored_counters) | set(counted_counters)
+        }
+        if stored is not None:
+            correction = {path: count for path, count in correction.items() if count}
+            if not correction:
+                await db.stats.update_one({"_id": collection}, {"$set": {"reconciled_at": now}})
+                continue
+            # Something wrote around the API; artifacts built from this data may be stale
+            correction["data_version"] = 1
+
+        # Every recorded write bumps data_version, so an unchanged version means
+        # no counter update landed during the recount
+        version = (stored or {}).get("data_version")
+        try:
+            result = await db.stats.update_one(
+                {"_id": collection, "data_version": version if version is not None else {"$exists": False}},
+                {"$inc": correction, "$set": {"updated_at": now, "reconciled_at": now}},
+                upsert=stored is None
+            )
+            applied = result.matched_count or result.upserted_id is not None
+        except DuplicateKeyError:
+            # A write created the stats document during the recount
+            applied = False
+        if not applied:
+            logger.info(f"ℹ️ {collection} stats changed during the recount, reconciling next time")
+            continue
+
+        if stored is None:
+            logger.info(f"✅ {collection} stats initialized: {counted}")
+        else:
+            stored = comparable(stored)
+            drift[collection] = {"stored": stored, "counted": counted}
+            logger.warning(f"⚠️ {collection} stats drifted, reconciled: {stored} -> {counted}")
+    return drift
+
+
+async def take_lock(db, name: str, owner: str, seconds: float) -> bool:
+    """Take or renew a lease on a named lock; False while another owner holds it"""
+    now = datetime.utcnow()
+    try:
+        await db.locks.update_one(
+            {"_id": name, "$or": [{"owner": owner}, {"locked_until": {"$lte": now}}]},
+            {"$set": {"owner": owner, "locked_until": now + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def bucket_key_expression(field: str, default: str) -> dict:
+    """Aggregation equivalent of counter_key for a document field"""
+    value = {"$ifNull": [f"${field}", ""]}
+    key = {"$cond": [{"$eq": [value, ""]}, default, {"$toString": value}]}
+    key = {"$replaceAll": {"input": key, "find": ".", "replacement": "_"}}
+    return {"$replaceAll": {"input": key, "find": {"$literal": "$"}, "replacement": "_"}}
+
+
+def rollup_pipeline(collection: str, since: Optional[datetime], rebuilt_at: datetime) -> List[dict]:
+    """Aggregation that recomputes daily rollups for a collection and merges them in"""
+    day = {"$dateToString": {"format": DAY_FORMAT, "date": "$created_at"}}
+    pipeline = [{"$match": {"created_at": {"$gte": since} if since else {"$type": "date"}}}]
+
+    if collection == "chat_sessions":
+        pipeline += [
+            {"$group": {
+                "_id": day,
+                "total": {"$sum": 1},
+                "lead_captured": {"$sum": {"$cond": [{"$eq": ["$lead_captured", True]}, 1, 0]}}
+            }},
+            {"$project": {"_id": 0, "date": "$_id", "total": 1, "lead_captured": 1}}
+        ]
+    else:
+        field = COUNTED_COLLECTIONS[collection]
+        breakdown = "by_service" if collection == "contacts" else "by_status"
+        default = "unknown" if collection == "contacts" else "pending"
+        pipeline += [
+            {"$group": {"_id": {"date": day, "key": bucket_key_expression(field, default)}, "count": {"$sum": 1}}},
+            {"$group": {
+                "_id": "$_id.date",
+                "total": {"$sum": "$count"},
+                "buckets": {"$push": {"k": "$_id.key", "v": "$count"}}
+            }},
+            {"$project": {"_id": 0, "date": "$_id", "total": 1, breakdown: {"$arrayToObject": "$buckets"}}}
+        ]
+
+    pipeline += [
+        {"$addFields": {
+            "_id": {"$concat": [f"{collection}:", "$date"]},
+            "collection": collection,
+            "updated_at": rebuilt_at,
+            "rebuilt_at": rebuilt_at
+        }},
+        {"$merge": {"into": "analytics_daily", "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ]
+    return pipeline
+
+
+async def rebuild_daily_rollups(db, days: Optional[int] = ANALYTICS_REBUILD_DAYS):
+    """Recompute analytics_daily for the last `days` days (all history if None)"""
+    rebuilt_at = datetime.utcnow()
+    since = None
+    if days is not None:
+        since = datetime.combine((rebuilt_at - timedelta(days=days - 1)).date(), datetime.min.time())
+
+    for collection in COUNTED_COLLECTIONS:
+        await db[collection].aggregate(rollup_pipeline(collection, since, rebuilt_at)).to_list(None)
+        # Days in the window with no documents left (and no writes since) are stale
+        stale = {"collection": collection, "updated_at": {"$lt": rebuilt_at}}
+        if since:
+            stale["date"] = {"$gte": since.strftime(DAY_FORMAT)}
+        await db.analytics_daily.delete_many(stale)
+
+    logger.info(f"✅ Daily analytics rebuilt ({f'last {days} days' if days else 'all history'})")
+
+
+async def get_daily_analytics(db, start: datetime, end: datetime) -> dict:
+    """Per-day rollups between start and end (inclusive), with gaps filled by zeros"""
+    first, last = start.strftime(DAY_FORMAT), end.strftime(DAY_FORMAT)
+    rollups = await db.analytics_daily.find(
+        {"date": {"$gte": first, "$lte": last}},
+        {"_id": 0, "updated_at": 0, "rebuilt_at": 0}
+    ).to_list(None)
+    by_day = {(r["collection"], r["date"]): r for r in rollups}
+
+    days = []
+    totals = {collection: {"total": 0} for collection in COUNTED_COLLECTIONS}
+    day = start.date()
+    while day <= end.date():
+        date = day.strftime(DAY_FORMAT)
+        entry = {"date": date}
+        for collection in COUNTED_COLLECTIONS:
+            rollup = by_day.get((collection, date), {})
+            counts = comparable({key: value for key, value in rollup.items() if key not in ("collection", "date")})
+            counts.setdefault("total", 0)
+            entry[collection] = counts
+            add_counts(totals[collection], counts)
+        days.append(entry)
+        day += timedelta(days=1)
+
+    return {"start": first, "end": last, "days": days, "totals": totals}
+
+
+def add_counts(into: dict, counts: dict):
+    """Sum nested counter dicts into `into`"""
+    for key, value in counts.items():
+        if isinstance(value, dict):
+            add_counts(into.setdefault(key, {}), value)
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+class StatsReconciler(BackgroundTask):
+    """Recount the stats counters now and then every interval
+
+    Every worker runs one, but only the holder of the "stats_reconcile" lock
+    does the work; the lease outlives one interval, so the holder renews it
+    on its next run and another worker takes over if it stops.
+    """
+
+    error_label = "Stats reconciliation"
+
+    def __init__(self, db, interval: float = STATS_RECONCILE_INTERVAL_SECONDS):
+        super().__init__(interval)
+        self.db = db
+        self.owner = uuid.uuid4().hex
+
+    async def reconcile(self) -> bool:
+        """Reconcile counters and rollups if this worker holds the lock; returns whether it did"""
+        if not await take_lock(self.db, "stats_reconcile", self.owner, self.poll_interval * 2):
+            return False
+        await reconcile_stats(self.db)
+        # First run on a database without rollups builds all history
+        has_rollups = await self.db.analytics_daily.find_one({}, {"_id": 1})
+        await rebuild_daily_rollups(self.db, ANALYTICS_REBUILD_DAYS if has_rollups else None)
+        return True
+
+    async def run_once(self):
+        await self.reconcile()
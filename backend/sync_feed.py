@@ -0,0 +1,206 @@
+"""
+Incremental sync feed for CRM integrations.
+
+Every recorded write to a synced collection (``stats_counters.record_change``)
+appends an entry to the ``sync_changes`` changelog: the document id, whether
+it was deleted, and a per-collection sequence number from
+``sync_sequences``. A client pages through the changelog with an opaque
+``since`` token, so the cost of a sync is proportional to the number of
+changes, not the size of the collection:
+
+- without ``since`` the feed starts with a snapshot of the collection, paged
+  by ``_id``, and remembers the sequence number it started at;
+- after the snapshot (and with every later token) it returns the documents
+  changed after that sequence number, each once, in its current state, with
+  a tombstone for each deleted document.
+
+Writes that happen during the snapshot are replayed afterwards; applying the
+same upsert twice is harmless. A page ends at the first entry newer than
+SYNC_SETTLE_SECONDS, so a write that took a lower sequence number but hasn't
+inserted its changelog entry yet can't be skipped.
+
+The changelog is kept for SYNC_RETENTION_DAYS (TTL index on ``at``); older
+tokens are rejected and the client has to start over with a snapshot.
+"""
+
+import base64
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from exports import CONTACT_EXPORT_FIELDS, CHAT_EXPORT_FIELDS, MEETING_EXPORT_FIELDS, projection_for
+
+logger = logging.getLogger(__name__)
+
+SYNC_RETENTION_DAYS = float(os.environ.get('SYNC_RETENTION_DAYS', 30))
+SYNC_SETTLE_SECONDS = float(os.environ.get('SYNC_SETTLE_SECONDS', 2))
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 1000
+
+# Feed name -> collection, which documents belong to the feed, and the fields returned
+SYNC_FEEDS = {
+    "contacts": {"collection": "contacts", "query": {}, "fields": CONTACT_EXPORT_FIELDS},
+    "leads": {"collection": "chat_sessions", "query": {"lead_captured": True}, "fields": CHAT_EXPORT_FIELDS},
+    "meetings": {"collection": "meeting_requests", "query": {}, "fields": MEETING_EXPORT_FIELDS},
+}
+SYNCED_COLLECTIONS = {spec["collection"] for spec in SYNC_FEEDS.values()}
+
+
+class SyncTokenError(ValueError):
+    """The since token is malformed"""
+
+
+class SyncTokenExpired(Exception):
+    """The changes after the since token are no longer in the changelog"""
+
+
+def in_sync_feed(collection: str, before: Optional[dict], after: Optional[dict]) -> bool:
+    """Whether a write touches a feed: the document belongs to one before or after it
+
+    Chat sessions only reach the leads feed once a lead is captured, so the
+    changelog doesn't grow by one entry per chat message.
+    """
+    return any(
+        spec["collection"] == collection and doc is not None and matches(doc, spec["query"])
+        for spec in SYNC_FEEDS.values()
+        for doc in (before, after)
+    )
+
+
+async def record_sync_change(db, collection: str, doc_id: Optional[str], deleted: bool):
+    """Append a write to the changelog of a synced collection"""
+    if collection not in SYNCED_COLLECTIONS or not doc_id:
+        return
+    # Taken before the sequence number: an entry that looks settled had its
+    # sequence number allocated at least SYNC_SETTLE_SECONDS ago
+    now = datetime.utcnow()
+    sequence = await db.sync_sequences.find_one_and_update(
+        {"_id": collection},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    await db.sync_changes.insert_one({
+        "collection": collection,
+        "seq": sequence["seq"],
+        "doc_id": doc_id,
+        "deleted": deleted,
+        "at": now
+    })
+
+
+async def current_sequence(db, collection: str) -> int:
+    doc = await db.sync_sequences.find_one({"_id": collection})
+    return doc["seq"] if doc else 0
+
+
+def encode_sync_token(seq: int, snapshot_after: Optional[str] = None) -> str:
+    """Opaque token: changelog position, when it was issued, and the snapshot position if any"""
+    position = {"s": seq, "t": datetime.utcnow().isoformat()}
+    if snapshot_after is not None:
+        position["i"] = snapshot_after
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[int, datetime, Optional[str]]:
+    """Returns (seq, issued_at, snapshot_after)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        seq = int(position["s"])
+        issued_at = datetime.fromisoformat(position["t"])
+        snapshot_after = str(ObjectId(position["i"])) if position.get("i") else None
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise SyncTokenError("Invalid sync token")
+    return seq, issued_at, snapshot_after
+
+
+def feed_doc(doc: dict, spec: dict) -> dict:
+    return {field: doc.get(field) for field in spec["fields"]}
+
+
+def matches(doc: dict, query: dict) -> bool:
+    return all(doc.get(field) == value for field, value in query.items())
+
+
+async def snapshot_page(db, spec: dict, start_seq: int, snapshot_after: Optional[str], limit: int) -> dict:
+    """The next page of the initial snapshot, paged by _id"""
+    query = dict(spec["query"])
+    if snapshot_after:
+        query["_id"] = {"$gt": ObjectId(snapshot_after)}
+    docs = await db[spec["collection"]].find(
+        query, dict(projection_for(spec["fields"]), _id=1)
+    ).sort("_id", 1).limit(limit).to_list(limit)
+
+    has_more = len(docs) == limit
+    next_since = encode_sync_token(start_seq, str(docs[-1]["_id"]) if has_more else None)
+    return {
+        "changes": [{"id": doc.get("id"), "deleted": False, "doc": feed_doc(doc, spec)} for doc in docs],
+        "next_since": next_since,
+        "has_more": has_more
+    }
+
+
+async def changes_page(db, spec: dict, since_seq: int, limit: int) -> dict:
+    """Documents changed after since_seq, in their current state, plus tombstones"""
+    collection = spec["collection"]
+    settled = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    entries = await db.sync_changes.find(
+        {"collection": collection, "seq": {"$gt": since_seq}},
+        {"_id": 0, "seq": 1, "doc_id": 1, "at": 1}
+    ).sort("seq", 1).limit(limit).to_list(limit)
+    has_more = len(entries) == limit
+    # Stop at the first unsettled entry: a lower sequence number may still be
+    # in flight, and the page must not move past it
+    for position, entry in enumerate(entries):
+        if entry["at"] > settled:
+            entries = entries[:position]
+            has_more = False
+            break
+
+    # Each document once, at the position of its last change in this page
+    last_change = {}
+    for entry in entries:
+        last_change.pop(entry["doc_id"], None)
+        last_change[entry["doc_id"]] = entry
+    projection = projection_for(list(spec["fields"]) + list(spec["query"]))
+    docs = await db[collection].find({"id": {"$in": list(last_change)}}, projection).to_list(None)
+    current = {doc["id"]: doc for doc in docs}
+
+    changes = []
+    for doc_id, entry in last_change.items():
+        doc = current.get(doc_id)
+        if doc is None:
+            changes.append({"id": doc_id, "deleted": True, "deleted_at": entry["at"]})
+        elif matches(doc, spec["query"]):
+            changes.append({"id": doc_id, "deleted": False, "doc": feed_doc(doc, spec)})
+
+    next_seq = entries[-1]["seq"] if entries else since_seq
+    return {"changes": changes, "next_since": encode_sync_token(next_seq), "has_more": has_more}
+
+
+async def sync_page(db, feed: str, since: Optional[str], limit: int = SYNC_PAGE_SIZE) -> dict:
+    """One page of a sync feed; pass the returned next_since to get the next one
+
+    Raises SyncTokenError for a malformed token and SyncTokenExpired when the
+    changelog no longer covers it.
+    """
+    spec = SYNC_FEEDS[feed]
+    limit = max(1, min(limit, SYNC_MAX_PAGE_SIZE))
+    if not since:
+        return await snapshot_page(db, spec, await current_sequence(db, spec["collection"]), None, limit)
+
+    seq, issued_at, snapshot_after = decode_sync_token(since)
+    # Entries after the token were logged at most SYNC_SETTLE_SECONDS before it was issued
+    oldest_kept = datetime.utcnow() - timedelta(days=SYNC_RETENTION_DAYS)
+    if issued_at - timedelta(seconds=SYNC_SETTLE_SECONDS) < oldest_kept:
+        raise SyncTokenExpired()
+    if snapshot_after:
+        return await snapshot_page(db, spec, seq, snapshot_after, limit)
+    return await changes_page(db, spec, seq, limit)
@@ -0,0 +1,83 @@
+"""
+Shared test setup
+
+auth refuses to import without a JWT signing key; give the tests one before
+any test module imports it.
+
+Tests that need MongoDB take the `run_with_db` fixture. It connects to
+TEST_MONGO_URL (override the `mongo_url` fixture in a module that needs
+another server), skips the test if MongoDB is not running, inserts the
+module's `db_seed` documents and drops the database afterwards.
+
+Tests of the HTTP routes take `api_client` as well: inside the body,
+`async with api_client(db) as client:` gives an in-process client for the
+app that uses that database and treats every request as a signed-in admin.
+"""
+import os
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key-not-for-production")
+
+import pytest
+import asyncio
+import uuid
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+TEST_MONGO_URL = os.environ.get('TEST_MONGO_URL', 'mongodb://localhost:27017')
+
+
+async def open_test_db(url: str, prefix: str):
+    """Connect to a throwaway database, skipping if MongoDB is not running"""
+    client = AsyncIOMotorClient(url, serverSelectionTimeoutMS=2000)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip(f"MongoDB not reachable at {url}")
+    return client, client[f"{prefix}_{uuid.uuid4().hex[:8]}"]
+
+
+@pytest.fixture
+def mongo_url():
+    return TEST_MONGO_URL
+
+
+@pytest.fixture
+def db_seed():
+    """Documents to insert before each test, by collection"""
+    return {}
+
+
+@pytest.fixture
+def run_with_db(request, mongo_url, db_seed):
+    """Run an async test body against a throwaway database: run_with_db(body)"""
+    def run(test):
+        async def run_async():
+            client, db = await open_test_db(mongo_url, request.module.__name__)
+            try:
+                for collection, docs in db_seed.items():
+                    await db[collection].insert_many([dict(doc) for doc in docs])
+                await test(db)
+            finally:
+                await client.drop_database(db.name)
+                client.close()
+        asyncio.run(run_async())
+    return run
+
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """Open an in-process client for the API app against a test database: api_client(db)"""
+    import server
+    from auth import get_current_user
+    from catalog_cache import catalog_cache
+    
+    monkeypatch.setitem(server.app.dependency_overrides, get_current_user, lambda: {"username": "admin@example.com"})
+    
+    def connect(db):
+        monkeypatch.setattr(server, "db", db)
+        # Nothing cached from another test's database
+        catalog_cache.invalidate()
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test")
+    return connect
@@ -0,0 +1,160 @@
+"""
+Backend API Tests for admin contact management
+Tests: Cursor pagination, page-number compatibility mode, page size cap, search
+
+Requires a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+from datetime import datetime, timedelta
+
+from contact_search import contact_search_fields
+
+CONTACTS = 12
+
+
+@pytest.fixture
+def db_seed():
+    """Contacts a day apart, with two sharing a timestamp so the id breaks the tie"""
+    base = datetime(2026, 1, 1)
+    contacts = []
+    for i in range(CONTACTS):
+        email = f"client{i:02d}@example{i % 3}.com"
+        phone = f"+381 60 555 {i:04d}"
+        contacts.append({
+            "id": f"c{i:02d}", "name": f"Client {i}", "email": email, "phone": phone,
+            "service": "consulting" if i % 4 == 0 else "saas", "comment": "Hi",
+            "created_at": base + timedelta(days=min(i, CONTACTS - 2)),
+            **contact_search_fields(email, phone)
+        })
+    return {"contacts": contacts}
+
+
+async def create_text_index(db):
+    """The text index server startup creates; $text search needs it"""
+    await db.contacts.create_index([("name", "text"), ("email", "text"), ("service", "text")])
+
+
+class TestContactsPagination:
+    """Test cursor and page-number pagination of contacts"""
+
+    def test_cursor_pages_cover_all_contacts_once(self, run_with_db, api_client):
+        """Walking next_cursor returns every contact exactly once, newest first"""
+        async def body(db):
+            async with api_client(db) as client:
+                seen = []
+                cursor = None
+                while True:
+                    params = {"limit": 5}
+                    if cursor:
+                        params["cursor"] = cursor
+                    response = await client.get("/api/admin/contacts", params=params)
+                    assert response.status_code == 200
+                    data = response.json()
+                    assert len(data["data"]) <= 5
+                    seen.extend(data["data"])
+                    cursor = data["next_cursor"]
+                    if not cursor:
+                        break
+
+                ids = [c["id"] for c in seen]
+                assert len(ids) == len(set(ids)) == CONTACTS
+                keys = [(c["created_at"], c["id"]) for c in seen]
+                assert keys == sorted(keys, reverse=True)
+
+                response = await client.get("/api/admin/contacts", params={"include_total": "true", "limit": 1})
+                assert response.json()["total"] == CONTACTS
+
+        run_with_db(body)
+        print("✅ Cursor pagination working")
+
+    def test_page_mode_compatibility(self, run_with_db, api_client):
+        """page parameter still returns total and pages"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"page": 3, "limit": 5, "service": "saas"})
+                assert response.status_code == 200
+                data = response.json()
+                for key in ["data", "total", "page", "limit", "pages"]:
+                    assert key in data
+                assert (data["total"], data["page"], data["pages"]) == (9, 3, 2)
+                assert data["data"] == []
+
+        run_with_db(body)
+        print("✅ Page mode working")
+
+    def test_invalid_cursor_rejected(self, run_with_db, api_client):
+        """A malformed cursor is a 400, not a server error"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"cursor": "not-a-cursor"})
+                assert response.status_code == 400
+
+        run_with_db(body)
+        print("✅ Invalid cursor rejected")
+
+    def test_page_size_capped(self, run_with_db, api_client):
+        """limit must be between 1 and 200"""
+        async def body(db):
+            async with api_client(db) as client:
+                assert (await client.get("/api/admin/contacts", params={"limit": 200})).status_code == 200
+                assert (await client.get("/api/admin/contacts", params={"limit": 201})).status_code == 422
+                assert (await client.get("/api/admin/contacts", params={"limit": 0})).status_code == 422
+
+        run_with_db(body)
+        print("✅ Page size capped")
+
+
+class TestContactSearch:
+    """Test admin contact search"""
+
+    def test_text_search_ranked(self, run_with_db, api_client):
+        """Free-text search returns relevance scores, best first"""
+        async def body(db):
+            await create_text_index(db)
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"search": "consulting", "limit": 10})
+                assert response.status_code == 200
+                data = response.json()["data"]
+                assert sorted(c["id"] for c in data) == ["c00", "c04", "c08"]
+                scores = [c["score"] for c in data]
+                assert scores == sorted(scores, reverse=True)
+
+        run_with_db(body)
+        print("✅ Text search ranked")
+
+    def test_email_prefix_search(self, run_with_db, api_client):
+        """Email fragments match the start of the address, case-insensitively"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"search": "CLIENT07@", "limit": 50})
+                assert response.status_code == 200
+                assert [c["email"] for c in response.json()["data"]] == ["client07@example1.com"]
+
+        run_with_db(body)
+        print("✅ Email prefix search working")
+
+    def test_phone_search(self, run_with_db, api_client):
+        """Phone searches ignore formatting"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"search": "555-0011", "limit": 50})
+                assert response.status_code == 200
+                assert [c["id"] for c in response.json()["data"]] == ["c11"]
+
+        run_with_db(body)
+        print("✅ Phone search working")
+
+    def test_regex_characters_are_literal(self, run_with_db, api_client):
+        """Regex metacharacters in the search are not interpreted"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/admin/contacts", params={"search": ".*@", "page": 1})
+                assert response.status_code == 200
+                assert response.json()["total"] == 0
+
+        run_with_db(body)
+        print("✅ Regex characters treated literally")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,66 @@
+"""
+Tests for the shared background task loop
+Tests: Errors in a pass don't stop the task, wake, clean stop
+"""
+import pytest
+import asyncio
+
+from pymongo.errors import AutoReconnect
+
+from background_tasks import BackgroundTask
+
+
+class FlakyTask(BackgroundTask):
+    """Fails its first passes with the given errors, then counts successful passes"""
+
+    error_label = "Flaky task"
+
+    def __init__(self, errors):
+        super().__init__(poll_interval=0.01)
+        self.errors = list(errors)
+        self.passes = 0
+
+    async def run_once(self):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.passes += 1
+
+
+class TestBackgroundTask:
+    """Test the loop lifecycle"""
+
+    def test_errors_do_not_stop_the_loop(self, caplog):
+        """A database error and an unexpected error are logged and the next pass still runs"""
+        async def run():
+            task = FlakyTask([AutoReconnect("down"), KeyError("status")])
+            task.start()
+            await asyncio.sleep(0.2)
+            assert all(not t.done() for t in task._tasks)
+            await task.stop()
+            return task
+
+        task = asyncio.run(run())
+        assert task.passes > 0 and task._tasks == []
+        assert "Flaky task error: down" in caplog.text
+        assert any(record.exc_info and isinstance(record.exc_info[1], KeyError) for record in caplog.records)
+        print("✅ Loop survives failed passes")
+
+    def test_wake_runs_next_pass_now(self):
+        async def run():
+            task = FlakyTask([])
+            task.poll_interval = 60
+            task.start()
+            await asyncio.sleep(0.05)
+            passes = task.passes
+            task.wake()
+            await asyncio.sleep(0.05)
+            await task.stop()
+            return passes, task.passes
+
+        before, after = asyncio.run(run())
+        assert after == before + 1
+        print("✅ Wake starts the next pass")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,110 @@
+"""
+Tests for cross-worker cache invalidation
+Tests: Change-stream invalidation, version-document polling fallback
+
+Requires a local single-node replica set, e.g.:
+    docker run -d -p 27017:27017 mongo:6.0 --replSet rs0
+    docker exec <container> mongosh --eval "rs.initiate()"
+"""
+import pytest
+import asyncio
+import os
+
+from catalog_cache import CatalogCache
+from cache_sync import CacheInvalidationWatcher, publish_change
+
+@pytest.fixture
+def mongo_url():
+    """Change streams need a replica set"""
+    return os.environ.get('TEST_MONGO_URL', 'mongodb://localhost:27017/?replicaSet=rs0&directConnection=true')
+
+
+async def wait_for(condition, timeout: float = 5):
+    """Poll a condition until it holds or the timeout expires"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+class TestChangeStreamInvalidation:
+    """Test invalidation across simulated workers via change streams"""
+    
+    def test_write_invalidates_every_worker(self, run_with_db):
+        """A write to a watched collection invalidates all worker caches"""
+        async def body(db):
+            workers = [CatalogCache(), CatalogCache()]
+            watchers = [CacheInvalidationWatcher(db, cache=cache) for cache in workers]
+            try:
+                for watcher in watchers:
+                    watcher.start()
+                    await watcher.wait_ready()
+                if any(w.mode != "change_stream" for w in watchers):
+                    pytest.skip("MongoDB is not running as a replica set")
+                
+                before = [cache.version for cache in workers]
+                await db.services.insert_one({"id": "service-x", "title": "X"})
+                assert await wait_for(lambda: all(c.version > v for c, v in zip(workers, before)))
+                
+                before = [cache.version for cache in workers]
+                await db.social_integrations.update_one({"id": "s"}, {"$set": {"x": 1}}, upsert=True)
+                assert await wait_for(lambda: all(c.version > v for c, v in zip(workers, before)))
+            finally:
+                for watcher in watchers:
+                    await watcher.stop()
+        
+        run_with_db(body)
+        print("✅ Change stream invalidates every worker")
+    
+    def test_unwatched_collection_is_ignored(self, run_with_db):
+        """Writes to other collections do not invalidate the cache"""
+        async def body(db):
+            cache = CatalogCache()
+            watcher = CacheInvalidationWatcher(db, cache=cache)
+            try:
+                watcher.start()
+                await watcher.wait_ready()
+                if watcher.mode != "change_stream":
+                    pytest.skip("MongoDB is not running as a replica set")
+                
+                before = cache.version
+                await db.contacts.insert_one({"id": "contact-x"})
+                await db.services.insert_one({"id": "service-x"})
+                assert await wait_for(lambda: cache.version > before)
+                # Only the services write should have been seen
+                assert cache.version == before + 1
+            finally:
+                await watcher.stop()
+        
+        run_with_db(body)
+        print("✅ Unwatched collections ignored")
+
+
+class TestPollingFallback:
+    """Test the version-document polling fallback"""
+    
+    def test_publish_change_reaches_polling_worker(self, run_with_db):
+        """A change published by one worker invalidates a polling worker"""
+        async def body(db):
+            writer, reader = CatalogCache(), CatalogCache()
+            watcher = CacheInvalidationWatcher(db, cache=reader, poll_interval=0.1, use_change_streams=False)
+            try:
+                watcher.start()
+                await watcher.wait_ready()
+                assert watcher.mode == "polling"
+                
+                before = reader.version
+                await publish_change(db, "services", cache=writer)
+                assert writer.version == 1
+                assert await wait_for(lambda: reader.version > before)
+            finally:
+                await watcher.stop()
+        
+        run_with_db(body)
+        print("✅ Polling fallback invalidates other workers")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,277 @@
+"""
+Tests for the public catalog cache
+Tests: Version-keyed caching, hit/miss counters, admin write-through invalidation,
+ETag / If-None-Match conditional responses, combined site bundle
+
+The route tests require a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+import asyncio
+
+from catalog_cache import CatalogCache, CatalogSnapshot, etag_matches, catalog_cache
+
+
+@pytest.fixture
+def db_seed():
+    """A small catalog"""
+    return {
+        "services": [
+            {"id": "s1", "title": "Network design", "description": "LAN and WAN", "icon": "network"},
+            {"id": "s2", "title": "Cloud migration", "description": "Move to the cloud", "icon": "cloud"}
+        ],
+        "saas_products": [
+            {"id": "p1", "title": "Planner", "description": "Scheduling", "link": "https://example.com", "features": ["Calendar"]}
+        ],
+        "about_content": [
+            {"id": "a1", "title": "About", "content": "Where technology meets strategy", "expertise": []}
+        ]
+    }
+
+
+class TestCatalogCache:
+    """Test the in-process catalog cache"""
+    
+    def test_hit_after_first_load(self):
+        """Second read is served from memory"""
+        cache = CatalogCache()
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            return ["service"]
+        
+        async def run():
+            first = await cache.get_or_load("services", loader)
+            second = await cache.get_or_load("services", loader)
+            return first, second
+        
+        first, second = asyncio.run(run())
+        assert first == second == ["service"]
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        print("✅ Cache hit served from memory")
+    
+    def test_invalidate_reloads(self):
+        """Bumping the version forces a reload"""
+        cache = CatalogCache()
+        values = iter([["old"], ["new"]])
+        
+        async def loader():
+            return next(values)
+        
+        async def run():
+            before = await cache.get_or_load("services", loader)
+            cache.invalidate("services")
+            after = await cache.get_or_load("services", loader)
+            return before, after
+        
+        before, after = asyncio.run(run())
+        assert before == ["old"]
+        assert after == ["new"]
+        assert cache.stats()["misses"] == 2
+        assert cache.stats()["version"] == 1
+        print("✅ Invalidation reloads content")
+    
+    def test_write_during_load_is_not_hidden(self):
+        """An invalidation that lands mid-load leaves the entry stale"""
+        cache = CatalogCache()
+        values = iter([["old"], ["new"]])
+        
+        async def loader():
+            value = next(values)
+            if value == ["old"]:
+                cache.invalidate("services")
+            return value
+        
+        async def run():
+            await cache.get_or_load("services", loader)
+            return await cache.get_or_load("services", loader)
+        
+        assert asyncio.run(run()) == ["new"]
+        print("✅ Concurrent write is visible on next read")
+    
+    def test_ttl_expires_entry(self):
+        """Entries with a TTL reload once they are older than the TTL"""
+        cache = CatalogCache()
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            return "prompt"
+        
+        async def run():
+            await cache.get_or_load("chat_system_prompt", loader, ttl=60)
+            await cache.get_or_load("chat_system_prompt", loader, ttl=60)
+            assert len(calls) == 1
+            await asyncio.sleep(0.02)
+            await cache.get_or_load("chat_system_prompt", loader, ttl=0.01)
+        
+        asyncio.run(run())
+        assert len(calls) == 2
+        print("✅ TTL safety net reloads expired entries")
+    
+    def test_concurrent_misses_load_once(self):
+        """Concurrent cold reads share a single load"""
+        cache = CatalogCache()
+        calls = []
+        
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["service"]
+        
+        async def run():
+            return await asyncio.gather(*[cache.get_or_load("services", loader) for _ in range(10)])
+        
+        results = asyncio.run(run())
+        assert all(r == ["service"] for r in results)
+        assert len(calls) == 1
+        print("✅ Concurrent misses coalesced")
+
+
+class TestETags:
+    """Test ETag generation and If-None-Match matching"""
+    
+    def test_etag_is_content_derived(self):
+        """Equal content yields equal ETags, different content does not"""
+        a = CatalogSnapshot([{"id": "service-1", "title": "A"}])
+        b = CatalogSnapshot([{"id": "service-1", "title": "A"}])
+        c = CatalogSnapshot([{"id": "service-1", "title": "B"}])
+        assert a.etag == b.etag
+        assert a.etag != c.etag
+        assert a.etag.startswith('"') and a.etag.endswith('"')
+        print(f"✅ Content-derived ETag: {a.etag}")
+    
+    def test_snapshot_body_is_prebuilt_json(self):
+        """Snapshot body is the compact JSON encoding of its content"""
+        snapshot = CatalogSnapshot([{"id": "service-1", "title": "Åre"}])
+        assert snapshot.body == '[{"id":"service-1","title":"Åre"}]'.encode("utf-8")
+        print("✅ Pre-encoded snapshot body working")
+    
+    def test_if_none_match_parsing(self):
+        """Lists, weak validators and wildcards match"""
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"xyz", "abc"', etag)
+        assert etag_matches('W/"abc"', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"xyz"', etag)
+        assert not etag_matches(None, etag)
+        print("✅ If-None-Match parsing working")
+    
+    @pytest.mark.parametrize("path", ["/api/services", "/api/saas-products", "/api/about"])
+    def test_not_modified(self, path, run_with_db, api_client):
+        """A matching If-None-Match gets 304 with no body"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get(path)
+                assert response.status_code == 200
+                etag = response.headers.get("ETag")
+                assert etag
+                
+                cached = await client.get(path, headers={"If-None-Match": etag})
+                assert cached.status_code == 304
+                assert cached.content == b""
+                assert cached.headers.get("ETag") == etag
+        
+        run_with_db(body)
+        print(f"✅ Conditional GET working for {path}")
+
+
+class TestSiteBundle:
+    """Test the combined site bundle endpoint"""
+    
+    def test_bundle_matches_individual_routes(self, run_with_db, api_client):
+        """Bundle carries the same payloads as the per-resource routes"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/site-bundle")
+                assert response.status_code == 200
+                data = response.json()
+                
+                assert data["services"] == (await client.get("/api/services")).json()
+                assert data["saas_products"] == (await client.get("/api/saas-products")).json()
+                assert data["about"] == (await client.get("/api/about")).json()
+                assert [s["id"] for s in data["services"]] == ["s1", "s2"]
+        
+        run_with_db(body)
+        print("✅ Site bundle matches the individual routes")
+    
+    def test_bundle_not_modified(self, run_with_db, api_client):
+        """One ETag covers the whole bundle"""
+        async def body(db):
+            async with api_client(db) as client:
+                response = await client.get("/api/site-bundle")
+                etag = response.headers.get("ETag")
+                assert etag
+                
+                cached = await client.get("/api/site-bundle", headers={"If-None-Match": etag})
+                assert cached.status_code == 304
+        
+        run_with_db(body)
+        print("✅ Site bundle conditional GET working")
+
+
+class TestCatalogWriteThrough:
+    """Test that admin edits are visible on the next public read"""
+    
+    def test_service_edit_visible_on_next_read(self, run_with_db, api_client):
+        """Create, update and delete a service and read it back each time"""
+        async def titles(client):
+            return [s["title"] for s in (await client.get("/api/services")).json()]
+        
+        async def body(db):
+            async with api_client(db) as client:
+                # Warm the cache
+                bundle_etag = (await client.get("/api/site-bundle")).headers["ETag"]
+                assert await titles(client) == ["Network design", "Cloud migration"]
+                
+                created = await client.post(
+                    "/api/admin/services",
+                    json={"title": "Security audit", "description": "Cache test", "icon": "shield"}
+                )
+                assert created.status_code == 200
+                service_id = created.json()["id"]
+                assert "Security audit" in await titles(client)
+                
+                bundle = await client.get("/api/site-bundle", headers={"If-None-Match": bundle_etag})
+                assert bundle.status_code == 200
+                assert "Security audit" in [s["title"] for s in bundle.json()["services"]]
+                
+                updated = await client.put(
+                    f"/api/admin/services/{service_id}",
+                    json={"title": "Security review", "description": "Cache test", "icon": "shield"}
+                )
+                assert updated.status_code == 200
+                current = await titles(client)
+                assert "Security review" in current
+                assert "Security audit" not in current
+                
+                deleted = await client.delete(f"/api/admin/services/{service_id}")
+                assert deleted.status_code == 200
+                assert await titles(client) == ["Network design", "Cloud migration"]
+        
+        run_with_db(body)
+        print("✅ Admin edits visible on next public read")
+    
+    def test_cache_stats(self, run_with_db, api_client):
+        """Test cache counters endpoint"""
+        async def body(db):
+            async with api_client(db) as client:
+                await client.get("/api/services")
+                before = catalog_cache.stats()
+                await client.get("/api/services")
+                
+                response = await client.get("/api/admin/cache-stats")
+                assert response.status_code == 200
+                data = response.json()
+                assert data["hits"] == before["hits"] + 1
+                assert data["misses"] == before["misses"]
+        
+        run_with_db(body)
+        print("✅ Cache stats working")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
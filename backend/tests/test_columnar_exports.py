@@ -0,0 +1,114 @@
+"""
+Tests for columnar lead exports
+Tests: Parquet and Feather output types, categorical columns across batches,
+row groups, source mapping
+"""
+import pytest
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from columnar_exports import write_leads, LeadsWriter, LEAD_COLUMNS
+from exports import new_temp_path
+
+
+async def as_batches(docs: list, size: int):
+    for start in range(0, len(docs), size):
+        yield docs[start:start + size]
+
+
+def lead_sources(contacts: int = 250, meetings: int = 40) -> dict:
+    base = datetime(2026, 1, 1)
+    return {
+        "contact": as_batches([
+            {
+                "id": f"c{i}",
+                "name": f"Contact {i}",
+                "email": f"contact{i}@example.com",
+                "phone": "+46701234567",
+                "service": "saas" if i % 2 else "brand-new-service",
+                "comment": "Hello",
+                "created_at": base + timedelta(minutes=i)
+            }
+            for i in range(contacts)
+        ], 100),
+        "chat": as_batches([
+            {"id": "s1", "lead_name": "Lead", "lead_email": "lead@example.com", "lead_interest": "Cloud", "created_at": base}
+        ], 100),
+        "meeting": as_batches([
+            {
+                "id": f"m{i}",
+                "name": f"Meeting {i}",
+                "email": "meet@example.com",
+                "status": ["pending", "approved", "on-hold"][i % 3],
+                "topic": "Demo",
+                "preferred_datetime": "Monday 10:00",
+                "session_id": "s1",
+                "created_at": base
+            }
+            for i in range(meetings)
+        ], 15),
+    }
+
+
+class TestLeadsExport:
+    """Parquet / Feather lead exports"""
+
+    @pytest.mark.parametrize("file_format", ["parquet", "feather"])
+    def test_typed_columns(self, file_format):
+        """All sources land in one table with categorical and timestamp columns"""
+        path = new_temp_path(f".{file_format}")
+        try:
+            rows = asyncio.run(write_leads(path, file_format, lead_sources()))
+            table = pq.read_table(path) if file_format == "parquet" else feather.read_table(path)
+        finally:
+            os.remove(path)
+
+        assert rows == table.num_rows == 291
+        assert table.column_names == [name for name, _ in LEAD_COLUMNS]
+        for name in ("source", "service", "status"):
+            assert pa.types.is_dictionary(table.schema.field(name).type)
+        assert table.schema.field("created_at").type == pa.timestamp("ms", tz="UTC")
+
+        leads = table.to_pylist()
+        assert [lead["source"] for lead in leads].count("meeting") == 40
+        assert leads[0]["created_at"] == datetime(2026, 1, 1, tzinfo=timezone.utc)
+        assert leads[0]["details"] == "Hello" and leads[0]["status"] is None
+        chat = next(lead for lead in leads if lead["source"] == "chat")
+        assert chat["name"] == "Lead" and chat["session_id"] == "s1" and chat["details"] == "Cloud"
+        # Values outside the known categories are added as they appear
+        assert {lead["service"] for lead in leads if lead["source"] == "contact"} == {"saas", "brand-new-service"}
+        assert {lead["status"] for lead in leads if lead["source"] == "meeting"} == {"pending", "approved", "on-hold"}
+        print(f"✅ {file_format} leads export typed")
+
+    def test_row_groups_bounded(self):
+        """Parquet row groups hold at most row_group_size rows"""
+        path = new_temp_path(".parquet")
+        try:
+            writer = LeadsWriter(path, "parquet", row_group_size=100)
+            for start in range(0, 450, 50):
+                writer.append_documents("contact", [{"id": str(i), "service": "saas"} for i in range(start, start + 50)])
+            writer.close()
+            metadata = pq.ParquetFile(path).metadata
+        finally:
+            os.remove(path)
+
+        assert metadata.num_rows == 450
+        assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [100, 100, 100, 100, 50]
+        print("✅ Row groups bounded")
+
+    def test_unknown_format(self):
+        path = new_temp_path(".csv")
+        try:
+            with pytest.raises(ValueError):
+                LeadsWriter(path, "csv")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
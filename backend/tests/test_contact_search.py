@@ -0,0 +1,124 @@
+"""
+Tests for admin contact search query building
+Tests: Normalized search fields, query mode selection, regex escaping
+"""
+import pytest
+import re
+from datetime import date, datetime
+
+from contact_search import build_contact_search, build_contacts_filter, contact_search_fields
+
+
+def regex_values(query) -> list:
+    """All $regex patterns in a query"""
+    if isinstance(query, dict):
+        found = [query["$regex"]] if "$regex" in query else []
+        for value in query.values():
+            found += regex_values(value)
+        return found
+    if isinstance(query, list):
+        return [pattern for item in query for pattern in regex_values(item)]
+    return []
+
+
+class TestContactSearchFields:
+    """Test the derived fields stored on contacts"""
+    
+    def test_fields(self):
+        """Email is lowercased and split, phone reduced to digits"""
+        fields = contact_search_fields(" John.Doe@Example.COM ", "+46 (70) 123-45 67")
+        assert fields == {
+            "email_normalized": "john.doe@example.com",
+            "email_domain": "example.com",
+            "phone_normalized": "46701234567",
+            "phone_reversed": "76543210764"
+        }
+        print("✅ Search fields normalized")
+    
+    def test_missing_values(self):
+        """Contacts without email or phone still get fields"""
+        fields = contact_search_fields(None, "")
+        assert fields["email_domain"] == ""
+        assert fields["phone_reversed"] == ""
+        print("✅ Empty values handled")
+
+
+class TestBuildContactSearch:
+    """Test how a search string becomes a query"""
+    
+    def test_empty(self):
+        assert build_contact_search("") is None
+        assert build_contact_search("   ") is None
+        print("✅ Empty search means no filter")
+    
+    def test_free_text(self):
+        """Words go to the text index"""
+        search = build_contact_search("Nordic Telecom")
+        assert search == {"mode": "text", "query": {"$text": {"$search": "Nordic Telecom"}}}
+        print("✅ Free text uses $text")
+    
+    def test_email_prefix(self):
+        search = build_contact_search("John.Doe@Ex")
+        assert search["mode"] == "email"
+        assert search["query"] == {"email_normalized": {"$regex": "^john\\.doe@ex"}}
+        print("✅ Email prefix anchored on normalized field")
+    
+    def test_email_domain(self):
+        search = build_contact_search("@Example.se")
+        assert search["query"] == {"email_domain": {"$regex": "^example\\.se"}}
+        print("✅ Domain search anchored on email_domain")
+    
+    def test_phone_with_country_code(self):
+        search = build_contact_search("+46 70 123")
+        assert search["mode"] == "phone"
+        assert search["query"] == {"$or": [{"phone_normalized": {"$regex": "^4670123"}}]}
+        print("✅ International phone prefix")
+    
+    def test_local_phone_matches_suffix(self):
+        """A local number matches stored numbers ending in it"""
+        search = build_contact_search("070-123 45 67")
+        stored = contact_search_fields("a@b.se", "+46 70 123 45 67")
+        suffix_pattern = search["query"]["$or"][1]["phone_reversed"]["$regex"]
+        assert re.match(suffix_pattern, stored["phone_reversed"])
+        print("✅ Local number matched by suffix")
+    
+    @pytest.mark.parametrize("search", [".*", "a.*@", "(a+)+$", "+46[0-9]", "^admin@", "x@y.com|.*"])
+    def test_regex_input_escaped(self, search):
+        """User input never reaches a regex unescaped, and every regex is anchored"""
+        result = build_contact_search(search)
+        for pattern in regex_values(result["query"]):
+            assert pattern.startswith("^")
+            # Unescaping gives back a literal that re.escape turns into the same pattern
+            literal = re.sub(r"\\(.)", r"\1", pattern[1:])
+            assert pattern == "^" + re.escape(literal)
+        print(f"✅ {search!r} escaped ({result['mode']})")
+
+
+
+class TestBuildContactsFilter:
+    """Test the combined list / export filter"""
+    
+    def test_empty(self):
+        assert build_contacts_filter() == ({}, False)
+    
+    def test_combined_filters(self):
+        """Search, service and an inclusive day range end up in one query"""
+        query, text_search = build_contacts_filter("cloud", "saas", date(2026, 1, 1), date(2026, 1, 31))
+        assert text_search
+        assert query == {
+            "$text": {"$search": "cloud"},
+            "service": "saas",
+            "created_at": {"$gte": datetime(2026, 1, 1), "$lt": datetime(2026, 2, 1)}
+        }
+        print("✅ Filters combined")
+    
+    def test_open_ended_range(self):
+        query, text_search = build_contacts_filter("@example.se", date_from=date(2026, 3, 1))
+        assert not text_search
+        assert query["created_at"] == {"$gte": datetime(2026, 3, 1)}
+        assert "email_domain" in query
+        print("✅ Open-ended range")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,100 @@
+"""
+Tests for the transactional email outbox
+Tests: Delivery, retry with backoff, dead-letter state, expired lease reclaim
+
+Requires a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+
+import email_outbox
+from email_outbox import EmailOutboxSender, enqueue_emails
+
+
+@pytest.fixture
+def fake_senders(monkeypatch):
+    """Replace SMTP senders with recorders; 'failing' always raises"""
+    sent = []
+    
+    async def ok(**payload):
+        sent.append(payload)
+    
+    async def failing(**payload):
+        raise Exception("SMTP unavailable")
+    
+    monkeypatch.setitem(email_outbox.EMAIL_SENDERS, "contact_notification", ok)
+    monkeypatch.setitem(email_outbox.EMAIL_SENDERS, "contact_auto_response", failing)
+    monkeypatch.setattr(email_outbox, "EMAIL_OUTBOX_MAX_ATTEMPTS", 3)
+    return sent
+
+
+class TestEmailOutbox:
+    """Test outbox delivery and retry behaviour"""
+    
+    def test_delivers_pending_email(self, run_with_db, fake_senders):
+        """A queued email is sent once and marked sent"""
+        async def test(db):
+            ids = await enqueue_emails(db, [("contact_notification", {"name": "Test"})])
+            sender = EmailOutboxSender(db)
+            assert await sender.drain() == 1
+            assert await sender.drain() == 0
+            
+            doc = await db.email_outbox.find_one({"id": ids[0]})
+            assert doc["status"] == "sent"
+            assert doc["attempts"] == 1
+        
+        run_with_db(test)
+        assert fake_senders == [{"name": "Test"}]
+        print("✅ Outbox delivery working")
+    
+    def test_failure_backs_off_then_dead_letters(self, run_with_db, fake_senders):
+        """Failures are retried later with growing delays, then dead-lettered"""
+        async def test(db):
+            ids = await enqueue_emails(db, [("contact_auto_response", {"name": "Test"})])
+            sender = EmailOutboxSender(db)
+            delays = []
+            
+            for attempt in range(1, 4):
+                assert await sender.drain() == 1
+                doc = await db.email_outbox.find_one({"id": ids[0]})
+                assert doc["attempts"] == attempt
+                assert doc["last_error"] == "SMTP unavailable"
+                if attempt < 3:
+                    assert doc["status"] == "pending"
+                    delays.append(doc["next_attempt_at"] - doc["updated_at"])
+                    # Not due yet, so nothing to send until the backoff expires
+                    assert await sender.drain() == 0
+                    await db.email_outbox.update_one({"id": ids[0]}, {"$set": {"next_attempt_at": datetime.utcnow()}})
+            
+            doc = await db.email_outbox.find_one({"id": ids[0]})
+            assert doc["status"] == "dead"
+            assert delays[1] > delays[0]
+        
+        run_with_db(test)
+        print("✅ Outbox backoff and dead-letter working")
+    
+    def test_expired_lease_is_reclaimed(self, run_with_db, fake_senders):
+        """A message stuck in 'sending' by a crashed worker is retried"""
+        async def test(db):
+            ids = await enqueue_emails(db, [("contact_notification", {"name": "Test"})])
+            await db.email_outbox.update_one(
+                {"id": ids[0]},
+                {"$set": {"status": "sending", "locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+            )
+            assert await EmailOutboxSender(db).drain() == 1
+            doc = await db.email_outbox.find_one({"id": ids[0]})
+            assert doc["status"] == "sent"
+        
+        run_with_db(test)
+        print("✅ Expired outbox lease reclaimed")
+    
+    def test_unknown_kind_rejected(self):
+        """Only registered email kinds can be queued"""
+        with pytest.raises(ValueError):
+            asyncio.run(enqueue_emails(None, [("newsletter", {})]))
+        print("✅ Unknown email kind rejected")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,76 @@
+"""
+Tests for the compiled email templates
+Tests: HTML escaping, text and HTML parts, template caching
+"""
+import pytest
+import email
+
+from email_templates import CompiledTemplate, get_template, render_email, EMAIL_SUBJECTS
+from email_service import build_message
+
+CONTEXTS = {
+    "contact_notification": {"name": "Ann", "email": "ann@example.com", "phone": "+46 70 1", "service": "saas", "comment": "Hi"},
+    "contact_auto_response": {"name": "Ann", "email": "ann@example.com", "phone": "+46 70 1", "service": "SaaS"},
+    "meeting_request": {"name": "Ann", "email": "ann@example.com", "phone": "Not provided", "preferred_datetime": "Monday 10:00", "topic": "CRM"},
+}
+
+
+class TestCompiledTemplate:
+    """Test template compilation and rendering"""
+    
+    def test_render(self):
+        template = CompiledTemplate("Hello {{ name }}, {{name}}!")
+        assert template.static == ["Hello ", ", ", "!"]
+        assert template.fields == ["name", "name"]
+        assert template.render({"name": "Ann"}) == "Hello Ann, Ann!"
+        print("✅ Template compiled into static parts and fields")
+    
+    def test_missing_field_raises(self):
+        with pytest.raises(KeyError):
+            CompiledTemplate("{{ name }}").render({})
+        print("✅ Missing field raises")
+    
+    def test_templates_cached(self):
+        assert get_template("contact_notification.html") is get_template("contact_notification.html")
+        print("✅ Templates compiled once")
+
+
+class TestRenderEmail:
+    """Test rendered emails"""
+    
+    @pytest.mark.parametrize("kind", list(EMAIL_SUBJECTS))
+    def test_every_field_filled(self, kind):
+        subject, text, html = render_email(kind, CONTEXTS[kind])
+        for body in (subject, text, html):
+            assert "{{" not in body
+        assert "Ann" in subject or kind == "contact_auto_response"
+        assert "ann@example.com" in text and "ann@example.com" in html
+        print(f"✅ {kind} rendered")
+    
+    def test_html_escapes_user_input(self):
+        context = dict(CONTEXTS["contact_notification"], name="<script>alert(1)</script>", comment='"><img src=x>')
+        _, text, html = render_email("contact_notification", context)
+        assert "<script>" not in html
+        assert "&lt;script&gt;" in html
+        assert '"><img' not in html
+        # The text part shows the input as typed
+        assert "<script>alert(1)</script>" in text
+        print("✅ User input escaped in HTML")
+    
+    def test_subject_cannot_inject_headers(self):
+        context = dict(CONTEXTS["meeting_request"], name="Ann\r\nBcc: someone@example.com")
+        subject, _, _ = render_email("meeting_request", context)
+        assert "\n" not in subject and "\r" not in subject
+        print("✅ Newlines removed from subject")
+    
+    def test_message_has_text_and_html_parts(self):
+        message = build_message("contact_auto_response", "ann@example.com", CONTEXTS["contact_auto_response"])
+        parsed = email.message_from_string(message.as_string())
+        types = [part.get_content_type() for part in parsed.walk() if not part.is_multipart()]
+        assert types == ["text/plain", "text/html"]
+        assert parsed["To"] == "ann@example.com"
+        print("✅ Message has text and HTML alternatives")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,119 @@
+"""
+Tests for background export jobs
+Tests: Job lifecycle, reuse of identical exports over unchanged data, expiry
+
+Requires a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+import os
+from datetime import datetime, timedelta
+
+import export_jobs
+from export_jobs import create_export_job, export_cache_key, ExportJobRunner
+from exports import render_pool
+from stats_counters import record_change
+
+
+@pytest.fixture
+def db_seed():
+    """A few contacts"""
+    base = datetime(2026, 1, 1)
+    return {"contacts": [
+        {
+            "id": f"c{i}", "name": f"Contact {i}", "email": f"c{i}@example.com", "phone": "070 123",
+            "service": "saas" if i % 2 else "others", "comment": "Hi", "created_at": base + timedelta(days=i)
+        }
+        for i in range(10)
+    ]}
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_jobs, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+class TestExportCacheKey:
+    """Test which exports count as identical"""
+    
+    def test_key_ignores_filter_order(self):
+        a = export_cache_key("contacts", "csv", {"service": "saas", "date_from": "2026-01-01"})
+        b = export_cache_key("contacts", "csv", {"date_from": "2026-01-01", "service": "saas"})
+        assert a == b
+        assert a != export_cache_key("contacts", "xlsx", {"service": "saas", "date_from": "2026-01-01"})
+        print("✅ Cache key is stable")
+
+
+class TestExportJobs:
+    """Test the job runner against MongoDB"""
+    
+    def test_job_lifecycle(self, run_with_db):
+        """A job is built in the background and its file matches the filters"""
+        async def body(db):
+            job, reused = await create_export_job(db, "contacts", "csv", {"service": "saas", "date_to": "2026-01-06"})
+            assert not reused and job["status"] == "pending"
+            
+            assert await ExportJobRunner(db).drain() == 1
+            job = await db.export_jobs.find_one({"id": job["id"]})
+            assert job["status"] == "ready"
+            assert job["rows"] == 3  # c1, c3, c5
+            with open(job["path"], encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            assert lines[0].startswith("id,name,email")
+            assert [line.split(",")[0] for line in lines[1:]] == ["c5", "c3", "c1"]
+        run_with_db(body)
+        print("✅ Job built and filtered")
+    
+    def test_unchanged_data_reuses_artifact(self, run_with_db):
+        """Identical exports reuse the artifact until the data changes"""
+        async def body(db):
+            runner = ExportJobRunner(db)
+            first, _ = await create_export_job(db, "contacts", "xlsx", {})
+            await runner.drain()
+            
+            again, reused = await create_export_job(db, "contacts", "xlsx", {})
+            assert reused and again["id"] == first["id"] and again["status"] == "ready"
+            
+            await record_change(db, "contacts", None, {"service": "saas", "created_at": datetime.utcnow()})
+            changed, reused = await create_export_job(db, "contacts", "xlsx", {})
+            assert not reused and changed["id"] != first["id"]
+        run_with_db(body)
+        print("✅ Artifact reused until the data changed")
+    
+    def test_rendered_jobs_wait_for_pool(self, run_with_db):
+        """While the render pool is full, PDF jobs stay pending and CSV jobs still run"""
+        async def body(db):
+            pdf, _ = await create_export_job(db, "contacts", "pdf", {})
+            csv_job, _ = await create_export_job(db, "contacts", "csv", {})
+            slots = render_pool.workers + render_pool.max_pending
+            for _ in range(slots):
+                render_pool.reserve()
+            try:
+                assert await ExportJobRunner(db).drain() == 1
+            finally:
+                for _ in range(slots):
+                    render_pool.release()
+            pdf = await db.export_jobs.find_one({"id": pdf["id"]})
+            assert pdf["status"] == "pending" and pdf["attempts"] == 0
+            assert (await db.export_jobs.find_one({"id": csv_job["id"]}))["status"] == "ready"
+        run_with_db(body)
+        print("✅ Rendered jobs left pending while the pool is full")
+    
+    def test_expired_jobs_removed(self, run_with_db):
+        async def body(db):
+            runner = ExportJobRunner(db)
+            job, _ = await create_export_job(db, "contacts", "csv", {})
+            await runner.drain()
+            job = await db.export_jobs.find_one({"id": job["id"]})
+            assert os.path.exists(job["path"])
+            
+            await db.export_jobs.update_one({"id": job["id"]}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}})
+            assert await runner.expire_jobs() == 1
+            assert not os.path.exists(job["path"])
+            assert await db.export_jobs.find_one({"id": job["id"]}) is None
+        run_with_db(body)
+        print("✅ Expired artifacts deleted")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
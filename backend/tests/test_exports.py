@@ -0,0 +1,302 @@
+"""
+Tests for admin data exports
+Tests: Streaming XLSX writer, batching, chunked file streaming, CSV / NDJSON encoding, gzip,
+render process pool (event loop stays responsive, bounded queue), paged PDF
+"""
+import pytest
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import openpyxl
+
+from exports import (
+    write_xlsx, stream_file, new_temp_path, CONTACT_COLUMNS,
+    csv_chunks, ndjson_chunks, gzip_chunks, accepts_gzip,
+    RenderPool, RenderPoolBusy, render_export, spool_documents, read_spool, render_pdf, column_fields, PDF_CONTACT_COLUMNS,
+    wrap_cell, text_width, EXPORT_DATASETS, PDF_MAX_CELL_LINES
+)
+
+
+def make_contacts(count: int) -> list:
+    base = datetime(2026, 1, 1)
+    return [
+        {
+            "name": f"Contact {i}",
+            "email": f"contact{i}@example.com",
+            "phone": f"+4670{i:07d}",
+            "service": "saas",
+            "comment": "Hello",
+            "created_at": base + timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+
+
+async def as_batches(docs: list, size: int):
+    for start in range(0, len(docs), size):
+        yield docs[start:start + size]
+
+
+async def read_stream(path: str, chunk_size: int) -> list:
+    return [chunk async for chunk in stream_file(path, chunk_size=chunk_size)]
+
+
+async def collect(chunks) -> list:
+    return [chunk async for chunk in chunks]
+
+
+class TestXlsxExport:
+    """Test the write-only Excel export"""
+    
+    def test_no_row_cap(self):
+        """More than the old 1000-row limit is exported, in order"""
+        contacts = make_contacts(2500)
+        path = new_temp_path(".xlsx")
+        try:
+            rows = asyncio.run(write_xlsx(path, as_batches(contacts, 300), CONTACT_COLUMNS, "Contacts"))
+            assert rows == 2500
+            
+            sheet = openpyxl.load_workbook(path, read_only=True)["Contacts"]
+            values = list(sheet.iter_rows(values_only=True))
+            assert values[0] == ("Name", "Email", "Phone", "Service", "Comment", "Date")
+            assert len(values) == 2501
+            assert values[1][0] == "Contact 0"
+            assert values[-1] == ("Contact 2499", "contact2499@example.com", "+46700002499", "saas", "Hello", "2026-01-02 17:39")
+        finally:
+            os.remove(path)
+        print("✅ 2500 rows exported without truncation")
+    
+    def test_control_characters_removed(self):
+        """Characters XLSX can't store don't break the export"""
+        contacts = [dict(make_contacts(1)[0], comment="bell\x07 and null\x00")]
+        path = new_temp_path(".xlsx")
+        try:
+            asyncio.run(write_xlsx(path, as_batches(contacts, 10), CONTACT_COLUMNS, "Contacts"))
+            sheet = openpyxl.load_workbook(path, read_only=True)["Contacts"]
+            assert list(sheet.iter_rows(values_only=True))[1][4] == "bell and null"
+        finally:
+            os.remove(path)
+        print("✅ Illegal characters stripped")
+
+
+class TestStreamFile:
+    """Test chunked streaming of export files"""
+    
+    def test_chunks_and_cleanup(self):
+        path = new_temp_path(".bin")
+        with open(path, "wb") as f:
+            f.write(b"x" * 10000)
+        
+        chunks = asyncio.run(read_stream(path, 4096))
+        assert [len(c) for c in chunks] == [4096, 4096, 1808]
+        assert not os.path.exists(path)
+        print("✅ File streamed in chunks and removed")
+
+
+
+class TestCsvNdjsonExport:
+    """Test the streamed CSV and NDJSON encoders"""
+    
+    FIELDS = ["name", "email", "comment", "created_at"]
+    
+    def test_csv_one_chunk_per_batch(self):
+        """Header first, then one chunk per batch; quoting and dates round-trip"""
+        contacts = make_contacts(5)
+        contacts[0]["comment"] = 'Line one\nsaid "hi", then left'
+        chunks = asyncio.run(collect(csv_chunks(as_batches(contacts, 2), self.FIELDS)))
+        assert len(chunks) == 1 + 3
+        
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+        assert rows[0] == self.FIELDS
+        assert len(rows) == 6
+        assert rows[1][2] == 'Line one\nsaid "hi", then left'
+        assert datetime.fromisoformat(rows[5][3]) == contacts[4]["created_at"]
+        print("✅ CSV streamed per batch")
+    
+    def test_ndjson_lines(self):
+        contacts = make_contacts(3)
+        contacts[1]["name"] = "Åsa Öberg"
+        data = b"".join(asyncio.run(collect(ndjson_chunks(as_batches(contacts, 2))))).decode("utf-8")
+        lines = data.splitlines()
+        assert len(lines) == 3 and data.endswith("\n")
+        assert json.loads(lines[1])["name"] == "Åsa Öberg"
+        assert json.loads(lines[2])["created_at"] == contacts[2]["created_at"].isoformat()
+        print("✅ NDJSON one document per line")
+    
+    def test_gzip_stream(self):
+        """Compressed on the fly into a single valid gzip stream"""
+        contacts = make_contacts(3000)
+        plain = b"".join(asyncio.run(collect(csv_chunks(as_batches(contacts, 500), self.FIELDS))))
+        compressed = b"".join(asyncio.run(collect(gzip_chunks(csv_chunks(as_batches(contacts, 500), self.FIELDS)))))
+        assert gzip.decompress(compressed) == plain
+        assert len(compressed) < len(plain) / 4
+        print(f"✅ gzip {len(plain)} -> {len(compressed)} bytes")
+    
+    @pytest.mark.parametrize("header,expected", [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("*", True),
+        ("gzip;q=0", False),
+        ("identity", False),
+        (None, False),
+    ])
+    def test_accepts_gzip(self, header, expected):
+        assert accepts_gzip(header) is expected
+
+
+
+class TestRenderPool:
+    """Test that document rendering runs off the event loop"""
+    
+    def test_spool_round_trip(self):
+        contacts = make_contacts(5)
+        path, rows = asyncio.run(spool_documents(as_batches(contacts, 2), ["name", "created_at"]))
+        try:
+            assert rows == 5
+            batches = list(read_spool(path))
+            assert [len(batch) for batch in batches] == [2, 2, 1]
+            assert batches[2][0] == ("Contact 4", contacts[4]["created_at"])
+        finally:
+            os.remove(path)
+        print("✅ Spool keeps batches and values")
+    
+    def test_event_loop_responsive_during_pdf_render(self):
+        """A large PDF renders in a worker while the loop keeps serving other work"""
+        async def run():
+            pool = RenderPool(workers=1)
+            spool_path, _ = await spool_documents(as_batches(make_contacts(3000), 1000), column_fields(PDF_CONTACT_COLUMNS))
+            pdf_path = new_temp_path(".pdf")
+            lags = []
+            rendering = True
+            
+            async def heartbeat():
+                while rendering:
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.perf_counter() - start - 0.01)
+            
+            try:
+                beat = asyncio.create_task(heartbeat())
+                start = time.perf_counter()
+                rows = await pool.run(render_pdf, spool_path, pdf_path, PDF_CONTACT_COLUMNS, "Contacts")
+                elapsed = time.perf_counter() - start
+                rendering = False
+                await beat
+                with open(pdf_path, "rb") as f:
+                    assert f.read(5) == b"%PDF-"
+            finally:
+                pool.shutdown()
+                os.remove(spool_path)
+                os.remove(pdf_path)
+            return rows, elapsed, lags
+        
+        rows, elapsed, lags = asyncio.run(run())
+        assert rows == 3000
+        assert elapsed > 0.5
+        # The loop kept ticking throughout; rendering inline would stall it for the whole render
+        assert len(lags) > elapsed / 0.01 / 3
+        assert max(lags) < 0.2
+        print(f"✅ {rows}-row PDF rendered in {elapsed:.2f}s, max loop lag {max(lags) * 1000:.1f}ms")
+    
+    def test_bounded_queue(self):
+        """Renders beyond workers + max_pending are refused instead of piling up"""
+        async def run():
+            pool = RenderPool(workers=1, max_pending=1)
+            try:
+                running = [asyncio.create_task(pool.run(time.sleep, 1)) for _ in range(2)]
+                await asyncio.sleep(0)
+                assert pool.pending == 2
+                with pytest.raises(RenderPoolBusy):
+                    await pool.run(time.sleep, 0)
+                await asyncio.gather(*running)
+                await asyncio.sleep(0.05)
+                assert pool.pending == 0
+                await pool.run(time.sleep, 0)
+            finally:
+                pool.shutdown()
+        
+        asyncio.run(run())
+        print("✅ Render queue bounded")
+
+    def test_busy_before_spooling(self, monkeypatch):
+        """A full pool refuses the export before reading any batches"""
+        import exports
+        pool = RenderPool(workers=1, max_pending=0)
+        monkeypatch.setattr(exports, "render_pool", pool)
+        read = []
+
+        async def batches():
+            read.append(1)
+            yield make_contacts(10)
+
+        async def run():
+            pool.reserve()
+            with pytest.raises(RenderPoolBusy):
+                await render_export(render_pdf, "unused.pdf", batches(), PDF_CONTACT_COLUMNS, "Contacts")
+            assert read == [] and pool.pending == 1
+            pool.release()
+
+            async def failing():
+                raise RuntimeError("cursor lost")
+                yield
+            with pytest.raises(RuntimeError):
+                await render_export(render_pdf, "unused.pdf", failing(), PDF_CONTACT_COLUMNS, "Contacts")
+            assert pool.pending == 0
+
+        asyncio.run(run())
+        print("✅ Busy pool refused before spooling")
+
+
+
+class TestPdfExport:
+    """Test the paged PDF table"""
+    
+    def test_long_words_wrapped_to_width(self):
+        """Addresses without spaces are broken so they stay inside their column"""
+        cell = wrap_cell("very.long.email.address.without.spaces@some-company-domain.example.com", 100)
+        lines = cell.split("\n")
+        assert len(lines) > 1
+        assert all(text_width(line) <= 100 for line in lines)
+        assert "".join(lines) == "very.long.email.address.without.spaces@some-company-domain.example.com"
+        print("✅ Long words wrapped")
+    
+    def test_cell_line_cap(self):
+        """A huge comment is cut so its row still fits on a page"""
+        lines = wrap_cell("word " * 5000, 144).split("\n")
+        assert len(lines) == PDF_MAX_CELL_LINES
+        assert lines[-1].endswith(" ...") and text_width(lines[-1]) <= 144
+        assert wrap_cell(None, 100) == "N/A"
+        print("✅ Cell lines capped")
+    
+    @pytest.mark.parametrize("dataset", sorted(EXPORT_DATASETS))
+    def test_datasets_render(self, dataset):
+        """Contacts, chats and meetings render over several pages"""
+        spec = EXPORT_DATASETS[dataset]
+        docs = [
+            {field: f"{field} {i} <b>&</b>" for field in column_fields(spec["pdf_columns"])}
+            for i in range(300)
+        ]
+        for doc in docs:
+            doc["created_at"] = datetime(2026, 1, 1)
+        spool_path, _ = asyncio.run(spool_documents(as_batches(docs, 100), column_fields(spec["pdf_columns"])))
+        pdf_path = new_temp_path(".pdf")
+        try:
+            assert render_pdf(spool_path, pdf_path, spec["pdf_columns"], spec["title"]) == 300
+            with open(pdf_path, "rb") as f:
+                data = f.read()
+            assert data.startswith(b"%PDF-")
+            assert data.count(b"/Type /Page\n") > 3
+        finally:
+            os.remove(spool_path)
+            os.remove(pdf_path)
+        print(f"✅ {dataset} PDF rendered")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,94 @@
+"""
+Tests for password hashing off the event loop
+Tests: Event loop stays responsive during 50 concurrent logins, bounded queue,
+rehash when the bcrypt cost changes
+"""
+import pytest
+import asyncio
+import time
+import warnings
+
+from passlib.context import CryptContext
+
+from auth import PasswordHasher, PasswordHasherBusy
+
+# passlib 1.7 logs a harmless warning while reading the bcrypt 4 version
+warnings.filterwarnings("ignore", module="passlib")
+
+
+def bcrypt_context(rounds: int) -> CryptContext:
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+class TestPasswordHasher:
+    """Test the bounded bcrypt thread pool"""
+
+    def test_event_loop_responsive_during_logins(self):
+        """50 concurrent logins don't stall a heartbeat on the event loop"""
+        context = bcrypt_context(9)
+        stored = context.hash("correct horse")
+        hasher = PasswordHasher(context, workers=2, max_pending=64)
+
+        async def run():
+            lags = []
+            done = asyncio.Event()
+
+            async def heartbeat():
+                while not done.is_set():
+                    start = time.perf_counter()
+                    await asyncio.sleep(0.01)
+                    lags.append(time.perf_counter() - start - 0.01)
+
+            beat = asyncio.create_task(heartbeat())
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                hasher.verify("correct horse" if i % 2 else "wrong", stored) for i in range(50)
+            ])
+            elapsed = time.perf_counter() - start
+            done.set()
+            await beat
+            return results, elapsed, lags
+
+        results, elapsed, lags = asyncio.run(run())
+        assert [valid for valid, _ in results] == [bool(i % 2) for i in range(50)]
+        assert hasher.pending == 0
+        # One bcrypt call at cost 9 takes tens of milliseconds; inline, each would block the loop for that long
+        assert max(lags) < 0.05, f"event loop stalled for {max(lags):.3f}s"
+        print(f"✅ 50 logins in {elapsed:.2f}s, max event loop lag {max(lags) * 1000:.1f} ms")
+
+    def test_bounded_queue(self):
+        """Beyond workers + max_pending, hashing is refused instead of queued"""
+        hasher = PasswordHasher(bcrypt_context(10), workers=1, max_pending=1)
+
+        async def run():
+            return await asyncio.gather(*[hasher.hash("password") for _ in range(4)], return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert sum(isinstance(result, PasswordHasherBusy) for result in results) == 2
+        assert sum(isinstance(result, str) for result in results) == 2
+        print("✅ Hashing queue bounded")
+
+    def test_rehash_when_cost_changes(self):
+        """A hash made at another cost is replaced on the next successful verify"""
+        old_hash = bcrypt_context(4).hash("password")
+        hasher = PasswordHasher(bcrypt_context(5))
+
+        async def run():
+            return (
+                await hasher.verify("password", old_hash),
+                await hasher.verify("wrong", old_hash),
+            )
+
+        (valid, new_hash), (wrong_valid, wrong_hash) = asyncio.run(run())
+        assert valid and new_hash.startswith("$2b$05$")
+        assert not wrong_valid and wrong_hash is None
+
+        async def verify_new():
+            return await hasher.verify("password", new_hash)
+
+        assert asyncio.run(verify_new()) == (True, None)
+        print("✅ Hash upgraded to the configured cost")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,221 @@
+"""
+Tests for reCAPTCHA verification against a local fake siteverify server
+Tests: Connection reuse, replay rejection, timeouts, circuit breaker
+"""
+import pytest
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from recaptcha import RecaptchaVerifier, CircuitBreaker, RecaptchaUnavailable
+
+SECRET = "test-secret"
+
+
+class FakeSiteverifyServer:
+    """siteverify stand-in: tokens starting with 'good' pass, 'slow' tokens hang"""
+    
+    def __init__(self):
+        self.requests = []
+        self.client_ports = set()
+        self.fail_with_status = None
+        self.slow_seconds = 1.0
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                token = form.get("response", [""])[0]
+                server.requests.append(token)
+                server.client_ports.add(self.client_address[1])
+                
+                if token.startswith("slow"):
+                    time.sleep(server.slow_seconds)
+                if server.fail_with_status:
+                    self.send_response(server.fail_with_status)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                
+                success = form.get("secret", [""])[0] == SECRET and token.startswith("good")
+                body = json.dumps({"success": success}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/recaptcha/api/siteverify"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def start(self):
+        self.thread.start()
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    server = FakeSiteverifyServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def make_verifier(url: str, **kwargs) -> RecaptchaVerifier:
+    breaker = CircuitBreaker(threshold=kwargs.pop("threshold", 3), reset_timeout=kwargs.pop("reset_timeout", 30))
+    return RecaptchaVerifier(secret=SECRET, verify_url=url, breaker=breaker, **kwargs)
+
+
+def run(verifier: RecaptchaVerifier, coro_factory):
+    async def wrapper():
+        try:
+            return await coro_factory()
+        finally:
+            await verifier.close()
+    return asyncio.run(wrapper())
+
+
+class TestRecaptchaVerifier:
+    """Test token verification"""
+    
+    def test_valid_and_invalid_tokens(self, fake_server):
+        """Valid tokens pass and invalid tokens fail"""
+        verifier = make_verifier(fake_server.url)
+        
+        async def check():
+            return await verifier.verify("good-1"), await verifier.verify("bad-1")
+        
+        assert run(verifier, check) == (True, False)
+        print("✅ Valid and invalid tokens verified")
+    
+    def test_client_reuses_connection(self, fake_server):
+        """Sequential verifications share one keep-alive connection"""
+        verifier = make_verifier(fake_server.url)
+        
+        async def check():
+            for i in range(5):
+                assert await verifier.verify(f"good-{i}")
+        
+        run(verifier, check)
+        assert len(fake_server.requests) == 5
+        assert len(fake_server.client_ports) == 1
+        print("✅ reCAPTCHA client reused its connection")
+    
+    def test_replay_rejected_without_network_call(self, fake_server):
+        """A token that was already checked is rejected locally"""
+        verifier = make_verifier(fake_server.url)
+        
+        async def check():
+            return await verifier.verify("good-replay"), await verifier.verify("good-replay")
+        
+        assert run(verifier, check) == (True, False)
+        assert fake_server.requests == ["good-replay"]
+        assert verifier.replays_rejected == 1
+        print("✅ Replayed token rejected without a network call")
+    
+    def test_expired_tokens_forgotten(self, fake_server):
+        """Tokens are only remembered for their lifetime"""
+        verifier = make_verifier(fake_server.url, token_ttl=0.05)
+        
+        async def check():
+            await verifier.verify("good-old")
+            await asyncio.sleep(0.1)
+            await verifier.verify("good-new")
+        
+        run(verifier, check)
+        assert verifier.stats()["tracked_tokens"] == 1
+        print("✅ Expired tokens dropped from the replay cache")
+    
+    def test_timeout_fails_closed(self, fake_server):
+        """A hung verify call times out instead of stalling the request"""
+        verifier = make_verifier(fake_server.url, timeout=0.2)
+        
+        async def check():
+            start = time.perf_counter()
+            with pytest.raises(RecaptchaUnavailable):
+                await verifier.verify("slow-1")
+            return time.perf_counter() - start
+        
+        elapsed = run(verifier, check)
+        assert elapsed < fake_server.slow_seconds
+        print(f"✅ Verify call timed out after {elapsed:.2f}s")
+    
+    def test_unchecked_token_can_be_retried(self, fake_server):
+        """A token whose check failed on the network is not treated as a replay"""
+        verifier = make_verifier(fake_server.url)
+        fake_server.fail_with_status = 502
+        
+        async def check():
+            with pytest.raises(RecaptchaUnavailable):
+                await verifier.verify("good-retry")
+            fake_server.fail_with_status = None
+            return await verifier.verify("good-retry")
+        
+        assert run(verifier, check) is True
+        print("✅ Token retried after a server error")
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker around the verify endpoint"""
+    
+    def test_breaker_opens_and_skips_network(self, fake_server):
+        """After repeated failures calls fail fast without reaching the server"""
+        verifier = make_verifier(fake_server.url, threshold=3)
+        fake_server.fail_with_status = 503
+        
+        async def check():
+            for i in range(3):
+                with pytest.raises(RecaptchaUnavailable):
+                    await verifier.verify(f"good-{i}")
+            with pytest.raises(RecaptchaUnavailable):
+                await verifier.verify("good-while-open")
+        
+        run(verifier, check)
+        assert len(fake_server.requests) == 3
+        assert verifier.stats()["breaker_state"] == "open"
+        print("✅ Circuit breaker opened and skipped the network")
+    
+    def test_breaker_closes_after_successful_trial(self, fake_server):
+        """After the cool-down one trial call closes the breaker again"""
+        verifier = make_verifier(fake_server.url, threshold=1, reset_timeout=0.1)
+        fake_server.fail_with_status = 503
+        
+        async def check():
+            with pytest.raises(RecaptchaUnavailable):
+                await verifier.verify("good-1")
+            fake_server.fail_with_status = None
+            await asyncio.sleep(0.15)
+            return await verifier.verify("good-2")
+        
+        assert run(verifier, check) is True
+        assert verifier.stats()["breaker_state"] == "closed"
+        print("✅ Circuit breaker closed after a successful trial")
+    
+    def test_unreachable_server(self):
+        """Connection errors count as failures"""
+        verifier = make_verifier("http://127.0.0.1:1/siteverify", threshold=1, timeout=0.5)
+        
+        async def check():
+            with pytest.raises(RecaptchaUnavailable):
+                await verifier.verify("good-1")
+        
+        run(verifier, check)
+        assert verifier.breaker.state == "open"
+        print("✅ Unreachable verify endpoint opened the breaker")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,137 @@
+"""
+Tests for the pooled SMTP connections in email_service
+Tests: Connection reuse, reconnect after the server drops the connection
+
+Uses a local aiosmtpd server (pip install aiosmtpd).
+"""
+import pytest
+import asyncio
+from email.mime.text import MIMEText
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+from email_service import SMTPConnectionPool
+
+SMTP_TEST_PORT = 8026
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+    
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content)
+        return "250 OK"
+
+
+def make_message(subject: str) -> MIMEText:
+    message = MIMEText("<p>Test</p>", "html")
+    message["From"] = "noreply@example.com"
+    message["To"] = "info@example.com"
+    message["Subject"] = subject
+    return message
+
+
+class LocalSMTPServer:
+    """aiosmtpd server that can be restarted on the same port"""
+    
+    def __init__(self):
+        self.handler = RecordingHandler()
+        self.controller = None
+    
+    def start(self):
+        self.controller = aiosmtpd_controller.Controller(self.handler, hostname="127.0.0.1", port=SMTP_TEST_PORT)
+        self.controller.start()
+    
+    def stop(self):
+        if self.controller:
+            self.controller.stop()
+            self.controller = None
+    
+    def restart(self):
+        # Controllers can't be restarted, so replace it with a fresh one
+        self.stop()
+        self.start()
+
+
+@pytest.fixture
+def smtp_server():
+    server = LocalSMTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+def make_pool(**kwargs) -> SMTPConnectionPool:
+    return SMTPConnectionPool(
+        hostname="127.0.0.1", port=SMTP_TEST_PORT,
+        use_tls=False, start_tls=False, **kwargs
+    )
+
+
+class TestSMTPConnectionPool:
+    """Test pooled SMTP delivery"""
+    
+    def test_reuses_connection(self, smtp_server):
+        """Sequential sends share one authenticated connection"""
+        handler = smtp_server.handler
+        pool = make_pool(size=2)
+        
+        async def run():
+            for i in range(5):
+                await pool.send_message(make_message(f"Message {i}"))
+            await pool.close()
+        
+        asyncio.run(run())
+        assert len(handler.messages) == 5
+        assert pool.connections_opened == 1
+        print("✅ SMTP connection reused across messages")
+    
+    def test_concurrency_bounded_by_pool_size(self, smtp_server):
+        """Concurrent sends never open more connections than the pool size"""
+        handler = smtp_server.handler
+        pool = make_pool(size=2)
+        
+        async def run():
+            await asyncio.gather(*[pool.send_message(make_message(f"Message {i}")) for i in range(10)])
+            await pool.close()
+        
+        asyncio.run(run())
+        assert len(handler.messages) == 10
+        assert pool.connections_opened <= 2
+        print(f"✅ SMTP pool bounded: {pool.connections_opened} connections")
+    
+    def test_reconnects_after_server_restart(self, smtp_server):
+        """A connection dropped by the server is replaced transparently"""
+        handler = smtp_server.handler
+        pool = make_pool(size=1, health_check_after=3600)
+        
+        async def run():
+            await pool.send_message(make_message("Before restart"))
+            # Drops every open connection; the pooled one is now stale
+            await asyncio.to_thread(smtp_server.restart)
+            await pool.send_message(make_message("After restart"))
+            await pool.close()
+        
+        asyncio.run(run())
+        assert len(handler.messages) == 2
+        assert pool.connections_opened == 2
+        print("✅ SMTP pool reconnected after server restart")
+    
+    def test_idle_connection_expires(self, smtp_server):
+        """Connections idle longer than idle_timeout are not reused"""
+        pool = make_pool(size=1, idle_timeout=0)
+        
+        async def run():
+            await pool.send_message(make_message("First"))
+            await asyncio.sleep(0.01)
+            await pool.send_message(make_message("Second"))
+            await pool.close()
+        
+        asyncio.run(run())
+        assert pool.connections_opened == 2
+        print("✅ Idle SMTP connection expired")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
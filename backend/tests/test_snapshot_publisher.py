@@ -0,0 +1,61 @@
+"""
+Tests for the static catalog snapshot publisher
+Tests: Snapshot files, gzip variants, atomic replacement
+"""
+import pytest
+import gzip
+import json
+import os
+
+from catalog_cache import CatalogSnapshot
+from snapshot_publisher import write_snapshot_files, SNAPSHOT_FILES
+
+
+def make_snapshots(about=None):
+    services = CatalogSnapshot([{"id": "service-1", "title": "IT Consulting"}])
+    products = CatalogSnapshot([{"id": "product-1", "name": "MITACRM"}])
+    about = CatalogSnapshot(about)
+    bundle = CatalogSnapshot(
+        {"services": services.data, "saas_products": products.data, "about": about.data}
+    )
+    return {"services": services, "saas_products": products, "about_content": about, "site_bundle": bundle}
+
+
+class TestSnapshotPublisher:
+    """Test writing snapshot files for nginx"""
+    
+    def test_writes_json_and_gzip(self, tmp_path):
+        """Every snapshot gets a .json file and a matching .json.gz"""
+        snapshots = make_snapshots(about={"id": "about-1", "title": "About"})
+        write_snapshot_files(str(tmp_path), snapshots)
+        
+        for key, filename in SNAPSHOT_FILES.items():
+            body = (tmp_path / filename).read_bytes()
+            assert body == snapshots[key].body
+            assert gzip.decompress((tmp_path / f"{filename}.gz").read_bytes()) == body
+        
+        assert json.loads((tmp_path / "services.json").read_bytes())[0]["id"] == "service-1"
+        print(f"✅ Snapshot files written: {sorted(os.listdir(tmp_path))}")
+    
+    def test_rewrite_replaces_files_and_leaves_no_temp_files(self, tmp_path):
+        """Republishing replaces content in place without leftovers"""
+        write_snapshot_files(str(tmp_path), make_snapshots(about={"id": "about-1", "title": "Old"}))
+        write_snapshot_files(str(tmp_path), make_snapshots(about={"id": "about-1", "title": "New"}))
+        
+        assert json.loads((tmp_path / "about.json").read_bytes())["title"] == "New"
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+        print("✅ Snapshot files replaced atomically")
+    
+    def test_missing_about_removes_stale_file(self, tmp_path):
+        """Missing About content removes the file so nginx falls back to the API"""
+        write_snapshot_files(str(tmp_path), make_snapshots(about={"id": "about-1", "title": "About"}))
+        write_snapshot_files(str(tmp_path), make_snapshots(about=None))
+        
+        assert not (tmp_path / "about.json").exists()
+        assert not (tmp_path / "about.json.gz").exists()
+        assert (tmp_path / "services.json").exists()
+        print("✅ Stale About snapshot removed")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,187 @@
+"""
+Tests for the maintained admin counters
+Tests: Counter deltas on insert/update/delete, reconciliation of drift,
+       daily analytics rollups
+
+The reconciliation tests require a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+from datetime import datetime
+
+import stats_counters
+from stats_counters import (
+    counter_delta, daily_deltas, record_change, reconcile_stats, get_stats, get_total,
+    rebuild_daily_rollups, get_daily_analytics, get_data_version, StatsReconciler
+)
+
+
+class TestCounterDelta:
+    """Test which counters a write changes"""
+    
+    def test_insert_and_delete(self):
+        contact = {"service": "saas"}
+        assert counter_delta("contacts", None, contact) == {"total": 1, "by_service.saas": 1}
+        assert counter_delta("contacts", contact, None) == {"total": -1, "by_service.saas": -1}
+        print("✅ Insert/delete deltas")
+    
+    def test_status_change_moves_bucket(self):
+        delta = counter_delta("meeting_requests", {"status": "pending"}, {"status": "approved"})
+        assert delta == {"by_status.pending": -1, "by_status.approved": 1}
+        print("✅ Status change moves one bucket")
+    
+    def test_missing_status_counts_as_pending(self):
+        assert counter_delta("meeting_requests", None, {}) == {"total": 1, "by_status.pending": 1}
+        print("✅ Missing status counted as pending")
+    
+    def test_lead_captured_only_counts_transition(self):
+        assert counter_delta("chat_sessions", None, {"lead_captured": False}) == {"total": 1}
+        assert counter_delta("chat_sessions", {"lead_captured": False}, {"lead_captured": True}) == {"lead_captured": 1}
+        assert counter_delta("chat_sessions", {"lead_captured": True}, {"lead_captured": True}) == {}
+        print("✅ Lead capture counted once per session")
+    
+    def test_unsafe_keys_sanitized(self):
+        delta = counter_delta("contacts", None, {"service": "$where.x"})
+        assert "by_service._where_x" in delta
+        print("✅ Service names sanitized for field paths")
+
+
+class TestReconciliation:
+    """Test counters against a real database"""
+    
+    def test_counters_follow_writes(self, run_with_db):
+        """record_change keeps counters equal to a recount"""
+        async def test(db):
+            await reconcile_stats(db)
+            docs = [{"id": str(i), "service": "saas" if i % 2 else "leadership"} for i in range(5)]
+            for doc in docs:
+                await db.contacts.insert_one(dict(doc))
+                await record_change(db, "contacts", None, doc)
+            await db.contacts.delete_one({"id": "0"})
+            await record_change(db, "contacts", docs[0], None)
+            
+            assert await get_total(db, "contacts") == 4
+            stats = await get_stats(db, "contacts")
+            assert stats["by_service"] == {"saas": 2, "leadership": 2}
+            assert await reconcile_stats(db) == {}
+        
+        run_with_db(test)
+        print("✅ Counters follow writes without drift")
+    
+    def test_drift_corrected(self, run_with_db):
+        """Writes that bypass the counters are corrected by reconciliation"""
+        async def test(db):
+            await reconcile_stats(db)
+            await db.meeting_requests.insert_many([{"id": "1", "status": "approved"}, {"id": "2"}])
+            await db.chat_sessions.insert_one({"id": "s", "lead_captured": True})
+            versions = {c: await get_data_version(db, c) for c in ("contacts", "meeting_requests")}
+            
+            drift = await reconcile_stats(db)
+            assert set(drift) == {"meeting_requests", "chat_sessions"}
+            # Artifacts built from drifted data are invalidated, the others kept
+            assert await get_data_version(db, "meeting_requests") == versions["meeting_requests"] + 1
+            assert await get_data_version(db, "contacts") == versions["contacts"]
+            assert (await get_stats(db, "meeting_requests"))["by_status"] == {"approved": 1, "pending": 1}
+            assert (await get_stats(db, "chat_sessions"))["lead_captured"] == 1
+        
+        run_with_db(test)
+        print("✅ Drift corrected by reconciliation")
+    
+    def test_write_during_recount_not_overwritten(self, run_with_db, monkeypatch):
+        """A counter update that lands during the recount is kept, not reported as drift"""
+        async def test(db):
+            await reconcile_stats(db)
+            recount = stats_counters.recount
+            
+            async def recount_racing_a_write(db, collection):
+                counted = await recount(db, collection)
+                if collection == "contacts":
+                    doc = {"id": "late", "service": "saas"}
+                    await db.contacts.insert_one(dict(doc))
+                    await record_change(db, "contacts", None, doc)
+                return counted
+            
+            monkeypatch.setattr(stats_counters, "recount", recount_racing_a_write)
+            assert await reconcile_stats(db) == {}
+            assert (await get_stats(db, "contacts"))["total"] == 1
+            monkeypatch.setattr(stats_counters, "recount", recount)
+            assert await reconcile_stats(db) == {}
+        
+        run_with_db(test)
+        print("✅ Concurrent write kept")
+    
+    def test_one_worker_reconciles(self, run_with_db):
+        """Only the lock holder reconciles; another worker takes over once the lease expires"""
+        async def test(db):
+            first, second = StatsReconciler(db, interval=60), StatsReconciler(db, interval=60)
+            assert await first.reconcile()
+            assert not await second.reconcile()
+            assert await first.reconcile()
+            
+            await db.locks.update_one({"_id": "stats_reconcile"}, {"$set": {"locked_until": datetime.utcnow()}})
+            assert await second.reconcile()
+            assert not await first.reconcile()
+        
+        run_with_db(test)
+        print("✅ One worker reconciles at a time")
+
+
+class TestDailyRollups:
+    """Test the analytics_daily rollups"""
+    
+    def test_daily_deltas_use_created_day(self):
+        before = {"status": "pending", "created_at": datetime(2026, 1, 31, 23, 59)}
+        after = dict(before, status="approved")
+        assert daily_deltas("meeting_requests", None, before) == {
+            "2026-01-31": {"total": 1, "by_status.pending": 1}
+        }
+        assert daily_deltas("meeting_requests", before, after) == {
+            "2026-01-31": {"by_status.pending": -1, "by_status.approved": 1}
+        }
+        assert daily_deltas("meeting_requests", before, before) == {}
+        print("✅ Daily deltas keyed by created_at day")
+    
+    def test_writes_and_rebuild_agree(self, run_with_db):
+        """Rollups maintained on write equal a full $merge rebuild"""
+        async def test(db):
+            contacts = [
+                {"id": "1", "service": "saas", "created_at": datetime(2026, 1, 1, 8)},
+                {"id": "2", "service": "saas", "created_at": datetime(2026, 1, 1, 20)},
+                {"id": "3", "service": "it.consulting", "created_at": datetime(2026, 1, 3)},
+            ]
+            for doc in contacts:
+                await db.contacts.insert_one(dict(doc))
+                await record_change(db, "contacts", None, doc)
+            session = {"id": "s", "lead_captured": True, "created_at": datetime(2026, 1, 2)}
+            await db.chat_sessions.insert_one(dict(session))
+            await record_change(db, "chat_sessions", None, session)
+            
+            start, end = datetime(2026, 1, 1), datetime(2026, 1, 3)
+            on_write = await get_daily_analytics(db, start, end)
+            await rebuild_daily_rollups(db, None)
+            rebuilt = await get_daily_analytics(db, start, end)
+            
+            assert on_write == rebuilt
+            assert [day["contacts"]["total"] for day in rebuilt["days"]] == [2, 0, 1]
+            assert rebuilt["days"][2]["contacts"]["by_service"] == {"it_consulting": 1}
+            assert rebuilt["totals"]["chat_sessions"] == {"total": 1, "lead_captured": 1}
+        
+        run_with_db(test)
+        print("✅ On-write rollups match a $merge rebuild")
+    
+    def test_rebuild_removes_emptied_days(self, run_with_db):
+        """A day whose documents were deleted behind the API's back is dropped"""
+        async def test(db):
+            doc = {"id": "1", "service": "saas", "created_at": datetime.utcnow()}
+            await db.contacts.insert_one(dict(doc))
+            await record_change(db, "contacts", None, doc)
+            await db.contacts.delete_many({})
+            
+            await rebuild_daily_rollups(db, 7)
+            assert await db.analytics_daily.count_documents({"collection": "contacts"}) == 0
+        
+        run_with_db(test)
+        print("✅ Rebuild drops emptied days")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,167 @@
+"""
+Tests for the CRM sync feed
+Tests: Token encoding, snapshot paging, changes since a token with tombstones,
+lead filtering, expired tokens
+
+Requires a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+
+import sync_feed
+from sync_feed import (
+    sync_page, encode_sync_token, decode_sync_token, SyncTokenError, SyncTokenExpired
+)
+from stats_counters import record_change
+
+
+@pytest.fixture
+def db_seed():
+    """A few contacts"""
+    base = datetime(2026, 1, 1)
+    return {"contacts": [
+        {
+            "id": f"c{i}", "name": f"Contact {i}", "email": f"c{i}@example.com", "phone": "070 123",
+            "service": "saas", "comment": "Hi", "created_at": base + timedelta(days=i)
+        }
+        for i in range(7)
+    ]}
+
+
+@pytest.fixture(autouse=True)
+def no_settle_delay(monkeypatch):
+    monkeypatch.setattr(sync_feed, "SYNC_SETTLE_SECONDS", 0)
+
+
+async def read_all(db, feed: str, since=None, limit: int = 3):
+    """Follow next_since until has_more is false; returns (changes, token)"""
+    changes = []
+    while True:
+        page = await sync_page(db, feed, since, limit)
+        changes += page["changes"]
+        since = page["next_since"]
+        if not page["has_more"]:
+            return changes, since
+
+
+class TestSyncToken:
+    """Test sync token encoding"""
+
+    def test_round_trip(self):
+        seq, issued_at, snapshot_after = decode_sync_token(encode_sync_token(42, "65a1b2c3d4e5f60718293a4b"))
+        assert seq == 42 and snapshot_after == "65a1b2c3d4e5f60718293a4b"
+        assert datetime.utcnow() - issued_at < timedelta(seconds=5)
+        assert decode_sync_token(encode_sync_token(7))[2] is None
+        print("✅ Sync token round trip")
+
+    @pytest.mark.parametrize("token", ["garbage", "eyJzIjogMX0", encode_sync_token(1, "not-an-object-id")[:-2]])
+    def test_invalid(self, token):
+        with pytest.raises(SyncTokenError):
+            decode_sync_token(token)
+
+    def test_expired(self, monkeypatch):
+        async def run():
+            token = encode_sync_token(0)
+            monkeypatch.setattr(sync_feed, "SYNC_RETENTION_DAYS", 0)
+            with pytest.raises(SyncTokenExpired):
+                await sync_page(None, "contacts", token)
+        asyncio.run(run())
+        print("✅ Expired token rejected")
+
+
+class TestSyncFeed:
+    """Test snapshots and changes since a token"""
+
+    def test_snapshot_then_changes(self, run_with_db):
+        """A full snapshot, then only what changed, each document once"""
+        async def body(db):
+            snapshot, token = await read_all(db, "contacts")
+            assert sorted(change["id"] for change in snapshot) == [f"c{i}" for i in range(7)]
+            assert (await sync_page(db, "contacts", token))["changes"] == []
+
+            new = {"id": "c7", "name": "New", "service": "saas", "created_at": datetime.utcnow()}
+            await db.contacts.insert_one(dict(new))
+            await record_change(db, "contacts", None, new)
+            for name in ("Renamed", "Renamed again"):
+                before = await db.contacts.find_one_and_update({"id": "c1"}, {"$set": {"name": name}})
+                await record_change(db, "contacts", before, dict(before, name=name))
+            deleted = await db.contacts.find_one_and_delete({"id": "c2"})
+            await record_change(db, "contacts", deleted, None)
+
+            changes, token = await read_all(db, "contacts", token, limit=10)
+            by_id = {change["id"]: change for change in changes}
+            assert len(changes) == 3
+            assert by_id["c7"]["doc"]["name"] == "New"
+            assert by_id["c1"]["doc"]["name"] == "Renamed again"
+            assert by_id["c2"]["deleted"] is True and "doc" not in by_id["c2"]
+            assert (await sync_page(db, "contacts", token))["changes"] == []
+        run_with_db(body)
+        print("✅ Snapshot then changes")
+
+    def test_changes_paged(self, run_with_db):
+        """Paging through the changelog returns every change"""
+        async def body(db):
+            _, token = await read_all(db, "contacts")
+            for i in range(7):
+                before = await db.contacts.find_one({"id": f"c{i}"})
+                await record_change(db, "contacts", before, before)
+            changes, _ = await read_all(db, "contacts", token, limit=2)
+            assert sorted(change["id"] for change in changes) == [f"c{i}" for i in range(7)]
+        run_with_db(body)
+        print("✅ Changes paged")
+
+    def test_write_during_snapshot_replayed(self, run_with_db):
+        """A write made while the snapshot is being read comes back afterwards"""
+        async def body(db):
+            page = await sync_page(db, "contacts", None, limit=3)
+            before = await db.contacts.find_one_and_update({"id": "c0"}, {"$set": {"name": "Late"}})
+            await record_change(db, "contacts", before, dict(before, name="Late"))
+            _, token = await read_all(db, "contacts", page["next_since"])
+            # The next sync starts from where the snapshot began
+            changes, _ = await read_all(db, "contacts", token)
+            assert [change["doc"]["name"] for change in changes] == ["Late"]
+        run_with_db(body)
+        print("✅ Write during snapshot replayed")
+
+    def test_unsettled_entry_not_skipped(self, run_with_db, monkeypatch):
+        """A higher sequence number with an older time waits for the lower one"""
+        async def body(db):
+            _, token = await read_all(db, "contacts")
+            monkeypatch.setattr(sync_feed, "SYNC_SETTLE_SECONDS", 60)
+            now = datetime.utcnow()
+            await db.sync_changes.insert_many([
+                {"collection": "contacts", "seq": 1, "doc_id": "c1", "deleted": False, "at": now},
+                {"collection": "contacts", "seq": 2, "doc_id": "c2", "deleted": False, "at": now - timedelta(minutes=5)},
+            ])
+            page = await sync_page(db, "contacts", token)
+            assert page["changes"] == [] and not page["has_more"]
+            assert decode_sync_token(page["next_since"])[0] == 0
+
+            monkeypatch.setattr(sync_feed, "SYNC_SETTLE_SECONDS", 0)
+            page = await sync_page(db, "contacts", page["next_since"])
+            assert [change["id"] for change in page["changes"]] == ["c1", "c2"]
+        run_with_db(body)
+        print("✅ Unsettled entry holds the page back")
+
+    def test_leads_only(self, run_with_db):
+        """The leads feed skips chat sessions without a captured lead"""
+        async def body(db):
+            _, token = await read_all(db, "leads")
+            for session_id, captured in (("s1", True), ("s2", False)):
+                session = {"id": session_id, "lead_captured": captured, "lead_email": "l@example.com", "created_at": datetime.utcnow()}
+                await db.chat_sessions.insert_one(dict(session))
+                await record_change(db, "chat_sessions", None, session)
+            changes, _ = await read_all(db, "leads", token)
+            assert [change["id"] for change in changes] == ["s1"]
+            # Chat turns of a session that never became a lead leave no changelog entries
+            await record_change(db, "chat_sessions", {"id": "s2", "lead_captured": False}, {"id": "s2", "lead_captured": False})
+            assert await db.sync_changes.count_documents({"doc_id": "s2"}) == 0
+            snapshot, _ = await read_all(db, "leads")
+            assert [change["id"] for change in snapshot] == ["s1"]
+        run_with_db(body)
+        print("✅ Leads feed filtered")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
@@ -0,0 +1,118 @@
+"""
+Tests for the verified-JWT cache
+Tests: Hits skip verification, expiry, LRU bound, revocation of one token and
+of every token issued before a password change, sync between workers
+
+The sync test requires a local MongoDB (set TEST_MONGO_URL to override).
+"""
+import pytest
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException
+
+import auth
+from auth import (
+    TokenCache, TokenRevocationSync, create_access_token, verify_token, token_digest,
+    revoke_token, revoke_user_tokens
+)
+
+
+class TestTokenCache:
+    """Test caching of verified claims"""
+
+    def test_hit_skips_verification(self, monkeypatch):
+        cache = TokenCache()
+        token = create_access_token({"sub": "admin"})
+        calls = []
+        decode = auth.decode_token
+        monkeypatch.setattr(auth, "decode_token", lambda t: calls.append(t) or decode(t))
+
+        for _ in range(10):
+            assert verify_token(token, cache)["sub"] == "admin"
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (9, 1, 0.9)
+        print("✅ Repeated token verified once")
+
+    def test_invalid_token_not_cached(self):
+        cache = TokenCache()
+        with pytest.raises(HTTPException):
+            verify_token("not.a.token", cache)
+        assert cache.stats()["entries"] == 0
+
+    def test_expired_entry_dropped(self):
+        cache = TokenCache()
+        token = create_access_token({"sub": "admin"}, expires_delta=timedelta(seconds=1))
+        verify_token(token, cache)
+        # jose compares exp in whole seconds
+        time.sleep(2.1)
+        with pytest.raises(HTTPException):
+            verify_token(token, cache)
+        assert cache.stats()["entries"] == 0
+        print("✅ Expired token not served from cache")
+
+    def test_lru_bound(self):
+        cache = TokenCache(max_entries=3)
+        tokens = [create_access_token({"sub": f"admin{i}"}) for i in range(4)]
+        for token in tokens[:3]:
+            verify_token(token, cache)
+        verify_token(tokens[0], cache)  # most recently used
+        verify_token(tokens[3], cache)
+        assert cache.stats()["entries"] == 3 and cache.stats()["evictions"] == 1
+        assert cache.get(token_digest(tokens[1])) is None
+        assert cache.get(token_digest(tokens[0])) is not None
+        print("✅ Cache bounded, least recently used evicted")
+
+
+class TestTokenRevocation:
+    """Test logout and password change revocation"""
+
+    def test_revoked_token_rejected(self):
+        cache = TokenCache()
+        token = create_access_token({"sub": "admin"})
+        other = create_access_token({"sub": "admin"})
+        claims = verify_token(token, cache)
+        cache.revoke(revoked={token_digest(token): claims["exp"]})
+        assert cache.stats()["entries"] == 0
+        with pytest.raises(HTTPException):
+            verify_token(token, cache)
+        assert verify_token(other, cache)["sub"] == "admin"
+        print("✅ Revoked token rejected, other sessions kept")
+
+    def test_password_change_revokes_older_tokens(self):
+        cache = TokenCache()
+        old = create_access_token({"sub": "admin"})
+        someone_else = create_access_token({"sub": "editor"})
+        verify_token(old, cache)
+        cache.revoke(valid_after={"admin": time.time()})
+        new = create_access_token({"sub": "admin"})
+        with pytest.raises(HTTPException):
+            verify_token(old, cache)
+        assert verify_token(new, cache)["sub"] == "admin"
+        assert verify_token(someone_else, cache)["sub"] == "editor"
+        print("✅ Tokens issued before the password change rejected")
+
+    def test_revocations_reach_other_workers(self, run_with_db):
+        """A logout and a password change in one worker apply in another after a load"""
+        async def body(db):
+            await db.admins.insert_one({"username": "admin"})
+            this_worker, other_worker = TokenCache(), TokenCache()
+            logged_out = create_access_token({"sub": "editor"})
+            before_change = create_access_token({"sub": "admin"})
+            for token in (logged_out, before_change):
+                verify_token(token, other_worker)
+
+            await revoke_token(db, logged_out, this_worker)
+            await revoke_user_tokens(db, "admin", this_worker)
+            await TokenRevocationSync(db, other_worker).load()
+            for token in (logged_out, before_change):
+                with pytest.raises(HTTPException):
+                    verify_token(token, other_worker)
+            assert verify_token(create_access_token({"sub": "admin"}), other_worker)["sub"] == "admin"
+        run_with_db(body)
+        print("✅ Revocations synced between workers")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
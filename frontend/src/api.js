@@ -67,6 +67,7 @@ export const publicAPI = {
   getServices: () => apiClient.get('/services'),
   getSaasProducts: () => apiClient.get('/saas-products'),
   getAboutContent: () => apiClient.get('/about'),
+  getSiteBundle: () => apiClient.get('/site-bundle'),
   submitContact: (data) => apiClient.post('/contact', data)
 };
 
@@ -112,7 +113,15 @@ export const adminAPI = {
   // Meeting Requests (Admin)
   getMeetingRequests: () => apiClient.get('/admin/meeting-requests'),
   updateMeetingRequestStatus: (id, data) => apiClient.put(`/admin/meeting-requests/${id}/status`, data),
-  deleteMeetingRequest: (id) => apiClient.delete(`/admin/meeting-requests/${id}`)
+  deleteMeetingRequest: (id) => apiClient.delete(`/admin/meeting-requests/${id}`),
+  
+  // Dashboard totals
+  getStats: () => apiClient.get('/admin/stats'),
+  
+  // Background exports
+  createExport: (data) => apiClient.post('/admin/exports', data),
+  getExport: (id) => apiClient.get(`/admin/exports/${id}`),
+  downloadExport: (id) => apiClient.get(`/admin/exports/${id}/download`, { responseType: 'blob' })
 };
 
 // Chatbot API (Public)
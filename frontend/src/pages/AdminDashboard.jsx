@@ -9,6 +9,8 @@ import { toast } from 'sonner';
 import { publicAPI, adminAPI, authAPI } from '../api';
 import ExpertiseEditor from '../components/ExpertiseEditor';
 
+const EXPORT_POLL_INTERVAL_MS = 1000;
+
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const [activeTab, setActiveTab] = useState('services');
@@ -26,6 +28,8 @@ const AdminDashboard = () => {
   const [selectedSession, setSelectedSession] = useState(null);
   const [sessionDetailOpen, setSessionDetailOpen] = useState(false);
   const [meetingRequests, setMeetingRequests] = useState([]);
+  const [stats, setStats] = useState(null);
+  const [exportingFormat, setExportingFormat] = useState(null);
 
   useEffect(() => {
     // Check if user is authenticated
@@ -66,22 +70,24 @@ const AdminDashboard = () => {
   const loadData = async () => {
     setLoading(true);
     try {
-      const [servicesRes, productsRes, contactsRes, aboutRes, chatSessionsRes, meetingRequestsRes] = await Promise.all([
-        publicAPI.getServices(),
-        publicAPI.getSaasProducts(),
+      const [bundleRes, contactsRes, chatSessionsRes, meetingRequestsRes, statsRes] = await Promise.all([
+        publicAPI.getSiteBundle(),
         adminAPI.getContacts(),
-        publicAPI.getAboutContent(),
         adminAPI.getChatSessions().catch(() => ({ data: [] })),
-        adminAPI.getMeetingRequests().catch(() => ({ data: [] }))
+        adminAPI.getMeetingRequests().catch(() => ({ data: [] })),
+        adminAPI.getStats().catch(() => ({ data: null }))
       ]);
-      setServices(servicesRes.data || []);
-      setSaasProducts(productsRes.data || []);
+      // Services, products and about content arrive in one bundle
+      const bundle = bundleRes.data || {};
+      setServices(bundle.services || []);
+      setSaasProducts(bundle.saas_products || []);
       // Handle paginated contacts response
       const contactsData = contactsRes.data;
       setContacts(contactsData?.data || contactsData || []);
-      setAboutContent(aboutRes.data || null);
+      setAboutContent(bundle.about || null);
       setChatSessions(chatSessionsRes.data || []);
       setMeetingRequests(meetingRequestsRes.data || []);
+      setStats(statsRes.data);
     } catch (error) {
       console.error('Error loading data:', error);
       if (error.response?.status === 401) {
@@ -97,12 +103,22 @@ const AdminDashboard = () => {
         setAboutContent(null);
         setChatSessions([]);
         setMeetingRequests([]);
+        setStats(null);
       }
     } finally {
       setLoading(false);
     }
   };
 
+  const loadStats = async () => {
+    try {
+      const response = await adminAPI.getStats();
+      setStats(response.data);
+    } catch (error) {
+      console.error('Error loading stats:', error);
+    }
+  };
+
   const handleLogout = async () => {
     try {
       await authAPI.logout();
@@ -211,6 +227,7 @@ const AdminDashboard = () => {
         setMeetingRequests(meetingRequests.filter(m => m.id !== id));
         toast.success('Meeting request deleted successfully!');
       }
+      loadStats();
       
       setDeleteConfirmOpen(false);
       setItemToDelete(null);
@@ -229,61 +246,39 @@ const AdminDashboard = () => {
     setIsEditDialogOpen(true);
   };
 
-  const handleDownloadPDF = async () => {
+  // Exports are built in the background; poll the job until its file is ready
+  const handleExport = async (format, label, extension) => {
+    setExportingFormat(format);
     try {
-      const token = localStorage.getItem('adminToken');
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/admin/contacts/export/pdf`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      
-      if (!response.ok) throw new Error('Failed to download PDF');
+      let job = (await adminAPI.createExport({ dataset: 'contacts', format })).data;
+      while (job.status === 'pending' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+        job = (await adminAPI.getExport(job.id)).data;
+      }
+      if (job.status !== 'ready') throw new Error(job.error || `Export ${job.status}`);
       
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
+      const response = await adminAPI.downloadExport(job.id);
+      const url = window.URL.createObjectURL(response.data);
       const a = document.createElement('a');
       a.href = url;
-      a.download = `mita_contacts_${new Date().toISOString().split('T')[0]}.pdf`;
+      a.download = `mita_contacts_${new Date().toISOString().split('T')[0]}.${extension}`;
       document.body.appendChild(a);
       a.click();
       window.URL.revokeObjectURL(url);
       document.body.removeChild(a);
       
-      toast.success('PDF downloaded successfully!');
+      toast.success(`${label} downloaded successfully!`);
     } catch (error) {
-      console.error('PDF download error:', error);
-      toast.error('Failed to download PDF');
+      console.error(`${label} export error:`, error);
+      toast.error(`Failed to download ${label}`);
+    } finally {
+      setExportingFormat(null);
     }
   };
 
-  const handleDownloadExcel = async () => {
-    try {
-      const token = localStorage.getItem('adminToken');
-      const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/admin/contacts/export/excel`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-      
-      if (!response.ok) throw new Error('Failed to download Excel');
-      
-      const blob = await response.blob();
-      const url = window.URL.createObjectURL(blob);
-      const a = document.createElement('a');
-      a.href = url;
-      a.download = `mita_contacts_${new Date().toISOString().split('T')[0]}.xlsx`;
-      document.body.appendChild(a);
-      a.click();
-      window.URL.revokeObjectURL(url);
-      document.body.removeChild(a);
-      
-      toast.success('Excel file downloaded successfully!');
-    } catch (error) {
-      console.error('Excel download error:', error);
-      toast.error('Failed to download Excel');
-    }
-  };
+  const handleDownloadPDF = () => handleExport('pdf', 'PDF', 'pdf');
+
+  const handleDownloadExcel = () => handleExport('xlsx', 'Excel file', 'xlsx');
 
   // Filter contacts based on search query
   const filteredContacts = contacts.filter(contact => {
@@ -322,6 +317,15 @@ const AdminDashboard = () => {
   // Meeting request functions
   const pendingMeetings = meetingRequests.filter(m => m.status === 'pending');
 
+  // Totals come from the maintained counters; the lists only hold what was loaded
+  const totals = {
+    contacts: stats?.contacts?.total ?? contacts.length,
+    sessions: stats?.chat_sessions?.total ?? allSessions.length,
+    leads: stats ? (stats.chat_sessions?.lead_captured || 0) : leadsOnlySessions.length,
+    meetings: stats?.meeting_requests?.total ?? meetingRequests.length,
+    pendingMeetings: stats ? (stats.meeting_requests?.by_status?.pending || 0) : pendingMeetings.length
+  };
+
   const handleUpdateMeetingStatus = async (requestId, newStatus) => {
     try {
       await adminAPI.updateMeetingRequestStatus(requestId, { status: newStatus });
@@ -329,6 +333,7 @@ const AdminDashboard = () => {
         m.id === requestId ? { ...m, status: newStatus } : m
       ));
       toast.success(`Meeting request ${newStatus}!`);
+      loadStats();
     } catch (error) {
       console.error('Error updating meeting status:', error);
       toast.error('Failed to update meeting status');
@@ -399,7 +404,7 @@ const AdminDashboard = () => {
               {tab === 'chatleads' && <MessageCircle size={18} />}
               {tab === 'meetings' && <Calendar size={18} />}
               {tab === 'chatleads' ? 'Chat Leads' : tab === 'meetings' ? 'Meetings' : tab.charAt(0).toUpperCase() + tab.slice(1)}
-              {tab === 'chatleads' && leadsOnlySessions.length > 0 && (
+              {tab === 'chatleads' && totals.leads > 0 && (
                 <span style={{
                   background: 'var(--brand-primary)',
                   color: 'black',
@@ -408,10 +413,10 @@ const AdminDashboard = () => {
                   borderRadius: '12px',
                   fontWeight: 600
                 }}>
-                  {leadsOnlySessions.length}
+                  {totals.leads}
                 </span>
               )}
-              {tab === 'meetings' && pendingMeetings.length > 0 && (
+              {tab === 'meetings' && totals.pendingMeetings > 0 && (
                 <span style={{
                   background: '#ffc107',
                   color: 'black',
@@ -420,7 +425,7 @@ const AdminDashboard = () => {
                   borderRadius: '12px',
                   fontWeight: 600
                 }}>
-                  {pendingMeetings.length}
+                  {totals.pendingMeetings}
                 </span>
               )}
             </button>
@@ -637,7 +642,7 @@ const AdminDashboard = () => {
                 <div style={{ marginBottom: '32px' }}>
                   <h2 className="heading-1">Contact Submissions</h2>
                   <p className="body-medium" style={{ color: 'var(--text-muted)', marginTop: '8px' }}>
-                    All contact form submissions ({contacts.length} total)
+                    All contact form submissions ({totals.contacts} total)
                   </p>
                 </div>
 
@@ -681,6 +686,7 @@ const AdminDashboard = () => {
                   {/* Download Buttons */}
                   <Button 
                     onClick={handleDownloadPDF}
+                    disabled={exportingFormat !== null}
                     className="btn-secondary"
                     style={{
                       display: 'flex',
@@ -693,11 +699,12 @@ const AdminDashboard = () => {
                     }}
                   >
                     <FileText size={20} />
-                    Export PDF
+                    {exportingFormat === 'pdf' ? 'Preparing PDF...' : 'Export PDF'}
                   </Button>
 
                   <Button 
                     onClick={handleDownloadExcel}
+                    disabled={exportingFormat !== null}
                     className="btn-secondary"
                     style={{
                       display: 'flex',
@@ -710,7 +717,7 @@ const AdminDashboard = () => {
                     }}
                   >
                     <FileSpreadsheet size={20} />
-                    Export Excel
+                    {exportingFormat === 'xlsx' ? 'Preparing Excel...' : 'Export Excel'}
                   </Button>
                 </div>
 
@@ -824,7 +831,7 @@ const AdminDashboard = () => {
                   </div>
                   <div style={{ display: 'flex', gap: '12px', alignItems: 'center' }}>
                     <span className="body-muted">
-                      {leadsOnlySessions.length} leads captured • {allSessions.length} total conversations
+                      {totals.leads} leads captured • {totals.sessions} total conversations
                     </span>
                   </div>
                 </div>
@@ -947,7 +954,7 @@ const AdminDashboard = () => {
                   </div>
                   <div style={{ display: 'flex', gap: '12px', alignItems: 'center' }}>
                     <span className="body-muted">
-                      {pendingMeetings.length} pending • {meetingRequests.length} total
+                      {totals.pendingMeetings} pending • {totals.meetings} total
                     </span>
                   </div>
                 </div>